@@ -0,0 +1,36 @@
+"""
+NX-OS validator package
+
+- config: commands, report sections, budgets
+- inventory: sharding of the device list across collector nodes
+- scheduler: login rate limit and per-group/site concurrency caps
+- snapshot: saved snapshot files (section index, lazy parsed view)
+- delta: snapshots stored as a delta of the device's base snapshot
+- prefixes: prefix index of every snapshot ('prefix' subcommand)
+- collection: SSH sessions and PRE/POST collection (paramiko loaded on first connection)
+- transport: SSH transport tuning (window, packet size, compression, ciphers)
+- benchmark: transport throughput against a local SSH stand-in ('bench' subcommand)
+- records: compact parsed-state records (interfaces, neighbors, CDP/LLDP)
+- parsing: command output -> per-section data
+- comparison: PRE/POST diff of each section
+- reporting: per-device comparison report
+- pipeline: pipelined POST, each device compared as soon as it is collected
+- convergence: re-poll only the failing sections until they clear
+- correlation: both ends of each BGP/OSPF/CDP/LLDP link paired across the fleet
+- cli: interactive menu and non-interactive compare
+
+nxos_validator_simple.py remains the entry point.
+"""
+
+from .collection import CollectionError, DeadlineExceeded, DeviceSession
+from .snapshot import SnapshotReader, LazySnapshot, InternTable, RouteInterns
+from .records import InterfaceState, Adjacency
+from .validator import NXOSValidator
+from .cli import main, compare_main, run
+
+__all__ = [
+    'NXOSValidator', 'SnapshotReader', 'LazySnapshot', 'InternTable', 'RouteInterns',
+    'InterfaceState', 'Adjacency',
+    'CollectionError', 'DeadlineExceeded', 'DeviceSession',
+    'main', 'compare_main', 'run',
+]
@@ -0,0 +1,7 @@
+"""python -m nxos_validator [compare ...]"""
+
+import sys
+
+from .cli import run
+
+sys.exit(run(sys.argv[1:]))
@@ -0,0 +1,296 @@
+"""Transport benchmark: MB/s of a large route dump per transport profile
+
+A local SSH stand-in (paramiko server answering like an NX-OS shell)
+serves a route table of the requested size through a relay that adds
+the round-trip time of a WAN link. Each profile goes through the same
+code as a collection: connect_device(), open_session(), execute_command().
+
+    python nxos_validator_simple.py bench --size 300 --rtt 40
+    python nxos_validator_simple.py bench --rtt 120 --site branch-12
+
+Needs paramiko (like collection). Peak memory is a few times --size.
+"""
+
+import time
+import socket
+import importlib.util
+import threading
+from collections import deque
+
+from .config import SECTION_COMMANDS, MAX_OUTPUT_BYTES
+from .transport import parse_transport, device_transport, describe_transport
+
+BENCH_HOSTNAME = "bench-nxos"
+BENCH_PASSWORD = "bench"
+
+# Built-in profiles, from paramiko defaults to tuned bulk transfer
+PROFILES = [
+    ("paramiko defaults", {}),
+    ("window 16 MB", {'window_size': 16 * 1024 * 1024}),
+    ("window 16 MB, recv 1 MB", {'window_size': 16 * 1024 * 1024, 'recv_buffer': 1024 * 1024}),
+    ("window 16 MB, recv 1 MB, aes128-gcm", {'window_size': 16 * 1024 * 1024, 'recv_buffer': 1024 * 1024,
+                                             'ciphers': ['aes128-gcm@openssh.com']}),
+    ("window 16 MB, recv 1 MB, zlib", {'window_size': 16 * 1024 * 1024, 'recv_buffer': 1024 * 1024,
+                                       'compression': True}),
+]
+
+
+def route_block(size=1024 * 1024):
+    """About size bytes of 'show ip route' text"""
+    lines = []
+    total = 0
+    idx = 0
+    while total < size:
+        line = (f"10.{idx >> 16 & 255}.{idx >> 8 & 255}.{idx & 255}/32, ubest/mbest: 2/0\r\n"
+                f"    *via 10.0.{idx % 7}.2, Eth1/{idx % 48 + 1}, [200/0], 3d04h, bgp-65000, internal, tag 65001\r\n"
+                f"    *via 10.0.{idx % 5}.4, Eth1/{idx % 32 + 1}, [200/0], 3d04h, bgp-65000, internal, tag 65001\r\n")
+        lines.append(line)
+        total += len(line)
+        idx += 1
+    return ''.join(lines).encode()
+
+
+class StandIn:
+    """Local SSH server behaving like an NX-OS shell, for benchmarks only
+
+    'show ip route vrf all' returns size bytes of routes; any other
+    command returns nothing. Every cipher and zlib compression are offered.
+    """
+
+    def __init__(self, size):
+        import paramiko
+
+        self.paramiko = paramiko
+        self.size = size
+        self.block = route_block()
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.listener = socket.socket()
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.listen(8)
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.handle, args=(client,), daemon=True).start()
+
+    def handle(self, client):
+        paramiko = self.paramiko
+
+        class Server(paramiko.ServerInterface):
+            def check_auth_password(self, username, password):
+                return paramiko.AUTH_SUCCESSFUL if password == BENCH_PASSWORD else paramiko.AUTH_FAILED
+
+            def get_allowed_auths(self, username):
+                return 'password'
+
+            def check_channel_request(self, kind, chanid):
+                return paramiko.OPEN_SUCCEEDED
+
+            def check_channel_pty_request(self, *args):
+                return True
+
+            def check_channel_shell_request(self, channel):
+                return True
+
+        transport = paramiko.Transport(client, default_window_size=64 * 1024 * 1024)
+        transport.use_compression(True)
+        transport.add_server_key(self.host_key)
+        try:
+            transport.start_server(server=Server())
+            channel = transport.accept(30)
+            if channel is not None:
+                self.shell(channel)
+        except Exception:
+            pass
+        finally:
+            transport.close()
+
+    def shell(self, channel):
+        prompt = f"{BENCH_HOSTNAME}# ".encode()
+        channel.sendall(b"\r\nCisco NX-OS Software\r\n" + prompt)
+        buffer = b''
+        while True:
+            data = channel.recv(1024)
+            if not data:
+                return
+            buffer += data
+            while b'\n' in buffer:
+                line, buffer = buffer.split(b'\n', 1)
+                command = line.decode().strip()
+                channel.sendall(command.encode() + b"\r\n")
+                if command == 'show hostname':
+                    channel.sendall(BENCH_HOSTNAME.encode() + b"\r\n")
+                elif command == SECTION_COMMANDS['routes']:
+                    sent = 0
+                    while sent < self.size:
+                        chunk = self.block[:self.size - sent]
+                        channel.sendall(chunk)
+                        sent += len(chunk)
+                channel.sendall(prompt)
+
+    def close(self):
+        self.listener.close()
+
+
+class LatencyRelay:
+    """TCP relay adding rtt/2 in each direction, optionally capped in bandwidth"""
+
+    def __init__(self, target_port, rtt_ms, bandwidth_mbps=None):
+        self.target_port = target_port
+        self.delay = rtt_ms / 2000.0
+        self.rate = bandwidth_mbps * 125000.0 if bandwidth_mbps else None  # bytes/s
+        self.listener = socket.socket()
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.listen(8)
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except OSError:
+                return
+            upstream = socket.create_connection(('127.0.0.1', self.target_port))
+            for src, dst in ((client, upstream), (upstream, client)):
+                self.pump(src, dst)
+
+    def pump(self, src, dst):
+        """Forward src -> dst, each chunk released delay seconds after it was read"""
+        queue = deque()
+        ready = threading.Condition()
+
+        def reader():
+            while True:
+                try:
+                    data = src.recv(262144)
+                except OSError:
+                    data = b''
+                with ready:
+                    queue.append((time.monotonic() + self.delay, data))
+                    ready.notify()
+                if not data:
+                    return
+
+        def writer():
+            sent_until = time.monotonic()
+            while True:
+                with ready:
+                    while not queue:
+                        ready.wait()
+                    due, data = queue.popleft()
+                wait = due - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                if not data:
+                    try:
+                        dst.shutdown(socket.SHUT_WR)
+                    except OSError:
+                        pass
+                    return
+                if self.rate:
+                    # Serialization delay of the link
+                    sent_until = max(sent_until, time.monotonic()) + len(data) / self.rate
+                    time.sleep(max(0.0, sent_until - time.monotonic()))
+                try:
+                    dst.sendall(data)
+                except OSError:
+                    return
+
+        threading.Thread(target=reader, daemon=True).start()
+        threading.Thread(target=writer, daemon=True).start()
+
+    def close(self):
+        self.listener.close()
+
+
+def measure(validator, port, options):
+    """(bytes, seconds) of one route dump collected with options"""
+    ssh = validator.connect_device('127.0.0.1', BENCH_HOSTNAME, port=port, options=options)
+    if not ssh:
+        raise RuntimeError(validator.failures.get(BENCH_HOSTNAME, "connect failed"))
+    try:
+        session = validator.open_session(ssh, recv_buffer=options['recv_buffer'])
+        cipher = ssh.get_transport().remote_cipher
+        start = time.monotonic()
+        output = validator.execute_command(session, SECTION_COMMANDS['routes'], timeout=120)
+        elapsed = time.monotonic() - start
+        return len(output), elapsed, cipher
+    finally:
+        ssh.close()
+
+
+def bench_main(argv):
+    """Run every profile against the stand-in and print MB/s"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="nxos_validator_simple.py bench",
+        description="Measure route dump throughput per SSH transport profile on a local stand-in")
+    parser.add_argument('--size', type=int, default=300, help="route dump size in MB (default: 300)")
+    parser.add_argument('--rtt', type=float, default=40, help="simulated round-trip time in ms (default: 40)")
+    parser.add_argument('--bandwidth', type=float, help="simulated link bandwidth in Mbit/s (default: unlimited)")
+    parser.add_argument('--inventory', default='ip-device.yml', help="inventory with a 'transport' block")
+    parser.add_argument('--site', help="also bench the inventory's transport options of this site")
+    parser.add_argument('--group', help="also bench the inventory's transport options of this group")
+    args = parser.parse_args(argv)
+
+    size = args.size * 1024 * 1024
+    if size > MAX_OUTPUT_BYTES:
+        parser.error(f"--size above the collection limit ({MAX_OUTPUT_BYTES // (1024 * 1024)} MB)")
+    if importlib.util.find_spec('paramiko') is None:
+        print("[ERROR] The benchmark needs paramiko (pip install paramiko)")
+        return 2
+
+    from .validator import NXOSValidator
+
+    profiles = [(name, device_transport({}, {'default': options})) for name, options in PROFILES]
+    if args.site or args.group:
+        import yaml
+
+        with open(args.inventory, 'r') as f:
+            transport = parse_transport(yaml.safe_load(f))
+        device = {'site': args.site, 'group': args.group}
+        tags = ', '.join(f"{key} {value}" for key, value in device.items() if value)
+        profiles.append((f"inventory ({tags})", device_transport(device, transport)))
+
+    server = StandIn(size)
+    relay = LatencyRelay(server.port, args.rtt, args.bandwidth)
+    link = f"RTT {args.rtt:g} ms" + (f", {args.bandwidth:g} Mbit/s" if args.bandwidth else "")
+    print(f"[INFO] Route dump of {args.size} MB through a local stand-in, {link}")
+
+    results = []
+    for name, options in profiles:
+        validator = NXOSValidator('bench', BENCH_PASSWORD)
+        print(f"\n[INFO] Profile: {name} ({describe_transport(options)})")
+        try:
+            received, elapsed, cipher = measure(validator, relay.port, options)
+        except Exception as e:
+            print(f"[WARNING] {name}: {str(e)}")
+            continue
+        rate = received / elapsed / (1024 * 1024)
+        results.append((name, received, elapsed, rate, cipher))
+        print(f"[INFO] {name}: {rate:.1f} MB/s")
+
+    relay.close()
+    server.close()
+
+    print(f"\n{'='*80}")
+    print(f"TRANSPORT BENCHMARK - {args.size} MB, {link}")
+    print(f"{'='*80}")
+    width = max([len(name) for name, *_ in results] + [7])
+    print(f"  {'Profile':{width}}  {'Cipher':22}  {'Time':>8}  {'MB/s':>7}")
+    for name, received, elapsed, rate, cipher in results:
+        print(f"  {name:{width}}  {cipher:22}  {elapsed:7.1f}s  {rate:7.1f}")
+    if results:
+        best = max(results, key=lambda result: result[3])
+        print(f"\nFastest: {best[0]}")
+    print(f"{'='*80}")
+    return 0 if results else 1
@@ -0,0 +1,492 @@
+"""Interactive menu (PRE / POST / COMPARE ONLY) and command-line compare"""
+
+import os
+import sys
+import shutil
+from datetime import datetime
+from getpass import getpass
+
+from .config import (
+    PRE_DIR, POST_DIR, COMPARE_DIR, SECTION_COMMANDS, OPTIONAL_SECTIONS, SHARD_KEYS, CATALOG_FILE,
+    CONVERGENCE_DEADLINE
+)
+from .inventory import parse_shard, shard_devices, untagged_devices
+from .pipeline import ComparePipeline
+from .validator import NXOSValidator
+
+
+def ask_yes_no(question):
+    """Ask a y/n question (oui/non accepted)"""
+    answer = input(f"{question} (y/n): ").strip().lower()
+    return answer in ['y', 'yes', 'o', 'oui']
+
+
+def ask_route_options(validator, is_pre):
+    """Ask how route tables should be collected"""
+    # Chunked: one VRF per command, a failure costs one VRF
+    validator.chunked_routes = ask_yes_no("Collect route tables one VRF at a time?")
+
+    # Tiered: only fetch route tables of VRFs whose summary changed since PRE
+    if not is_pre and ask_yes_no("Tiered route collection (full tables only for changed VRFs)?"):
+        validator.tiered_routes = True
+        forced = input("VRFs to always collect in full (comma-separated, Enter for none): ")
+        validator.full_route_vrfs = {vrf.strip() for vrf in forced.split(',') if vrf.strip()}
+
+
+def ask_storage_options(validator):
+    """Ask how snapshots should be stored"""
+    # Delta: only the changes against the device's base snapshot are written
+    validator.delta_storage = ask_yes_no("Store snapshots as deltas of each device's base snapshot?")
+
+
+def ask_resume(validator, output_dir):
+    """Offer to resume an interrupted run found in output_dir"""
+    manifest = validator.load_manifest(output_dir)
+    if not manifest or manifest.get('status') == 'complete':
+        return False
+
+    incomplete = validator.incomplete_devices(manifest)
+    if not incomplete:
+        return False
+
+    print(f"\n[INFO] Interrupted run found in {output_dir}/ (started {manifest['started']})")
+    print(f"  {len(incomplete)} device(s) not completed: {', '.join(incomplete)}")
+    return ask_yes_no("Resume this run?")
+
+
+def main(shard=None, shard_by=None, inventory='ip-device.yml'):
+    """Interactive menu; shard (index, count) limits the run to one inventory shard"""
+    print("\n" + "="*80)
+    print("NX-OS SIMPLE VALIDATOR")
+    print("="*80)
+
+    print("\nSelect mode:")
+    print("  1 - PRE-UPGRADE: Collect baseline (keeps history with timestamp)")
+    print("  2 - POST-UPGRADE: Collect data (keeps history with timestamp)")
+    print("  3 - COMPARE ONLY: Compare files (auto or manual selection)")
+
+    mode = input("\nEnter choice (1, 2, or 3): ").strip()
+
+    if mode not in ['1', '2', '3']:
+        print("Invalid choice")
+        sys.exit(1)
+
+    is_pre = (mode == '1')
+    is_compare_only = (mode == '3')
+
+    # For compare-only mode, we don't need SSH credentials
+    if is_compare_only:
+        validator = NXOSValidator('', '')
+        validator.load_devices(inventory)
+        validator.select_shard(shard, shard_by)
+
+        print("\n[MODE] COMPARE ONLY")
+
+        # Check if PRE and POST directories exist
+        if not os.path.exists(PRE_DIR):
+            print(f"\nERROR: {PRE_DIR}/ directory not found")
+            print("Please run PRE-UPGRADE mode first")
+            sys.exit(1)
+
+        if not os.path.exists(POST_DIR):
+            print(f"\nERROR: {POST_DIR}/ directory not found")
+            print("Please run POST-UPGRADE mode first")
+            sys.exit(1)
+
+        # Remove old comparison directory (shards share it: keep the others' reports)
+        if os.path.exists(COMPARE_DIR) and not shard:
+            shutil.rmtree(COMPARE_DIR)
+
+        print(f"\n{'='*80}")
+        print("COMPARE MODE")
+        print(f"{'='*80}")
+
+        # Ask user if they want to compare all or select specific files
+        print("\nOptions:")
+        print("  1 - Compare ALL devices (latest files)")
+        print("  2 - Select specific files to compare")
+        compare_choice = input("\nYour choice (1/2): ").strip()
+
+        files_to_compare = []
+
+        if compare_choice == '2':
+            # MANUAL FILE SELECTION MODE
+            print(f"\n{'='*80}")
+            print("FILE SELECTION MODE")
+            print(f"{'='*80}")
+
+            # List all PRE files
+            print("\n--- Available PRE-VALIDATION files ---")
+            if not os.path.exists(PRE_DIR):
+                print("ERROR: PRE directory does not exist!")
+                sys.exit(1)
+
+            pre_files = [f for f in os.listdir(PRE_DIR) if f.endswith('.txt')]
+            pre_files.sort(reverse=True)  # Most recent first
+
+            if not pre_files:
+                print("ERROR: No PRE files found!")
+                sys.exit(1)
+
+            for idx, filename in enumerate(pre_files, 1):
+                file_path = os.path.join(PRE_DIR, filename)
+                # Get file modification time
+                mtime = os.path.getmtime(file_path)
+                timestamp = datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S')
+                print(f"  {idx}. {filename} (modified: {timestamp})")
+
+            pre_selection = input(f"\nSelect PRE file (1-{len(pre_files)}): ").strip()
+            try:
+                pre_idx = int(pre_selection) - 1
+                if pre_idx < 0 or pre_idx >= len(pre_files):
+                    print("Invalid selection!")
+                    sys.exit(1)
+                selected_pre_file = os.path.join(PRE_DIR, pre_files[pre_idx])
+            except ValueError:
+                print("Invalid input!")
+                sys.exit(1)
+
+            # List all POST files
+            print("\n--- Available POST-VALIDATION files ---")
+            if not os.path.exists(POST_DIR):
+                print("ERROR: POST directory does not exist!")
+                sys.exit(1)
+
+            post_files = [f for f in os.listdir(POST_DIR) if f.endswith('.txt')]
+            post_files.sort(reverse=True)  # Most recent first
+
+            if not post_files:
+                print("ERROR: No POST files found!")
+                sys.exit(1)
+
+            for idx, filename in enumerate(post_files, 1):
+                file_path = os.path.join(POST_DIR, filename)
+                # Get file modification time
+                mtime = os.path.getmtime(file_path)
+                timestamp = datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S')
+                print(f"  {idx}. {filename} (modified: {timestamp})")
+
+            post_selection = input(f"\nSelect POST file (1-{len(post_files)}): ").strip()
+            try:
+                post_idx = int(post_selection) - 1
+                if post_idx < 0 or post_idx >= len(post_files):
+                    print("Invalid selection!")
+                    sys.exit(1)
+                selected_post_file = os.path.join(POST_DIR, post_files[post_idx])
+            except ValueError:
+                print("Invalid input!")
+                sys.exit(1)
+
+            # Extract hostname from filename (hostname is before the timestamp or .txt)
+            hostname = validator.snapshot_hostname(selected_pre_file)
+
+            files_to_compare.append({
+                'pre': selected_pre_file,
+                'post': selected_post_file,
+                'hostname': hostname
+            })
+
+            print(f"\n{'='*80}")
+            print(f"Will compare:")
+            print(f"  PRE:  {os.path.basename(selected_pre_file)}")
+            print(f"  POST: {os.path.basename(selected_post_file)}")
+            print(f"{'='*80}")
+
+        else:
+            # AUTO MODE - Compare all devices using latest files
+            print(f"\n{'='*80}")
+            print("AUTO MODE - Comparing all devices (latest files)")
+            print(f"{'='*80}")
+
+            for device in validator.devices:
+                hostname = device['hostname']
+
+                # Get the most recent PRE and POST files
+                pre_file = validator.get_latest_file(PRE_DIR, hostname)
+                post_file = validator.get_latest_file(POST_DIR, hostname)
+
+                if not pre_file:
+                    print(f"\n[{hostname}] WARNING: No PRE data found")
+                    continue
+
+                if not post_file:
+                    print(f"\n[{hostname}] WARNING: No POST data found")
+                    continue
+
+                files_to_compare.append({
+                    'pre': pre_file,
+                    'post': post_file,
+                    'hostname': hostname
+                })
+
+        # Optional section selector - skipped sections are never parsed
+        print(f"\nSections: {', '.join(SECTION_COMMANDS)}")
+        print(f"Optional: {', '.join(OPTIONAL_SECTIONS)} (path-level route diff: lost ECMP members, next-hop changes)")
+        selection = input("Sections to compare (comma-separated, Enter for default): ")
+        sections = {name.strip() for name in selection.split(',') if name.strip()}
+        unknown = sections - set(SECTION_COMMANDS) - set(OPTIONAL_SECTIONS)
+        if unknown:
+            print(f"WARNING: Unknown section(s) ignored: {', '.join(sorted(unknown))}")
+            sections -= unknown
+
+        # Perform comparisons
+        print(f"\n{'='*80}")
+        print("Starting comparison...")
+        print(f"{'='*80}")
+
+        results = {}
+        for item in files_to_compare:
+            issues = validator.compare_data(item['pre'], item['post'], item['hostname'], sections or None)
+            results[item['hostname']] = {
+                'pre': item['pre'],
+                'post': item['post'],
+                'report': os.path.join(COMPARE_DIR, f"{item['hostname']}_report.txt"),
+                'issues': issues
+            }
+        fleet_report = validator.save_fleet_results(results, correlate=compare_choice != '2')
+
+        # Display all comparison reports on screen
+        print(f"\n{'='*80}")
+        print("COMPARISON REPORTS")
+        print(f"{'='*80}\n")
+
+        for item in files_to_compare:
+            hostname = item['hostname']
+            report_file = os.path.join(COMPARE_DIR, f"{hostname}_report.txt")
+
+            if os.path.exists(report_file):
+                with open(report_file, 'r') as f:
+                    report_content = f.read()
+                print(report_content)
+                print("\n")
+
+        print(f"{'='*80}")
+        print(f"COMPARE ONLY completed!")
+        print(f"Reports: {COMPARE_DIR}/")
+        print(f"Fleet report (all shards): {fleet_report}")
+        print(f"{'='*80}")
+
+        sys.exit(0)
+
+    # For PRE and POST modes, we need SSH credentials
+    username = input("Enter SSH username: ").strip()
+    password = getpass("Enter SSH password: ")
+
+    validator = NXOSValidator(username, password)
+    try:
+        validator.load_devices(inventory)
+    except ValueError as e:
+        print(f"[ERROR] {inventory}: {str(e)}")
+        sys.exit(1)
+    validator.select_shard(shard, shard_by)
+
+    if is_pre:
+        print("\n[MODE] PRE-UPGRADE")
+        # Create directory if it doesn't exist (no longer deleting old data)
+        os.makedirs(PRE_DIR, exist_ok=True)
+
+        resume = ask_resume(validator, PRE_DIR)
+        ask_route_options(validator, is_pre=True)
+        ask_storage_options(validator)
+        validator.start_run()
+        validator.collect_all(PRE_DIR, resume=resume)
+
+        print(f"\n{'='*80}")
+        print(f"PRE-UPGRADE completed! Data saved in: {PRE_DIR}/")
+        validator.print_failures()
+        print(f"{'='*80}")
+
+    else:
+        print("\n[MODE] POST-UPGRADE")
+        # Create directory if it doesn't exist (no longer deleting old data)
+        os.makedirs(POST_DIR, exist_ok=True)
+
+        resume = ask_resume(validator, POST_DIR)
+        ask_route_options(validator, is_pre=False)
+        ask_storage_options(validator)
+        # Pipelined: verdicts stream in while the rest of the fleet is collected
+        pipeline = None
+        if ask_yes_no("Compare each device against its latest PRE as soon as it is collected?"):
+            pipeline = ComparePipeline(validator)
+        # Convergence: re-poll only the sections still failing (BGP/OSPF coming up after a reload)
+        budget = None
+        if ask_yes_no("Wait for convergence (re-poll only failing sections until they clear)?"):
+            answer = input(f"Convergence deadline in seconds (Enter for {CONVERGENCE_DEADLINE}): ").strip()
+            budget = int(answer) if answer.isdigit() else CONVERGENCE_DEADLINE
+            pipeline = pipeline or ComparePipeline(validator)
+        validator.start_run()
+        validator.collect_all(POST_DIR, resume=resume, on_collected=pipeline.submit if pipeline else None)
+
+        print(f"\n{'='*80}")
+        print(f"POST-UPGRADE data collection completed!")
+        print(f"Data: {POST_DIR}/")
+        validator.print_failures()
+        if pipeline:
+            results = pipeline.close()
+            if budget is not None:
+                results = validator.wait_convergence(results, budget)
+            with_issues = sorted(hostname for hostname, result in results.items() if result['issues'])
+            print(f"\nCompared: {len(results)} device(s) | WITH ISSUES: {', '.join(with_issues) or 'none'}")
+            print(f"Reports: {COMPARE_DIR}/")
+            print(f"Fleet report (all shards): {validator.save_fleet_results(results)}")
+        else:
+            print(f"\nTo compare PRE vs POST data, run option 3 (COMPARE ONLY)")
+        print(f"{'='*80}")
+
+
+def add_shard_arguments(parser):
+    """--shard i/n and --shard-by, shared by the menu and compare"""
+    import argparse
+
+    def shard_type(text):
+        try:
+            return parse_shard(text)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+
+    parser.add_argument('--shard', type=shard_type, metavar='I/N',
+                        help="only handle shard I of N of the inventory (e.g. 2/4)")
+    parser.add_argument('--shard-by', choices=SHARD_KEYS,
+                        help="split by hostname hash or by a device tag "
+                             "(default: 'shard_by' in ip-device.yml, else hostname)")
+    parser.add_argument('--inventory', default='ip-device.yml', help="device inventory (default: ip-device.yml)")
+
+
+def compare_main(argv):
+    """Non-interactive compare: no prompts, no SSH stack
+
+    Prints one verdict line per device. Exit status: 0 no issues,
+    1 issues found, 2 nothing to compare or a snapshot could not be read.
+    The inventory is only read to shard by group/site.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="nxos_validator_simple.py compare",
+        description="Compare PRE and POST snapshots without prompts")
+    parser.add_argument('files', nargs='*', metavar='FILE', help="PRE and POST snapshot files")
+    parser.add_argument('--all', action='store_true',
+                        help=f"latest PRE/POST of every device found in {PRE_DIR}/")
+    parser.add_argument('--host', action='append', default=[],
+                        help="latest PRE/POST of this device (repeatable)")
+    parser.add_argument('--sections', default='',
+                        help="comma-separated sections (default: all but optional ones)")
+    parser.add_argument('--output', default=COMPARE_DIR, help=f"report directory (default: {COMPARE_DIR})")
+    add_shard_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.files and len(args.files) != 2:
+        parser.error("expected exactly two files: PRE POST")
+    if not (args.files or args.host or args.all):
+        parser.error("give PRE and POST files, --host or --all")
+
+    sections = {name.strip() for name in args.sections.split(',') if name.strip()}
+    unknown = sections - set(SECTION_COMMANDS) - set(OPTIONAL_SECTIONS)
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(sorted(unknown))}")
+
+    validator = NXOSValidator('', '')
+    pairs = []
+    if args.files:
+        pre_file, post_file = args.files
+        pairs.append((pre_file, post_file, validator.snapshot_hostname(pre_file)))
+
+    hostnames = list(dict.fromkeys(args.host + (validator.snapshot_hostnames(PRE_DIR) if args.all else [])))
+    if args.shard:
+        key = args.shard_by
+        if key != 'hostname' and os.path.exists(args.inventory):
+            # Tag shards depend on the whole inventory, as during collection
+            validator.load_devices(args.inventory, quiet=True)
+            key = key or validator.shard_by
+        key = key or 'hostname'
+        if key == 'hostname':
+            devices = [{'hostname': hostname} for hostname in hostnames]
+        elif validator.devices:
+            devices = validator.devices
+            untagged = untagged_devices(devices, key)
+            if untagged:
+                print(f"[WARNING] No '{key}' tag (sharded together): {', '.join(untagged)}")
+        else:
+            parser.error(f"--shard-by {key} needs the inventory ({args.inventory} not found)")
+        validator.shard, validator.shard_by = args.shard, key
+        selected = {device['hostname'] for device in shard_devices(devices, args.shard, key)}
+        hostnames = [hostname for hostname in hostnames if hostname in selected]
+
+    status = 0
+    for hostname in hostnames:
+        pre_file = validator.get_latest_file(PRE_DIR, hostname)
+        post_file = validator.get_latest_file(POST_DIR, hostname)
+        if not pre_file or not post_file:
+            print(f"[{hostname}] WARNING: No {'PRE' if not pre_file else 'POST'} data found")
+            status = 2
+            continue
+        pairs.append((pre_file, post_file, hostname))
+
+    if not pairs:
+        return 2
+
+    results = {}
+    for pre_file, post_file, hostname in pairs:
+        try:
+            issues = validator.compare_data(pre_file, post_file, hostname, sections or None,
+                                            report_dir=args.output, quiet=True)
+        except OSError as e:
+            print(f"[{hostname}] ERROR: {e}")
+            status = 2
+            continue
+        report_file = os.path.join(args.output, f"{hostname}_report.txt")
+        results[hostname] = {'pre': pre_file, 'post': post_file, 'report': report_file, 'issues': issues}
+        verdict = f"ISSUES ({len(issues)})" if issues else "OK"
+        print(f"[{hostname}] {verdict} - {report_file}")
+        if issues and status == 0:
+            status = 1
+
+    if results:
+        validator.save_fleet_results(results, args.output, correlate=args.all)
+    return status
+
+
+def merge_main(argv):
+    """Rebuild the PRE/POST catalogs and the fleet report from every shard's files"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="nxos_validator_simple.py merge",
+        description="Merge the outputs of sharded runs (after copying them into one tree)")
+    parser.add_argument('--output', default=COMPARE_DIR, help=f"report directory (default: {COMPARE_DIR})")
+    args = parser.parse_args(argv)
+
+    validator = NXOSValidator('', '')
+    for directory in (PRE_DIR, POST_DIR):
+        if os.path.isdir(directory):
+            catalog = validator.merge_catalog(directory)
+            print(f"[INFO] {os.path.join(directory, CATALOG_FILE)}: {len(catalog['devices'])} device(s) "
+                  f"from {', '.join(sorted(catalog['shards'])) or 'no run manifest'}")
+    if os.path.isdir(args.output):
+        print(f"[INFO] Fleet report: {validator.write_fleet_report(args.output)}")
+    return 0
+
+
+def run(argv):
+    """Entry point: interactive menu (optionally one shard), 'compare', 'merge', 'bench' or 'prefix'"""
+    if argv and argv[0] == 'compare':
+        return compare_main(argv[1:])
+    if argv and argv[0] == 'merge':
+        return merge_main(argv[1:])
+    if argv and argv[0] == 'bench':
+        from .benchmark import bench_main
+        return bench_main(argv[1:])
+    if argv and argv[0] == 'prefix':
+        from .prefixes import prefix_main
+        return prefix_main(argv[1:])
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="nxos_validator_simple.py",
+        description="Interactive menu. Subcommands: 'compare' (no prompts), 'merge' (sharded runs), "
+                    "'bench' (SSH transport throughput), 'prefix' (prefix lookup in every snapshot)")
+    add_shard_arguments(parser)
+    args = parser.parse_args(argv)
+    main(args.shard, args.shard_by, args.inventory)
+    return 0
@@ -0,0 +1,982 @@
+"""SSH collection: sessions, budgets, scheduling, checkpointed snapshots
+
+paramiko (and its crypto stack), yaml and the thread pool are imported
+where collection uses them, so parsing and comparison never load them.
+"""
+
+import io
+import os
+import re
+import json
+import time
+import random
+import select
+from datetime import datetime
+
+from .config import (
+    PRE_DIR, POST_DIR, COMMANDS, SECTION_COMMANDS, CONNECT_TIMEOUT, CONNECT_RETRIES,
+    COMMAND_RETRIES, RETRY_BACKOFF, DEVICE_DEADLINE, RUN_DEADLINE, WORKERS, HISTORY_FILE,
+    COMMAND_OVERHEAD, ESTIMATED_THROUGHPUT, RECV_BUFFER, COMMAND_IDLE_TIMEOUT,
+    MAX_OUTPUT_BYTES, PROMPT_PATTERN, MANIFEST_FILE, PARTIAL_SUFFIX, CATALOG_FILE, DELTA_MAX_RATIO,
+    PREFIX_INDEX_DIR
+)
+from .inventory import shard_devices, shard_label, untagged_devices
+from .scheduler import DeviceScheduler, parse_login_limit, parse_concurrency
+from .snapshot import SnapshotReader, write_json_atomic
+from .delta import encode_delta, apply_delta
+from .prefixes import PrefixIndex
+from .transport import (
+    parse_transport, device_transport, describe_transport, connect_options, TransportOptionsError
+)
+
+
+class CollectionError(Exception):
+    """A connection or command failed and should be recorded, not captured"""
+
+
+class DeadlineExceeded(CollectionError):
+    """The device or run time budget is spent"""
+
+
+class DeviceSession:
+    """One interactive shell reused for every command sent to a device"""
+
+    def __init__(self, ssh, shell, prompt=None, recv_buffer=RECV_BUFFER):
+        self.ssh = ssh
+        self.shell = shell
+        self.prompt = prompt
+        self.recv_buffer = recv_buffer
+
+    @property
+    def hostname(self):
+        """Hostname shown in the prompt ('spine1(config)#' -> 'spine1')"""
+        if not self.prompt:
+            return None
+        return re.sub(r'(\(.*\))?[#>]$', '', self.prompt).strip() or None
+
+
+class CollectionMixin:
+    """Device inventory, SSH sessions and snapshot collection"""
+
+    def load_devices(self, yaml_file, quiet=False):
+        """Load device list from YAML"""
+        import yaml
+
+        with open(yaml_file, 'r') as f:
+            data = yaml.safe_load(f)
+            self.devices = data['devices']
+            self.shard_by = data.get('shard_by', self.shard_by)
+            self.login_limit = parse_login_limit(data)
+            self.concurrency_limits = parse_concurrency(data)
+            self.transport = parse_transport(data)
+        if quiet:
+            return
+        print(f"[INFO] Loaded {len(self.devices)} device(s)")
+        for dev in self.devices:
+            print(f"  - {dev['hostname']} ({dev['ip']})")
+
+    def select_shard(self, shard, key=None):
+        """Keep only the devices of shard (index, count), split by key
+
+        key defaults to 'shard_by' from the inventory, else 'hostname'.
+        """
+        if not shard:
+            return self.devices
+        self.shard = shard
+        self.shard_by = key or self.shard_by
+        untagged = untagged_devices(self.devices, self.shard_by)
+        if untagged:
+            print(f"[WARNING] No '{self.shard_by}' tag (sharded together): {', '.join(untagged)}")
+        total = len(self.devices)
+        self.devices = shard_devices(self.devices, shard, self.shard_by)
+        print(f"[INFO] Shard {shard[0]}/{shard[1]} by {self.shard_by}: "
+              f"{len(self.devices)} of {total} device(s)")
+        return self.devices
+
+    def start_run(self, budget=RUN_DEADLINE):
+        """Start the run-wide deadline and reset recorded failures"""
+        self.run_deadline = time.monotonic() + budget
+        self.failures = {}
+
+    def device_deadline(self):
+        """Deadline for one device: its own budget, capped by the run budget"""
+        deadline = time.monotonic() + DEVICE_DEADLINE
+        if self.run_deadline is not None:
+            deadline = min(deadline, self.run_deadline)
+        return deadline
+
+    def remaining(self, deadline):
+        """Seconds left before deadline (None means no deadline)"""
+        if deadline is None:
+            return None
+        return deadline - time.monotonic()
+
+    def backoff(self, attempt, deadline=None):
+        """Sleep with full-jitter exponential backoff, never past the deadline"""
+        delay = random.uniform(0, RETRY_BACKOFF * (2 ** attempt))
+        left = self.remaining(deadline)
+        if left is not None:
+            if left <= 0:
+                raise DeadlineExceeded("deadline exceeded")
+            delay = min(delay, left)
+        time.sleep(delay)
+
+    def connect_device(self, device_ip, device_hostname, deadline=None, port=22, options=None):
+        """Connect to device via SSH
+
+        Transient SSH errors are retried with backoff. Unreachable hosts
+        (refused, no route, TCP timeout) and bad credentials fail fast.
+        options are the device's transport options (window, ciphers, ...).
+        """
+        print(f"\n[{device_hostname}] Connecting to {device_ip}...")
+        import socket
+        import paramiko
+
+        try:
+            extra = connect_options(options, paramiko)
+        except TransportOptionsError as e:
+            print(f"[{device_hostname}] ERROR: {str(e)}")
+            self.failures[device_hostname] = f"connect failed: {str(e)}"
+            return None
+        last_error = None
+
+        for attempt in range(CONNECT_RETRIES + 1):
+            # Logins are paced across all workers (AAA servers, slow control planes)
+            if self.login_limit and not self.login_limit.acquire(deadline):
+                last_error = "deadline exceeded waiting for a login slot"
+                break
+            left = self.remaining(deadline)
+            if left is not None and left <= 0:
+                last_error = "deadline exceeded"
+                break
+            timeout = CONNECT_TIMEOUT if left is None else max(1, min(CONNECT_TIMEOUT, left))
+
+            ssh = paramiko.SSHClient()
+            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            try:
+                ssh.connect(
+                    hostname=device_ip,
+                    port=port,
+                    username=self.username,
+                    password=self.password,
+                    timeout=timeout,
+                    banner_timeout=timeout,
+                    auth_timeout=timeout,
+                    look_for_keys=False,
+                    allow_agent=False,
+                    **extra
+                )
+                print(f"[{device_hostname}] Connected")
+                return ssh
+            except paramiko.AuthenticationException as e:
+                ssh.close()
+                last_error = f"authentication failed: {str(e)}"
+                break
+            except TransportOptionsError as e:
+                ssh.close()
+                last_error = str(e)
+                break
+            except (paramiko.ssh_exception.NoValidConnectionsError, socket.timeout, ConnectionRefusedError) as e:
+                ssh.close()
+                last_error = f"unreachable: {str(e)}"
+                break
+            except Exception as e:
+                ssh.close()
+                last_error = str(e)
+                if attempt < CONNECT_RETRIES:
+                    print(f"[{device_hostname}] Connect attempt {attempt + 1} failed: {last_error} - retrying")
+                    try:
+                        self.backoff(attempt, deadline)
+                    except DeadlineExceeded:
+                        last_error = "deadline exceeded"
+                        break
+
+        print(f"[{device_hostname}] ERROR: {last_error}")
+        self.failures[device_hostname] = f"connect failed: {last_error}"
+        return None
+
+    def read_until_prompt(self, session, deadline=None, max_wait=None, idle_wait=2.5):
+        """Read shell output until the prompt comes back
+
+        With a known prompt, output is complete only when the prompt comes
+        back: COMMAND_IDLE_TIMEOUT seconds of silence or more than
+        MAX_OUTPUT_BYTES raise CollectionError instead of returning a
+        silently truncated capture. Without a known prompt, stop after
+        idle_wait seconds of silence. max_wait (setup reads only) returns
+        whatever arrived so far.
+        """
+        shell = session.shell
+        chunks = []
+        size = 0
+        tail = ""
+        start_time = time.time()
+        last_data = start_time
+
+        while max_wait is None or (time.time() - start_time) < max_wait:
+            left = self.remaining(deadline)
+            if left is not None and left <= 0:
+                raise DeadlineExceeded("deadline exceeded while reading output")
+            if shell.closed:
+                raise CollectionError("session closed by device")
+
+            if shell.recv_ready():
+                chunk = shell.recv(session.recv_buffer)
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > MAX_OUTPUT_BYTES:
+                    raise CollectionError(f"output larger than {MAX_OUTPUT_BYTES} bytes")
+                last_data = time.time()
+                tail = (tail + chunk.decode('utf-8', errors='ignore'))[-256:]
+                if session.prompt and tail.rstrip().endswith(session.prompt):
+                    break
+            elif not session.prompt and (time.time() - last_data) > idle_wait:
+                break
+            elif session.prompt and max_wait is None and (time.time() - last_data) > COMMAND_IDLE_TIMEOUT:
+                raise CollectionError(f"incomplete output: no prompt after {COMMAND_IDLE_TIMEOUT}s of silence")
+            else:
+                # Wake up as soon as data arrives instead of sleeping a fixed time
+                select.select([shell], [], [], 0.05)
+
+        return b''.join(chunks).decode('utf-8', errors='ignore')
+
+    def open_session(self, ssh, deadline=None, timeout=60, recv_buffer=RECV_BUFFER):
+        """Open the shared shell of a device and capture its prompt
+
+        Paging is disabled once for the whole session. The prompt (e.g.
+        'spine1#') is used to detect command completion and the hostname.
+        """
+        left = self.remaining(deadline)
+        try:
+            shell = ssh.invoke_shell(width=500, height=5000)
+            shell.settimeout(timeout if left is None else max(1, min(timeout, left)))
+            session = DeviceSession(ssh, shell, recv_buffer=recv_buffer)
+
+            # Login banner ends with the prompt; nudge it if the device is quiet
+            banner = self.read_until_prompt(session, deadline, max_wait=10, idle_wait=1)
+            if not PROMPT_PATTERN.search(banner.rstrip()):
+                shell.send('\n')
+                banner += self.read_until_prompt(session, deadline, max_wait=10, idle_wait=1)
+            match = PROMPT_PATTERN.search(banner.rstrip())
+            if match:
+                session.prompt = match.group(0).strip()
+
+            # Disable paging
+            shell.send('terminal length 0\n')
+            self.read_until_prompt(session, deadline, max_wait=10, idle_wait=0.5)
+            return session
+
+        except CollectionError:
+            raise
+        except Exception as e:
+            raise CollectionError(f"cannot open shell: {str(e)}") from e
+
+    def execute_command(self, session, command, timeout=60, deadline=None):
+        """Execute command on the shared session and get RAW output
+
+        Raises CollectionError on any failure so that the error never ends
+        up in the capture as if it were command output.
+        """
+        left = self.remaining(deadline)
+        if left is not None and left <= 0:
+            raise DeadlineExceeded("deadline exceeded")
+
+        try:
+            session.shell.settimeout(timeout if left is None else max(1, min(timeout, left)))
+
+            # Drop anything left over from a previous command
+            while session.shell.recv_ready():
+                session.shell.recv(session.recv_buffer)
+
+            # Send command and collect ALL output up to the next prompt
+            session.shell.send(command + '\n')
+            output = self.read_until_prompt(session, deadline)
+
+            # Clean up - remove command echo and prompt
+            lines = output.split('\n')
+            clean_lines = []
+            skip_first = True
+
+            for line in lines:
+                # Skip command echo line
+                if skip_first and command in line:
+                    skip_first = False
+                    continue
+
+                # Skip prompt lines (lines ending with #)
+                line_stripped = line.strip()
+                if line_stripped.endswith('#') and len(line_stripped) < 50:
+                    continue
+
+                clean_lines.append(line.rstrip('\r'))
+
+            return '\n'.join(clean_lines)
+
+        except CollectionError:
+            raise
+        except Exception as e:
+            raise CollectionError(str(e)) from e
+
+    def run_command(self, session, command, deadline=None, timeout=60):
+        """Execute command with bounded retries and jittered backoff
+
+        A failed attempt may leave the shell in an unknown state, so the
+        retry runs on a freshly opened shell.
+        """
+        for attempt in range(COMMAND_RETRIES + 1):
+            try:
+                return self.execute_command(session, command, timeout=timeout, deadline=deadline)
+            except DeadlineExceeded:
+                raise
+            except CollectionError:
+                if attempt >= COMMAND_RETRIES:
+                    raise
+                self.backoff(attempt, deadline)
+                session.shell.close()
+                fresh = self.open_session(session.ssh, deadline, timeout, session.recv_buffer)
+                session.shell = fresh.shell
+                session.prompt = fresh.prompt or session.prompt
+
+    def validate_hostname(self, session, expected_hostname, deadline=None):
+        """Validate device hostname
+
+        The hostname is read from the session prompt. 'show hostname' is
+        only run when no prompt was captured or the prompt does not match
+        (a device may truncate a long hostname in its prompt).
+        """
+        expected = expected_hostname.split('.')[0]
+        prompt_hostname = session.hostname
+        if prompt_hostname and prompt_hostname.split('.')[0].lower() == expected.lower():
+            print(f"[{expected_hostname}] Hostname validated: {prompt_hostname} (prompt)")
+            return True
+
+        try:
+            output = self.run_command(session, "show hostname", deadline=deadline, timeout=10)
+            actual_hostname_full = output.strip().split('\n')[-1].strip()
+            actual_hostname = actual_hostname_full.split('.')[0]
+
+            if actual_hostname.lower() == expected.lower():
+                print(f"[{expected_hostname}] Hostname validated: {actual_hostname_full}")
+                return True
+            else:
+                print(f"[{expected_hostname}] ERROR: Hostname mismatch!")
+                print(f"  Expected: {expected}")
+                print(f"  Got: {actual_hostname}")
+                return False
+        except Exception as e:
+            print(f"[{expected_hostname}] ERROR validating hostname: {str(e)}")
+            return False
+
+    def print_progress_bar(self, current, total, cmd, hostname, bar_length=40):
+        """Print a dynamic progress bar"""
+        percentage = int((current / total) * 100)
+        filled_length = int(bar_length * current // total)
+        bar = '=' * filled_length + '>' + ' ' * (bar_length - filled_length - 1)
+
+        # Truncate command if too long
+        cmd_display = cmd if len(cmd) <= 50 else cmd[:47] + "..."
+
+        # Build the progress line
+        progress_line = f'[{hostname}] [{bar}] {percentage:3d}% | {cmd_display}'
+
+        # Several devices in parallel would overwrite each other's bar:
+        # print one line per finished command instead
+        if self.workers > 1:
+            if not cmd.startswith('Starting:'):
+                with self.print_lock:
+                    print(f'[{hostname}] {current}/{total} {cmd_display}', flush=True)
+            return
+
+        # Pad with spaces to ensure we overwrite previous longer lines (120 chars total)
+        progress_line = progress_line.ljust(120)
+
+        # Print progress bar on same line
+        print(f'\r{progress_line}', end='', flush=True)
+
+    def load_history(self, history_file=HISTORY_FILE):
+        """Load per-device collection timings from previous runs"""
+        self.history = {}
+        if os.path.exists(history_file):
+            try:
+                with open(history_file, 'r') as f:
+                    self.history = json.load(f)
+            except (ValueError, OSError) as e:
+                print(f"[WARNING] Ignoring unreadable {history_file}: {str(e)}")
+        return self.history
+
+    def save_history(self, history_file=HISTORY_FILE):
+        """Merge this run's timings into the history file (atomic write)
+
+        The file is re-read first so that shards sharing it keep each
+        other's timings.
+        """
+        self.load_history(history_file)
+        self.history.update(self.timings)
+        write_json_atomic(history_file, self.history)
+
+    def snapshot_section_sizes(self, path):
+        """Bytes of output per COMMAND section of a saved snapshot"""
+        with SnapshotReader(path) as reader:
+            return {cmd: reader.section_size(cmd) for cmd in reader.commands()}
+
+    def expected_timings(self, hostname):
+        """Expected seconds per command for a device, or None if unknown
+
+        Uses the recorded timings of the last run, otherwise estimates from
+        the size of the latest PRE/POST snapshot of the device.
+        """
+        recorded = self.history.get(hostname, {}).get('commands')
+        if recorded:
+            return recorded
+
+        for directory in (POST_DIR, PRE_DIR):
+            latest = self.get_latest_file(directory, hostname)
+            if latest:
+                sizes = self.snapshot_section_sizes(latest)
+                return {cmd: COMMAND_OVERHEAD + size / ESTIMATED_THROUGHPUT
+                        for cmd, size in sizes.items()}
+        return None
+
+    def command_order(self, hostname):
+        """COMMANDS ordered longest-expected-first for this device"""
+        expected = self.expected_timings(hostname)
+        if not expected:
+            order = list(COMMANDS)
+        else:
+            # Unknown commands go first, stable otherwise
+            order = sorted(COMMANDS, key=lambda cmd: -expected.get(cmd, float('inf')))
+
+        # Tiered and chunked route collection need the route summary first
+        if self.tiered_routes or self.chunked_routes:
+            summary_cmd = SECTION_COMMANDS['route_summary']
+            routes_cmd = SECTION_COMMANDS['routes']
+            order.remove(summary_cmd)
+            order.insert(order.index(routes_cmd), summary_cmd)
+        return order
+
+    def schedule_devices(self, devices):
+        """Order devices longest-expected-first (LPT) for the worker pool
+
+        Devices without any history are treated as the longest so that a
+        big unknown device never ends up last in the queue.
+        """
+        def expected_total(device):
+            expected = self.expected_timings(device['hostname'])
+            return sum(expected.values()) if expected else float('inf')
+
+        return sorted(devices, key=expected_total, reverse=True)
+
+    def manifest_file(self, output_dir):
+        """Run manifest path; each shard keeps its own (run_manifest_shard2of4.json)"""
+        label = shard_label(self.shard)
+        name = MANIFEST_FILE.replace('.json', f'_{label}.json') if label else MANIFEST_FILE
+        return os.path.join(output_dir, name)
+
+    def load_manifest(self, output_dir):
+        """Load the run manifest of output_dir, or None if there is none"""
+        manifest_file = self.manifest_file(output_dir)
+        if not os.path.exists(manifest_file):
+            return None
+        try:
+            with open(manifest_file, 'r') as f:
+                return json.load(f)
+        except (ValueError, OSError) as e:
+            print(f"[WARNING] Ignoring unreadable {manifest_file}: {str(e)}")
+            return None
+
+    def save_manifest(self):
+        """Write the run manifest atomically (caller holds manifest_lock)"""
+        write_json_atomic(self.manifest_file(self.manifest['output_dir']), self.manifest)
+
+    def checkpoint(self, hostname, **fields):
+        """Update one device's manifest entry and persist it
+
+        No-op outside collect_all() (no run manifest), e.g. a standalone
+        collect_data() call.
+        """
+        if self.manifest is None:
+            return {}
+        with self.manifest_lock:
+            entry = self.manifest['devices'].setdefault(hostname, {'commands': []})
+            entry.update(fields)
+            self.save_manifest()
+            return entry
+
+    def incomplete_devices(self, manifest):
+        """Hostnames of the manifest that were not fully collected"""
+        return [hostname for hostname in (d['hostname'] for d in self.devices)
+                if manifest['devices'].get(hostname, {}).get('status') != 'complete']
+
+    def collect_all(self, output_dir, workers=WORKERS, resume=False, on_collected=None):
+        """Collect every device across a worker pool, longest jobs first
+
+        Progress is checkpointed in a run manifest inside output_dir. With
+        resume=True, devices already complete in that manifest are skipped
+        and interrupted devices continue after their last finished command.
+        on_collected(hostname, snapshot_file) is called by the worker as
+        soon as a device's snapshot is written (pipelined POST compare).
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.load_history()
+        os.makedirs(output_dir, exist_ok=True)
+
+        previous = self.load_manifest(output_dir)
+        if resume and previous:
+            self.manifest = previous
+            print(f"\n[INFO] Resuming run started {previous['started']}")
+        else:
+            # Half-written snapshots of an abandoned run are useless
+            if previous:
+                for entry in previous['devices'].values():
+                    partial_file = entry.get('file', '') + PARTIAL_SUFFIX
+                    if os.path.exists(partial_file):
+                        os.remove(partial_file)
+            self.manifest = {
+                'output_dir': output_dir,
+                'started': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'status': 'in_progress',
+                'shard': shard_label(self.shard),
+                'devices': {}
+            }
+        with self.manifest_lock:
+            self.manifest['status'] = 'in_progress'
+            self.save_manifest()
+
+        devices = self.schedule_devices(self.devices)
+        self.workers = max(1, min(workers, len(devices)))
+
+        print(f"\n[INFO] Collecting {len(devices)} device(s) with {self.workers} worker(s)")
+        for device in devices:
+            expected = self.expected_timings(device['hostname'])
+            estimate = f"~{sum(expected.values()):.0f}s" if expected else "unknown"
+            print(f"  - {device['hostname']} (expected: {estimate})")
+
+        if self.login_limit:
+            print(f"[INFO] Login rate: {self.login_limit.rate:g}/s (burst {self.login_limit.burst:g})")
+        for key, caps in self.concurrency_limits.items():
+            print(f"[INFO] Concurrency per {key}: {', '.join(f'{value}={cap}' for value, cap in caps.items())}")
+
+        # Workers pull devices from the scheduler, which holds back devices
+        # whose group/site is at its cap and hands out the next one instead
+        results = {hostname: None for hostname in (device['hostname'] for device in devices)}
+        scheduler = DeviceScheduler(devices, self.concurrency_limits)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            workers = [pool.submit(self.collect_worker, scheduler, output_dir, results, on_collected)
+                       for _ in range(self.workers)]
+            for worker in workers:
+                worker.result()
+
+        with self.manifest_lock:
+            if not self.incomplete_devices(self.manifest):
+                self.manifest['status'] = 'complete'
+            self.save_manifest()
+
+        self.save_history()
+        self.merge_catalog(output_dir)
+        if PrefixIndex(output_dir).compact():
+            print(f"[INFO] Prefix index segments merged: {os.path.join(output_dir, PREFIX_INDEX_DIR)}")
+        return results
+
+    def collect_worker(self, scheduler, output_dir, results, on_collected=None):
+        """Worker loop: collect devices handed out by the scheduler until none is left"""
+        while True:
+            device = scheduler.next_device()
+            if device is None:
+                return
+            hostname = device['hostname']
+            try:
+                results[hostname] = self.collect_data(device, output_dir)
+            except Exception as e:
+                print(f"[{hostname}] ERROR: {str(e)}")
+                self.failures[hostname] = f"collection crashed: {str(e)}"
+                results[hostname] = None
+            finally:
+                scheduler.release(device)
+
+            # Interrupted devices stay in_progress so a resume continues them
+            entry = self.manifest['devices'].get(hostname, {})
+            if results[hostname] is None and entry.get('status') != 'in_progress':
+                self.checkpoint(hostname, status='failed', reason=self.failures.get(hostname, ''))
+            elif results[hostname] and on_collected:
+                on_collected(hostname, results[hostname])
+
+    def merge_catalog(self, output_dir):
+        """Rebuild output_dir/catalog.json from every shard's run manifest
+
+        For each device the newest complete snapshot wins, else its newest
+        attempt. Shards only write their own manifest, so running this
+        after any shard (or on a tree gathered from several nodes) gives
+        the same catalog.
+        """
+        catalog = {'updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'shards': {}, 'devices': {}}
+        if not os.path.isdir(output_dir):
+            return catalog
+
+        prefix, suffix = os.path.splitext(MANIFEST_FILE)
+        for name in sorted(os.listdir(output_dir)):
+            if not (name.startswith(prefix) and name.endswith(suffix)):
+                continue
+            path = os.path.join(output_dir, name)
+            try:
+                with open(path, 'r') as f:
+                    manifest = json.load(f)
+            except (ValueError, OSError) as e:
+                print(f"[WARNING] Ignoring unreadable {path}: {str(e)}")
+                continue
+
+            label = manifest.get('shard') or 'all'
+            catalog['shards'][label] = {
+                'started': manifest.get('started', ''),
+                'status': manifest.get('status', ''),
+                'devices': len(manifest.get('devices', {}))
+            }
+            for hostname, entry in manifest.get('devices', {}).items():
+                candidate = {
+                    'file': entry.get('file', ''),
+                    'status': entry.get('status', ''),
+                    'reason': entry.get('reason', ''),
+                    'shard': label
+                }
+                current = catalog['devices'].get(hostname)
+                rank = (candidate['status'] == 'complete', os.path.basename(candidate['file']))
+                if current is None or rank > (current['status'] == 'complete',
+                                              os.path.basename(current['file'])):
+                    catalog['devices'][hostname] = candidate
+
+        write_json_atomic(os.path.join(output_dir, CATALOG_FILE), catalog)
+        return catalog
+
+    def collect_data(self, device, output_dir):
+        """Collect RAW command outputs from device
+
+        The device gets its own deadline (capped by the run deadline). Failed
+        or skipped commands are written as a STATUS: FAILED marker in their
+        section instead of output, and listed in self.failures.
+
+        The snapshot is written to a .partial file, checkpointed in the run
+        manifest after every command, and renamed into place when complete.
+        With delta storage it is built in memory instead and written once,
+        as a delta when that saves enough (an interrupted device is then
+        collected again from the start).
+        """
+        hostname = device['hostname']
+        ip = device['ip']
+
+        entry = {}
+        if self.manifest:
+            entry = self.manifest['devices'].get(hostname, {})
+            if entry.get('status') == 'complete' and os.path.exists(entry['file']):
+                print(f"[{hostname}] Already collected: {entry['file']} - skipping")
+                return entry['file']
+
+        print(f"\n{'='*70}")
+        print(f"Collecting data from {hostname} ({ip})")
+        print(f"{'='*70}")
+
+        device_start = time.monotonic()
+        deadline = self.device_deadline()
+        if self.remaining(deadline) <= 0:
+            print(f"[{hostname}] SKIPPED - run deadline exceeded")
+            self.failures[hostname] = "skipped: run deadline exceeded"
+            return None
+
+        # Connect
+        options = device_transport(device, self.transport)
+        if options != device_transport({}):
+            print(f"[{hostname}] Transport: {describe_transport(options)}")
+        ssh = self.connect_device(ip, hostname, deadline, port=device.get('port', 22), options=options)
+        if not ssh:
+            return None
+
+        # One shell for the whole device
+        try:
+            session = self.open_session(ssh, deadline, recv_buffer=options['recv_buffer'])
+        except CollectionError as e:
+            print(f"[{hostname}] ERROR: {str(e)}")
+            self.failures[hostname] = str(e)
+            ssh.close()
+            return None
+
+        # Validate hostname
+        if not self.validate_hostname(session, hostname, deadline):
+            print(f"[{hostname}] ABORTING - hostname mismatch")
+            self.failures[hostname] = "hostname validation failed"
+            ssh.close()
+            return None
+
+        # Create output directory
+        os.makedirs(output_dir, exist_ok=True)
+
+        # Continue an interrupted snapshot, or start a new one with timestamp
+        resuming = (entry.get('status') == 'in_progress' and
+                    os.path.exists(entry.get('file', '') + PARTIAL_SUFFIX))
+        in_memory = self.delta_storage and not resuming
+        if resuming:
+            output_file = entry['file']
+            done_commands = list(entry['commands'])
+            failed_commands = dict(entry.get('failed', {}))
+            print(f"[{hostname}] Resuming after {len(done_commands)} command(s)")
+        else:
+            timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+            output_file = os.path.join(output_dir, f"{hostname}_{timestamp}.txt")
+            done_commands = []
+            failed_commands = {}
+        partial_file = output_file + PARTIAL_SUFFIX
+
+        commands = [cmd for cmd in self.command_order(hostname) if cmd not in done_commands]
+        total_commands = len(done_commands) + len(commands)
+        command_timings = {}
+
+        # Outputs later commands depend on (tiered routes need the summary)
+        collected = {}
+        summary_cmd = SECTION_COMMANDS['route_summary']
+        if resuming and summary_cmd in done_commands and summary_cmd not in failed_commands:
+            # No sidecar for a file still being written
+            collected[summary_cmd] = self.read_command_output(partial_file, summary_cmd, persist_index=False)
+
+        try:
+            with io.StringIO() if in_memory else open(partial_file, 'r+' if resuming else 'w') as f:
+                if resuming:
+                    # Anything after the last checkpoint was half-written
+                    f.seek(entry['offset'])
+                    f.truncate()
+                else:
+                    # Header
+                    f.write("="*80 + "\n")
+                    f.write(f"DEVICE: {hostname} ({ip})\n")
+                    f.write(f"TIMESTAMP: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                    f.write("="*80 + "\n\n")
+                    f.flush()
+                    self.checkpoint(hostname, status='in_progress', file=output_file,
+                                    commands=[], failed={}, offset=f.tell())
+
+                # Execute each command and save RAW output
+                for idx, cmd in enumerate(commands, len(done_commands) + 1):
+                    # Show progress bar
+                    self.print_progress_bar(idx - 1, total_commands, f"Starting: {cmd}", hostname)
+
+                    f.write("\n" + "="*80 + "\n")
+                    f.write(f"COMMAND: {cmd}\n")
+
+                    command_start = time.monotonic()
+                    try:
+                        output = self.collect_command(session, hostname, cmd, collected, deadline)
+                        if cmd == summary_cmd:
+                            collected[cmd] = output
+                        command_timings[cmd] = round(time.monotonic() - command_start, 2)
+                    except DeadlineExceeded as e:
+                        failed_commands[cmd] = f"skipped: {str(e)}"
+                    except CollectionError as e:
+                        failed_commands[cmd] = str(e)
+
+                    if cmd in failed_commands:
+                        f.write(f"STATUS: FAILED - {failed_commands[cmd]}\n")
+                        f.write("="*80 + "\n")
+                        progress = f"FAILED: {cmd}"
+                    else:
+                        f.write("="*80 + "\n")
+                        f.write(output)
+                        f.write("\n")
+                        progress = f"Completed: {cmd}"
+
+                    f.flush()
+                    done_commands.append(cmd)
+                    self.checkpoint(hostname, commands=list(done_commands),
+                                    failed=dict(failed_commands), offset=f.tell())
+
+                    # Update progress bar to show completion of this command
+                    self.print_progress_bar(idx, total_commands, progress, hostname)
+                if in_memory:
+                    data = f.getvalue().encode('utf-8')
+        except BaseException:
+            # Without a run manifest nothing will resume this snapshot
+            if self.manifest is None and os.path.exists(partial_file):
+                os.remove(partial_file)
+            raise
+        finally:
+            ssh.close()
+
+        # Complete snapshot only ever appears under its final name
+        if in_memory:
+            self.write_snapshot(output_file, data, hostname)
+            snapshot_bytes = len(data)
+        else:
+            os.replace(partial_file, output_file)
+            snapshot_bytes = os.path.getsize(output_file)
+        SnapshotReader(output_file).close()  # builds the section index
+        self.index_prefixes(output_file, hostname)
+        self.checkpoint(hostname, status='partial' if failed_commands else 'complete')
+
+        # Print newline after progress bar completes
+        if self.workers == 1:
+            print()
+
+        print(f"[{hostname}] Disconnected")
+        print(f"[{hostname}] Data saved to {output_file}")
+
+        # Failed commands keep their previous timing in the history
+        previous = self.history.get(hostname, {}).get('commands', {})
+        self.timings[hostname] = {
+            'total': round(time.monotonic() - device_start, 2),
+            'commands': dict(previous, **command_timings),
+            'bytes': snapshot_bytes
+        }
+
+        if failed_commands:
+            print(f"[{hostname}] WARNING: {len(failed_commands)} command(s) failed")
+            for cmd, reason in failed_commands.items():
+                print(f"  ! {cmd}: {reason}")
+            self.failures[hostname] = f"{len(failed_commands)} command(s) failed"
+
+        return output_file
+
+    def index_prefixes(self, output_file, hostname):
+        """Add a new snapshot to the prefix index of its directory (best effort)"""
+        try:
+            PrefixIndex(os.path.dirname(output_file)).add_snapshot(output_file)
+        except (OSError, ValueError) as e:
+            print(f"[{hostname}] WARNING: prefix index not updated: {str(e)}")
+
+    def write_snapshot(self, output_file, data, hostname):
+        """Write a complete snapshot (bytes) under its final name, in one write
+
+        With delta storage it is written as a delta of the device's base
+        snapshot, unless the device has no base yet or the delta would not
+        save enough: it is then written in full and becomes the next base.
+        """
+        delta = self.store_delta(output_file, data, hostname) if self.delta_storage else None
+        tmp_file = output_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(data if delta is None else delta)
+        os.replace(tmp_file, output_file)
+
+    def store_delta(self, output_file, data, hostname):
+        """Delta of the snapshot data against the device's base, None to store it in full"""
+        base_file = self.get_base_file(os.path.dirname(output_file), hostname, exclude=output_file)
+        if not base_file:
+            print(f"[{hostname}] Stored in full (base for the next deltas)")
+            return None
+        with open(base_file, 'rb') as f:
+            base = f.read()
+
+        delta = encode_delta(base, data, os.path.basename(base_file))
+        if len(delta) > len(data) * DELTA_MAX_RATIO or apply_delta(delta, base) != data:
+            print(f"[{hostname}] Stored in full: too different from {base_file} (new base)")
+            return None
+        print(f"[{hostname}] Stored as delta of {os.path.basename(base_file)}: "
+              f"{len(delta) / 1024:.0f} KB instead of {len(data) / 1024:.0f} KB")
+        return delta
+
+    def collect_command(self, session, hostname, cmd, collected, deadline=None):
+        """Collect one COMMANDS entry - plain, or tiered/chunked for the route table"""
+        if cmd == SECTION_COMMANDS['routes']:
+            summary = collected.get(SECTION_COMMANDS['route_summary'])
+            output = None
+            if self.tiered_routes:
+                output = self.collect_routes_tiered(session, hostname, summary, deadline)
+            if output is None and self.chunked_routes:
+                output = self.collect_routes_chunked(session, hostname, summary, deadline)
+            if output is not None:
+                return output
+        return self.run_command(session, cmd, deadline=deadline)
+
+    def collect_routes_tiered(self, session, hostname, post_summary_output, deadline=None):
+        """Fetch full route tables only for VRFs whose summary changed
+
+        The POST route summary is compared per VRF with the latest PRE
+        snapshot. Changed, new and forced VRFs are fetched one by one with
+        'show ip route vrf <name>'; the others get a ROUTES UNCHANGED mark.
+        Returns None when there is nothing to compare against or the POST
+        summary lists no VRF, so the caller falls back to the full table.
+        """
+        if post_summary_output is None:
+            return None
+
+        pre_file = self.get_latest_file(PRE_DIR, hostname)
+        if not pre_file:
+            return None
+        pre_summary_output = self.read_command_output(pre_file, SECTION_COMMANDS['route_summary'])
+        if pre_summary_output is None:
+            return None
+
+        pre = {'route_summary': {}}
+        post = {'route_summary': {}}
+        self.parse_command_output(SECTION_COMMANDS['route_summary'], pre_summary_output, pre)
+        self.parse_command_output(SECTION_COMMANDS['route_summary'], post_summary_output, post)
+        if not post['route_summary']:
+            # Empty or unparsed summary: no VRF list, collect the full table
+            return None
+        pre_timestamp = self.read_timestamp(pre_file)
+
+        changed = [vrf for vrf, counts in post['route_summary'].items()
+                   if vrf in self.full_route_vrfs or pre['route_summary'].get(vrf) != counts]
+        unchanged = [vrf for vrf in post['route_summary'] if vrf not in changed]
+
+        with self.print_lock:
+            print(f"[{hostname}] Tiered routes: {len(changed)} VRF(s) to collect, "
+                  f"{len(unchanged)} unchanged since PRE")
+
+        chunks = [self.fetch_route_vrfs(session, hostname, changed, deadline)]
+        for vrf in unchanged:
+            chunks.append(f"ROUTES UNCHANGED: VRF {vrf} | PRE {pre_timestamp}")
+        return '\n'.join(chunks)
+
+    def collect_routes_chunked(self, session, hostname, summary_output, deadline=None):
+        """Fetch the route table one VRF at a time
+
+        VRFs come from the route summary, or 'show vrf' if the summary is
+        not available. Returns None when no VRF list could be obtained, so
+        the caller falls back to 'show ip route vrf all'.
+        """
+        vrfs = []
+        if summary_output is not None:
+            parsed = {'route_summary': {}}
+            self.parse_command_output(SECTION_COMMANDS['route_summary'], summary_output, parsed)
+            vrfs = list(parsed['route_summary'])
+        if not vrfs:
+            try:
+                vrfs = self.parse_vrf_names(self.run_command(session, "show vrf", deadline=deadline))
+            except DeadlineExceeded:
+                raise
+            except CollectionError:
+                vrfs = []
+        if not vrfs:
+            return None
+        return self.fetch_route_vrfs(session, hostname, vrfs, deadline)
+
+    def fetch_route_vrfs(self, session, hostname, vrfs, deadline=None):
+        """Run 'show ip route vrf <name>' per VRF, each with its own retries
+
+        A VRF that still fails gets a ROUTES FAILED mark so that a hiccup
+        costs one VRF instead of the whole table.
+        """
+        chunks = []
+        for idx, vrf in enumerate(vrfs, 1):
+            try:
+                chunks.append(self.run_command(session, f"show ip route vrf {vrf}", deadline=deadline))
+            except DeadlineExceeded:
+                raise
+            except CollectionError as e:
+                chunks.append(f"ROUTES FAILED: VRF {vrf} | {str(e)}")
+                with self.print_lock:
+                    print(f"[{hostname}] WARNING: routes of VRF {vrf} failed: {str(e)}")
+            if len(vrfs) > 1:
+                self.print_progress_bar(idx, len(vrfs), f"Routes: VRF {vrf}", hostname)
+        return '\n'.join(chunks)
+
+    def parse_vrf_names(self, output):
+        """VRF names from 'show vrf' (first column, header skipped)"""
+        vrfs = []
+        for line in output.split('\n'):
+            parts = line.split()
+            if parts and parts[0] != 'VRF-Name' and len(parts) >= 3:
+                vrfs.append(parts[0])
+        return vrfs
+
+    def print_failures(self):
+        """Print devices that could not be fully collected"""
+        if not self.failures:
+            return
+        print(f"\nCOLLECTION FAILURES ({len(self.failures)}):")
+        for hostname, reason in self.failures.items():
+            print(f"  ! {hostname}: {reason}")
@@ -0,0 +1,520 @@
+"""PRE/POST comparison of parsed sections"""
+
+from .config import ROUTE_PATH_BUDGET
+from .parsing import format_prefix, resolve_paths
+from .records import InterfaceState, Adjacency, neighbor_states
+
+
+class ComparisonMixin:
+    """One compare_* method per report section, each returning its issues"""
+
+    def compare_failures(self, pre, post, f, commands=None):
+        """Report commands recorded as FAILED during collection"""
+        issues = []
+        pre_failures = {cmd: reason for cmd, reason in pre.get('failures', {}).items()
+                        if commands is None or cmd in commands}
+        post_failures = {cmd: reason for cmd, reason in post.get('failures', {}).items()
+                         if commands is None or cmd in commands}
+        if not pre_failures and not post_failures:
+            return issues
+
+        f.write("COLLECTION FAILURES:\n")
+        f.write("-"*80 + "\n")
+        for label, failures in (("PRE", pre_failures), ("POST", post_failures)):
+            for cmd, reason in failures.items():
+                f.write(f"  ! {label} '{cmd}': {reason}\n")
+                issues.append(f"Command FAILED in {label}: {cmd} ({reason})")
+        f.write("\n")
+        return issues
+
+    def compare_version(self, pre, post, f):
+        """Compare NX-OS version - unchanged version is an issue after upgrade"""
+        issues = []
+        pre_ver = pre.get('version', 'Unknown')
+        post_ver = post.get('version', 'Unknown')
+        if pre_ver != post_ver:
+            f.write(f"  CHANGED: {pre_ver} -> {post_ver}\n")
+        else:
+            f.write(f"  UNCHANGED: {pre_ver}\n")
+            if pre_ver != 'Unknown':
+                issues.append(f"Version NOT changed - still {pre_ver}")
+        return issues
+
+    def compare_interfaces(self, pre, post, f):
+        """Compare interfaces - status and VLAN with ALL state changes"""
+        issues = []
+        pre_intf = pre.get('interfaces', {})
+        post_intf = post.get('interfaces', {})
+
+        down_intfs = []
+        up_intfs = []
+        status_changed = []
+        vlan_changed = []
+        removed_intfs = []
+        added_intfs = []
+
+        # Check interfaces from PRE
+        for intf, pre_data in pre_intf.items():
+            post_data = post_intf.get(intf)
+
+            if not post_data:
+                removed_intfs.append(intf)
+                issues.append(f"Interface REMOVED: {intf}")
+                continue
+
+            # Handle old formats (string, dict) as well as records
+            pre_state = InterfaceState.coerce(pre_data)
+            post_state = InterfaceState.coerce(post_data)
+            pre_status, pre_vlan = pre_state.status, pre_state.vlan
+            post_status, post_vlan = post_state.status, post_state.vlan
+
+            # Check for ANY status change
+            if pre_status != post_status:
+                # Went DOWN (connected → not connected)
+                if 'connected' in pre_status.lower() and 'connected' not in post_status.lower():
+                    down_intfs.append(f"{intf}: {pre_status} -> {post_status}")
+                    issues.append(f"Interface DOWN: {intf}")
+                # Came UP (not connected → connected)
+                elif 'connected' not in pre_status.lower() and 'connected' in post_status.lower():
+                    up_intfs.append(f"{intf}: {pre_status} -> {post_status}")
+                    # Note: UP is good news, not an issue
+                # Other status change
+                else:
+                    status_changed.append(f"{intf}: {pre_status} -> {post_status}")
+
+            # Check if VLAN changed
+            if pre_vlan != post_vlan:
+                vlan_changed.append(f"{intf}: VLAN {pre_vlan} -> {post_vlan}")
+                issues.append(f"Interface VLAN changed: {intf} ({pre_vlan} -> {post_vlan})")
+
+        # Check for ADDED interfaces (in POST but not in PRE)
+        for intf in post_intf:
+            if intf not in pre_intf:
+                added_intfs.append(intf)
+                issues.append(f"Interface ADDED: {intf}")
+
+        # Write results
+        if removed_intfs:
+            f.write(f"  INTERFACES REMOVED ({len(removed_intfs)}):\n")
+            for intf in removed_intfs:
+                f.write(f"    ! {intf}\n")
+
+        if added_intfs:
+            f.write(f"  INTERFACES ADDED ({len(added_intfs)}):\n")
+            for intf in added_intfs:
+                f.write(f"    + {intf}\n")
+
+        if down_intfs:
+            f.write(f"  INTERFACES WENT DOWN ({len(down_intfs)}):\n")
+            for intf in down_intfs:
+                f.write(f"    ! {intf}\n")
+
+        if up_intfs:
+            f.write(f"  INTERFACES CAME UP ({len(up_intfs)}):\n")
+            for intf in up_intfs:
+                f.write(f"    + {intf}\n")
+
+        if status_changed:
+            f.write(f"  INTERFACE STATUS CHANGED ({len(status_changed)}):\n")
+            for intf in status_changed:
+                f.write(f"    ~ {intf}\n")
+
+        if vlan_changed:
+            f.write(f"  INTERFACE VLAN CHANGED ({len(vlan_changed)}):\n")
+            for intf in vlan_changed:
+                f.write(f"    ~ {intf}\n")
+
+        if not (removed_intfs or added_intfs or down_intfs or up_intfs or status_changed or vlan_changed):
+            f.write("  OK: No interface changes\n")
+
+        return issues
+
+    def compare_bgp(self, pre, post, f, key='bgp', label='BGP'):
+        """Compare BGP with state change detection (key 'bgp6' for IPv6 unicast)"""
+        issues = []
+        pre_bgp = pre.get(key, {})
+        post_bgp = post.get(key, {})
+
+        for vrf in sorted(set(list(pre_bgp.keys()) + list(post_bgp.keys()))):
+            pre_neighbors = neighbor_states(pre_bgp.get(vrf, {}))
+            post_neighbors = neighbor_states(post_bgp.get(vrf, {}))
+
+            vrf_has_issues = False
+
+            # Check for MISSING neighbors
+            missing = [n for n in pre_neighbors if n not in post_neighbors]
+            if missing:
+                f.write(f"  VRF {vrf} - MISSING ({len(missing)}):\n")
+                for n in missing:
+                    f.write(f"    ! {n}\n")
+                    issues.append(f"{label} neighbor MISSING in VRF {vrf}: {n}")
+                vrf_has_issues = True
+
+            # Check for NEW neighbors
+            new = [n for n in post_neighbors if n not in pre_neighbors]
+            if new:
+                f.write(f"  VRF {vrf} - NEW ({len(new)}):\n")
+                for n in new:
+                    f.write(f"    + {n} (state: {post_neighbors[n]})\n")
+                # New neighbors are not issues (good news)
+
+            # Check for state changes
+            state_changes = []
+            down_neighbors = []
+
+            for n in pre_neighbors:
+                if n in post_neighbors:
+                    pre_state = pre_neighbors[n]
+                    post_state = post_neighbors[n]
+
+                    # State changed?
+                    if pre_state != post_state:
+                        # Check if it's a number (Established = shows prefix count)
+                        pre_is_up = pre_state.isdigit()
+                        post_is_up = post_state.isdigit()
+
+                        if pre_is_up and not post_is_up:
+                            # Went DOWN (number → Idle/Active/etc)
+                            state_changes.append(f"    ! {n}: Established ({pre_state} pfx) -> {post_state}")
+                            issues.append(f"{label} neighbor DOWN in VRF {vrf}: {n} (was Established, now {post_state})")
+                            vrf_has_issues = True
+                        elif not pre_is_up and post_is_up:
+                            # Came UP (Idle/Active → number)
+                            state_changes.append(f"    + {n}: {pre_state} -> Established ({post_state} pfx)")
+                            # UP is good news, not an issue
+                        else:
+                            # Other state change (Idle → Active, etc.)
+                            state_changes.append(f"    ~ {n}: {pre_state} -> {post_state}")
+
+                    # Check if currently DOWN (even if no change)
+                    elif post_state in ['Idle', 'Active', 'Connect']:
+                        down_neighbors.append(f"    ! {n} ({post_state})")
+                        issues.append(f"{label} neighbor DOWN in VRF {vrf}: {n}")
+                        vrf_has_issues = True
+
+            if state_changes:
+                f.write(f"  VRF {vrf} - STATE CHANGES ({len(state_changes)}):\n")
+                for change in state_changes:
+                    f.write(change + "\n")
+                vrf_has_issues = True
+
+            if down_neighbors and not state_changes:
+                # Show DOWN neighbors that didn't change state
+                f.write(f"  VRF {vrf} - DOWN ({len(down_neighbors)}):\n")
+                for n in down_neighbors:
+                    f.write(n + "\n")
+
+        if not issues:
+            f.write(f"  OK: No {label} issues\n")
+
+        return issues
+
+    def compare_ospf(self, pre, post, f, key='ospf', label='OSPF'):
+        """Compare OSPF with state change detection (key 'ospf6' for OSPFv3)"""
+        issues = []
+        pre_ospf = pre.get(key, {})
+        post_ospf = post.get(key, {})
+
+        for vrf in sorted(set(list(pre_ospf.keys()) + list(post_ospf.keys()))):
+            pre_neighbors = neighbor_states(pre_ospf.get(vrf, {}))
+            post_neighbors = neighbor_states(post_ospf.get(vrf, {}))
+
+            vrf_has_issues = False
+
+            # Check for MISSING neighbors
+            missing = [n for n in pre_neighbors if n not in post_neighbors]
+            if missing:
+                f.write(f"  VRF {vrf} - MISSING ({len(missing)}):\n")
+                for n in missing:
+                    f.write(f"    ! {n}\n")
+                    issues.append(f"{label} neighbor MISSING in VRF {vrf}: {n}")
+                vrf_has_issues = True
+
+            # Check for NEW neighbors
+            new = [n for n in post_neighbors if n not in pre_neighbors]
+            if new:
+                f.write(f"  VRF {vrf} - NEW ({len(new)}):\n")
+                for n in new:
+                    f.write(f"    + {n} (state: {post_neighbors[n]})\n")
+                # New neighbors are not issues
+
+            # Check for state changes
+            state_changes = []
+            not_full = []
+
+            for n in pre_neighbors:
+                if n in post_neighbors:
+                    pre_state = pre_neighbors[n]
+                    post_state = post_neighbors[n]
+
+                    # State changed?
+                    if pre_state != post_state:
+                        if 'FULL' in pre_state and 'FULL' not in post_state:
+                            # Went DOWN (FULL → other)
+                            state_changes.append(f"    ! {n}: {pre_state} -> {post_state}")
+                            issues.append(f"{label} neighbor went DOWN in VRF {vrf}: {n} ({pre_state} -> {post_state})")
+                            vrf_has_issues = True
+                        elif 'FULL' not in pre_state and 'FULL' in post_state:
+                            # Came UP (other → FULL)
+                            state_changes.append(f"    + {n}: {pre_state} -> {post_state}")
+                            # UP is good news
+                        else:
+                            # Other state change
+                            state_changes.append(f"    ~ {n}: {pre_state} -> {post_state}")
+
+                    # Check if currently NOT FULL (even if no change)
+                    elif 'FULL' not in post_state:
+                        not_full.append(f"    ! {n} ({post_state})")
+                        issues.append(f"{label} neighbor NOT FULL in VRF {vrf}: {n}")
+                        vrf_has_issues = True
+
+            if state_changes:
+                f.write(f"  VRF {vrf} - STATE CHANGES ({len(state_changes)}):\n")
+                for change in state_changes:
+                    f.write(change + "\n")
+                vrf_has_issues = True
+
+            if not_full and not state_changes:
+                # Show NOT FULL neighbors that didn't change state
+                f.write(f"  VRF {vrf} - NOT FULL ({len(not_full)}):\n")
+                for n in not_full:
+                    f.write(n + "\n")
+
+        if not issues:
+            f.write(f"  OK: No {label} issues\n")
+
+        return issues
+
+    def compare_cdp_lldp(self, pre, post, f, protocol):
+        """Compare CDP/LLDP with new neighbor detection"""
+        issues = []
+        pre_set = {Adjacency.coerce(entry) for entry in pre}
+        post_set = {Adjacency.coerce(entry) for entry in post}
+
+        missing = pre_set - post_set
+        new = post_set - pre_set
+
+        if missing:
+            f.write(f"  MISSING {protocol} neighbors ({len(missing)}):\n")
+            for m in sorted(missing, key=str):
+                f.write(f"    ! {m}\n")
+                issues.append(f"{protocol} neighbor MISSING: {m}")
+
+        if new:
+            f.write(f"  NEW {protocol} neighbors ({len(new)}):\n")
+            for n in sorted(new, key=str):
+                f.write(f"    + {n}\n")
+            # New neighbors are not issues
+
+        if not missing and not new:
+            f.write(f"  OK: No {protocol} neighbor changes\n")
+
+        return issues
+
+    def compare_route_summary(self, pre, post, f, key='route_summary', label='Route'):
+        """Compare route summary - only bgp, ospf, static, direct, local per VRF"""
+        issues = []
+        pre_summary = pre.get(key, {})
+        post_summary = post.get(key, {})
+
+        # Get all VRFs from both PRE and POST
+        all_vrfs = sorted(set(list(pre_summary.keys()) + list(post_summary.keys())))
+
+        # Protocols to track
+        protocols = ['bgp', 'ospf', 'static', 'direct', 'local']
+
+        for vrf in all_vrfs:
+            pre_vrf = pre_summary.get(vrf, {})
+            post_vrf = post_summary.get(vrf, {})
+
+            f.write(f"\n  VRF {vrf}:\n")
+
+            vrf_has_changes = False
+            for protocol in protocols:
+                pre_count = pre_vrf.get(protocol, 0)
+                post_count = post_vrf.get(protocol, 0)
+
+                if pre_count != post_count:
+                    vrf_has_changes = True
+                    diff = post_count - pre_count
+                    diff_str = f"+{diff}" if diff > 0 else str(diff)
+                    f.write(f"    {protocol:8}: {pre_count:4} -> {post_count:4} ({diff_str})\n")
+                    issues.append(f"{label} count changed in VRF {vrf}: {protocol} ({pre_count} -> {post_count})")
+                else:
+                    # Show unchanged counts
+                    f.write(f"    {protocol:8}: {pre_count:4} (unchanged)\n")
+
+            if not vrf_has_changes:
+                # No issues for this VRF
+                pass
+
+        if not issues:
+            # All good - can add summary message if needed
+            pass
+
+        return issues
+
+    def compare_routes(self, pre, post, f, key='routes', label='Routes'):
+        """Compare routes and identify added/removed routes (key 'routes6' for IPv6)"""
+        pre_routes = pre.get(key, {})
+        post_routes = post.get(key, {})
+        post_unchanged = post.get(key + '_unchanged', {})
+        failed = dict(pre.get(key + '_failed', {}))
+        failed.update(post.get(key + '_failed', {}))
+        issues = []
+
+        for vrf in sorted(set(list(pre_routes.keys()) + list(post_routes.keys()) +
+                              list(post_unchanged.keys()) + list(failed.keys()))):
+            # Chunked collection: a missing table is a failed chunk, not lost routes
+            if vrf in failed:
+                f.write(f"\n  VRF {vrf}:\n")
+                f.write(f"    NOT COLLECTED: {failed[vrf]}\n")
+                issues.append(f"{label} NOT COLLECTED in VRF {vrf}: {failed[vrf]}")
+                continue
+
+            # Tiered POST: the table was skipped because its summary matched PRE
+            if vrf in post_unchanged and vrf not in post_routes:
+                f.write(f"\n  VRF {vrf}:\n")
+                if post_unchanged[vrf] and post_unchanged[vrf] != pre.get('timestamp'):
+                    f.write(f"    NOT COLLECTED: summary matched another PRE ({post_unchanged[vrf]})\n")
+                    issues.append(f"{label} NOT COLLECTED in VRF {vrf}: compared against PRE {post_unchanged[vrf]}")
+                else:
+                    f.write("    UNCHANGED: route summary identical to PRE (table not collected)\n")
+                continue
+
+            pre_route_list = pre_routes.get(vrf, [])
+            post_route_list = post_routes.get(vrf, [])
+
+            # Convert to sets for comparison
+            pre_set = set(pre_route_list)
+            post_set = set(post_route_list)
+
+            # Find missing and added routes
+            missing_routes = pre_set - post_set
+            added_routes = post_set - pre_set
+
+            pre_count = len(pre_route_list)
+            post_count = len(post_route_list)
+
+            # Display VRF header
+            f.write(f"\n  VRF {vrf}:\n")
+            f.write(f"    Total routes: {pre_count} -> {post_count}\n")
+
+            # Display missing routes - SHOW ALL!
+            if missing_routes:
+                f.write(f"    ROUTES REMOVED ({len(missing_routes)}):\n")
+                for route in sorted(missing_routes):
+                    f.write(f"      - {format_prefix(route)}\n")
+
+                # Add to issues
+                issues.append(f"{label} REMOVED in VRF {vrf}: {len(missing_routes)} route(s)")
+
+            # Display added routes - SHOW ALL!
+            if added_routes:
+                f.write(f"    ROUTES ADDED ({len(added_routes)}):\n")
+                for route in sorted(added_routes):
+                    f.write(f"      + {format_prefix(route)}\n")
+
+            # If no changes
+            if not missing_routes and not added_routes:
+                f.write(f"    OK: No route changes\n")
+
+        return issues
+
+    def compare_route_paths(self, pre, post, f, key='route_paths', family=''):
+        """Compare the paths of routes present in PRE and POST (key 'route_paths6', family 'IPv6')
+
+        Path sets are interned in the tables both snapshots share
+        (RouteInterns), so unchanged routes are skipped with a single
+        integer comparison. VRFs whose table was not collected (tiered
+        ROUTES UNCHANGED, chunked ROUTES FAILED) are listed as not compared.
+        """
+        issues = []
+        prefix_label = f"{family} " if family else ''
+        if pre.get('route_paths_truncated') or post.get('route_paths_truncated'):
+            f.write(f"  SKIPPED: more than {ROUTE_PATH_BUDGET} paths in a snapshot (ROUTE_PATH_BUDGET)\n")
+            return issues
+
+        pre_paths = pre.get(key, {})
+        post_paths = post.get(key, {})
+        pre_interns = pre.get('route_interns')
+        post_interns = post.get('route_interns')
+        shared = pre_interns is post_interns
+        any_change = False
+
+        # Tables not collected: their paths cannot be compared
+        routes_key = key.replace('route_paths', 'routes')
+        not_compared = {vrf: f"unchanged summary since PRE {timestamp or pre.get('timestamp', '')}".rstrip()
+                        for vrf, timestamp in post.get(routes_key + '_unchanged', {}).items()
+                        if vrf not in post_paths}
+        for data in (pre, post):
+            for vrf, reason in data.get(routes_key + '_failed', {}).items():
+                not_compared[vrf] = f"collection failed ({reason})" if reason else "collection failed"
+        for vrf in sorted(not_compared):
+            f.write(f"\n  VRF {vrf}:\n")
+            f.write(f"    NOT COMPARED: {not_compared[vrf]}\n")
+
+        for vrf in sorted((set(pre_paths) & set(post_paths)) - set(not_compared)):
+            pre_vrf = pre_paths[vrf]
+            post_vrf = post_paths[vrf]
+            ecmp_lost = []
+            ecmp_added = []
+            nexthop_changed = []
+            attrs_changed = []
+
+            for prefix, pre_id in pre_vrf.items():
+                post_id = post_vrf.get(prefix)
+                if post_id is None or pre_id is None or (shared and post_id == pre_id):
+                    continue
+
+                before = set(resolve_paths(pre_interns, pre_id))
+                after = set(resolve_paths(post_interns, post_id))
+                if before == after:
+                    continue
+                before_nh = {path[:2] for path in before}
+                after_nh = {path[:2] for path in after}
+                lost = [path for path in before if path[:2] not in after_nh]
+                gained = [path for path in after if path[:2] not in before_nh]
+                lost_text = '; '.join(self.describe_path(path) for path in sorted(lost))
+                gained_text = '; '.join(self.describe_path(path) for path in sorted(gained))
+
+                if lost and gained:
+                    nexthop_changed.append(f"{format_prefix(prefix)}: {lost_text} -> {gained_text}")
+                elif lost:
+                    ecmp_lost.append(f"{format_prefix(prefix)}: {len(before)} -> {len(after)} path(s), lost {lost_text}")
+                elif gained:
+                    ecmp_added.append(f"{format_prefix(prefix)}: {len(before)} -> {len(after)} path(s), new {gained_text}")
+                else:
+                    old_text = '; '.join(self.describe_path(path) for path in sorted(before - after))
+                    new_text = '; '.join(self.describe_path(path) for path in sorted(after - before))
+                    attrs_changed.append(f"{format_prefix(prefix)}: {old_text} -> {new_text}")
+
+            if not (ecmp_lost or ecmp_added or nexthop_changed or attrs_changed):
+                continue
+            any_change = True
+
+            f.write(f"\n  VRF {vrf}:\n")
+            if ecmp_lost:
+                f.write(f"    ECMP PATHS LOST ({len(ecmp_lost)}):\n")
+                for line in ecmp_lost:
+                    f.write(f"      ! {line}\n")
+                issues.append(f"{prefix_label}ECMP paths LOST in VRF {vrf}: {len(ecmp_lost)} route(s)")
+            if nexthop_changed:
+                f.write(f"    NEXT-HOP CHANGED ({len(nexthop_changed)}):\n")
+                for line in nexthop_changed:
+                    f.write(f"      ! {line}\n")
+                issues.append(f"{prefix_label}Next-hop CHANGED in VRF {vrf}: {len(nexthop_changed)} route(s)")
+            if ecmp_added:
+                f.write(f"    ECMP PATHS ADDED ({len(ecmp_added)}):\n")
+                for line in ecmp_added:
+                    f.write(f"      + {line}\n")
+            if attrs_changed:
+                f.write(f"    PATH ATTRIBUTES CHANGED ({len(attrs_changed)}):\n")
+                for line in attrs_changed:
+                    f.write(f"      ~ {line}\n")
+
+        if not any_change:
+            f.write("  OK: No route path changes in the compared VRFs\n" if not_compared else
+                    "  OK: No route path changes\n")
+
+        return issues
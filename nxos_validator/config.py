@@ -0,0 +1,143 @@
+"""Constants shared by collection, parsing, comparison and reporting"""
+
+import re
+
+
+# Directories for data storage
+PRE_DIR = "pre_validation"
+POST_DIR = "post_validation"
+COMPARE_DIR = "comparison"
+
+# NX-OS show commands to execute
+COMMANDS = [
+    "show version",
+    "show interface status",
+    "show ip bgp summary vrf all",
+    "show ip ospf neighbors vrf all",
+    "show cdp neighbors",
+    "show lldp neighbors",
+    "show ip route summary vrf all",
+    "show ip route vrf all",
+    "show bgp ipv6 unicast summary vrf all",
+    "show ospfv3 neighbors vrf all",
+    "show ipv6 route summary vrf all",
+    "show ipv6 route vrf all"
+]
+
+# Report sections and the command each one is parsed from
+SECTION_COMMANDS = {
+    'version': "show version",
+    'interfaces': "show interface status",
+    'bgp': "show ip bgp summary vrf all",
+    'ospf': "show ip ospf neighbors vrf all",
+    'cdp': "show cdp neighbors",
+    'lldp': "show lldp neighbors",
+    'route_summary': "show ip route summary vrf all",
+    'routes': "show ip route vrf all",
+    'bgp6': "show bgp ipv6 unicast summary vrf all",
+    'ospf6': "show ospfv3 neighbors vrf all",
+    'route_summary6': "show ipv6 route summary vrf all",
+    'routes6': "show ipv6 route vrf all"
+}
+
+# Parsed keys filled by another section's command
+DERIVED_SECTIONS = {
+    'routes_unchanged': 'routes',
+    'routes_failed': 'routes',
+    'route_paths': 'routes',
+    'route_path_count': 'routes',
+    'route_paths_truncated': 'routes',
+    'route_paths6': 'routes6',
+    'router_ids': 'bgp',
+    'ospf_addresses': 'ospf',
+    'cdp_remote': 'cdp',
+    'lldp_remote': 'lldp'
+}
+
+# Report sections only compared when explicitly selected
+OPTIONAL_SECTIONS = ['route_paths', 'route_paths6']
+
+ROUTE_PREFIX = re.compile(r'(\d+\.\d+\.\d+\.\d+/\d+)')
+# IPv6 prefixes start the line: '2001:db8:0:1::/64, ubest/mbest: 1/0'
+ROUTE_PREFIX6 = re.compile(r'^([0-9a-fA-F]*:[0-9a-fA-F:.]*/\d+),')
+IPV6_TEXT = re.compile(r'(?:[0-9a-fA-F]{1,4}|:)(?::[0-9a-fA-F]{0,4})*$')
+# One path of a route: '*via 10.0.0.2, Eth1/1, [200/0], 00:50:00, bgp-65000, internal'
+ROUTE_PATH = re.compile(r'\*?via\s+([^,\s]+),\s*(?:([^,\[]+?),\s*)?\[(\d+)/(\d+)\],\s*[^,]*,\s*([^,\s]+)')
+ROUTE_PATH_BUDGET = 4000000    # Paths kept per snapshot; beyond, prefixes only
+
+# Collection budgets (seconds)
+CONNECT_TIMEOUT = 10     # TCP connect + SSH banner, per attempt
+CONNECT_RETRIES = 2      # Extra attempts after a transient SSH error
+COMMAND_RETRIES = 1      # Extra attempts after a failed command
+RETRY_BACKOFF = 2        # Base delay, doubled per attempt, full jitter
+DEVICE_DEADLINE = 600    # Whole collection of one device
+RUN_DEADLINE = 3600      # Whole PRE/POST run
+
+# Convergence wait (POST): re-poll only the commands of sections still failing.
+# Adjacencies only: an interface left down or a route count off by design
+# would otherwise be re-polled until the deadline
+CONVERGENCE_SECTIONS = ('bgp', 'bgp6', 'ospf', 'ospf6', 'cdp', 'lldp')
+CONVERGENCE_DEADLINE = 600   # Seconds to wait for the sections to clear
+CONVERGENCE_BACKOFF = 15     # First re-poll delay, doubled each round
+CONVERGENCE_MAX_DELAY = 120  # Longest delay between two re-polls
+
+# Parallel collection - devices are started longest-expected-first
+WORKERS = 4
+COMPARE_WORKERS = 2              # Pipelined POST: comparisons running beside the collection
+HISTORY_FILE = "collection_history.json"
+COMMAND_OVERHEAD = 0.5           # Fixed cost of one command (round trip to the prompt), seconds
+ESTIMATED_THROUGHPUT = 500000    # Bytes/s used to turn snapshot sizes into seconds
+
+# Reading command output - a command is complete when the prompt comes back
+RECV_BUFFER = 65535
+COMMAND_IDLE_TIMEOUT = 30        # Silence without prompt = incomplete output
+
+# SSH transport (inventory 'transport' block, per site/group/device) - defaults are paramiko's
+TRANSPORT_DEFAULTS = {
+    'window_size': 2097152,      # Channel window: bytes in flight before the device waits for us
+    'max_packet_size': 32768,    # Largest SSH data packet
+    'compression': False,        # zlib, negotiated (falls back to none)
+    'ciphers': [],               # Preferred ciphers first, paramiko's order for the rest
+    'recv_buffer': RECV_BUFFER,  # Bytes read from the channel per call
+    'socket_buffer': None,       # TCP SO_RCVBUF; None keeps the OS autotuning
+}
+MAX_OUTPUT_BYTES = 512 * 1024 * 1024
+
+# NX-OS prompt at the end of the shell output: 'spine1#', 'spine1(config)# '
+PROMPT_PATTERN = re.compile(r'[\w.\-]+(\([\w\-]+\))?[#>]\s*$')
+
+# Snapshot file name: <hostname>_<YYYY-MM-DD_HH-MM-SS>.txt
+SNAPSHOT_NAME = re.compile(r'(.+)_\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}\.txt$')
+
+# Run checkpointing - a snapshot is renamed from .partial once complete
+MANIFEST_FILE = "run_manifest.json"
+PARTIAL_SUFFIX = ".partial"
+
+# Inventory sharding - shard i of n, by hostname hash or by a device tag.
+# Sharded runs write run_manifest_shard<i>of<n>.json and fleet_shard<i>of<n>.json;
+# the catalog and the fleet report are merged from every shard's files.
+TAG_KEYS = ('group', 'site')               # Optional device tags in the inventory
+SHARD_KEYS = ('hostname',) + TAG_KEYS
+CATALOG_FILE = "catalog.json"           # Latest snapshot of each device, in PRE/POST dirs
+FLEET_RESULTS_PREFIX = "fleet_"         # Per-shard verdicts, in COMPARE_DIR
+FLEET_REPORT = "fleet_report.txt"
+
+# Sidecar section index of a snapshot: <snapshot>.txt.idx
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 2
+SECTION_SEPARATOR = b"\n" + b"=" * 80 + b"\nCOMMAND: "
+VRF_HEADER = b"IP Route Table for VRF "
+VRF_HEADER6 = b"IPv6 Routing Table for VRF "
+
+# Prefix index of every snapshot's route tables, in <PRE/POST dir>/prefix_index/:
+# one sorted segment per snapshot, merged into one above PREFIX_SEGMENTS_MAX
+PREFIX_INDEX_DIR = "prefix_index"
+PREFIX_SEGMENTS_MAX = 32
+
+# Delta storage: a snapshot saved as the changes against the device's base
+# (its latest full snapshot). Same .txt name, rebuilt when read.
+DELTA_MAGIC = b"DELTA BASE: "
+DELTA_MAX_RATIO = 0.5    # Delta above this share of the full size: keep it full (new base)
+# Age column of a route path ('*via 10.0.0.2, Eth1/1, [20/0], 00:50:00, bgp-65000'):
+# it changes on every collection, so deltas copy the line and store the age only
+ROUTE_AGE = re.compile(rb'^\s*\*?via [^\[]*\[\d+/\d+\],\s*([^,\s]+),')
@@ -0,0 +1,195 @@
+"""Convergence wait: re-poll only the sections still failing after a reload"""
+
+import os
+import re
+import time
+from datetime import datetime
+
+from .config import (
+    POST_DIR, COMPARE_DIR, SECTION_SEPARATOR, CONVERGENCE_SECTIONS, CONVERGENCE_DEADLINE,
+    CONVERGENCE_BACKOFF, CONVERGENCE_MAX_DELAY, WORKERS
+)
+from .collection import CollectionError
+from .scheduler import DeviceScheduler
+from .delta import split_sections, read_snapshot_bytes
+from .snapshot import SnapshotReader
+from .transport import device_transport
+
+
+class ConvergenceMixin:
+    """Right after a reload BGP/OSPF adjacencies are still coming up: instead
+    of re-collecting the fleet, re-run only the commands behind the failing
+    sections on the affected devices until they clear or the deadline expires
+    """
+
+    def failing_sections(self, result):
+        """Sections of one comparison result worth re-polling"""
+        return {section for section, issues in result.get('sections', {}).items()
+                if issues and section in CONVERGENCE_SECTIONS}
+
+    def wait_convergence(self, results, budget=CONVERGENCE_DEADLINE, output_dir=POST_DIR,
+                         report_dir=COMPARE_DIR):
+        """Re-poll failing sections with backoff, then re-compare the re-polled devices
+
+        results maps hostname -> comparison result with its 'sections'
+        issues (ComparePipeline). Updated results are returned; devices
+        never re-polled keep theirs.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        devices = {device['hostname']: device for device in self.devices}
+        pending = {hostname: self.failing_sections(result) for hostname, result in results.items()
+                   if hostname in devices}
+        pending = {hostname: sections for hostname, sections in pending.items() if sections}
+        if not pending:
+            print("[INFO] Convergence: nothing to re-poll")
+            return results
+
+        deadline = time.monotonic() + budget
+        repolled = set()
+        attempt = 0
+        while pending:
+            left = self.remaining(deadline)
+            delay = min(CONVERGENCE_BACKOFF * (2 ** attempt), CONVERGENCE_MAX_DELAY)
+            if left <= delay:
+                break
+            print(f"\n[INFO] Convergence: {len(pending)} device(s) still failing, "
+                  f"re-polling in {delay}s ({left:.0f}s left)")
+            for hostname in sorted(pending):
+                print(f"  - {hostname}: {', '.join(sorted(pending[hostname]))}")
+            time.sleep(delay)
+
+            # Same scheduler as collect_all, so re-polls respect the group/site caps
+            rechecked = {}
+            scheduler = DeviceScheduler([devices[hostname] for hostname in sorted(pending)],
+                                        self.concurrency_limits)
+            workers = max(1, min(WORKERS, len(pending)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(self.recheck_worker, scheduler, results, pending, output_dir,
+                                       report_dir, deadline, rechecked)
+                           for _ in range(workers)]
+                for future in futures:
+                    future.result()
+            for hostname in sorted(rechecked):
+                still_failing = rechecked[hostname]
+                if still_failing is None:
+                    continue
+                repolled.add(hostname)
+                cleared = pending[hostname] - still_failing
+                if cleared:
+                    print(f"[{hostname}] CONVERGED: {', '.join(sorted(cleared))}")
+                pending[hostname] = still_failing
+            pending = {hostname: sections for hostname, sections in pending.items() if sections}
+            attempt += 1
+
+        if pending:
+            print("\n[WARNING] Not converged before the deadline:")
+            for hostname in sorted(pending):
+                print(f"  ! {hostname}: {', '.join(sorted(pending[hostname]))}")
+        else:
+            print("\n[INFO] Convergence: all re-polled sections cleared")
+
+        # Full reports for the re-polled devices, from their latest snapshot
+        for hostname in sorted(repolled):
+            result = results[hostname]
+            sections = {}
+            issues = self.compare_data(result['pre'], result['post'], hostname, report_dir=report_dir,
+                                       quiet=True, section_issues=sections)
+            results[hostname] = dict(result, issues=issues, sections=sections)
+            verdict = f"ISSUES ({len(issues)})" if issues else "OK"
+            print(f"[{hostname}] VERDICT: {verdict} - {result['report']}")
+        if repolled:
+            self.merge_catalog(output_dir)
+        return results
+
+    def recheck_worker(self, scheduler, results, pending, output_dir, report_dir, deadline, rechecked):
+        """Worker loop: re-check devices handed out by the scheduler until none is left"""
+        while True:
+            device = scheduler.next_device()
+            if device is None:
+                return
+            hostname = device['hostname']
+            try:
+                rechecked[hostname] = self.recheck_device(device, results[hostname], pending[hostname],
+                                                          output_dir, report_dir, deadline)
+            except Exception as e:
+                # One broken device must not abort the wait for the others
+                print(f"[{hostname}] ERROR: re-poll failed: {str(e)}")
+                rechecked[hostname] = None
+            finally:
+                scheduler.release(device)
+
+    def recheck_device(self, device, result, sections, output_dir, report_dir, deadline):
+        """Re-poll sections on one device and compare them again
+
+        Returns the sections still failing (updating result['post']), or
+        None when the device could not be re-polled.
+        """
+        hostname = device['hostname']
+        commands = list(dict.fromkeys(self.section_command(section) for section in sorted(sections)))
+        post_file = self.repoll_device(device, commands, result['post'], output_dir, deadline)
+        if not post_file:
+            return None
+        result['post'] = post_file
+
+        found = {}
+        self.compare_data(result['pre'], post_file, hostname, sections, report_dir=report_dir, quiet=True,
+                          section_issues=found)
+        return {section for section in sections if found.get(section)}
+
+    def repoll_device(self, device, commands, post_file, output_dir, deadline=None):
+        """Run commands again on a device and save a new POST snapshot
+
+        The other sections are copied from post_file, so the new snapshot
+        is complete. Returns its path, None if the device could not be
+        re-polled.
+        """
+        hostname = device['hostname']
+        options = device_transport(device, self.transport)
+        ssh = self.connect_device(device['ip'], hostname, deadline, port=device.get('port', 22), options=options)
+        if not ssh:
+            return None
+
+        outputs = {}
+        try:
+            session = self.open_session(ssh, deadline, recv_buffer=options['recv_buffer'])
+            if not self.validate_hostname(session, hostname, deadline):
+                return None
+            for command in commands:
+                try:
+                    outputs[command] = self.run_command(session, command, deadline=deadline)
+                except CollectionError as e:
+                    print(f"[{hostname}] WARNING: re-poll of '{command}' failed: {str(e)}")
+        except CollectionError as e:
+            print(f"[{hostname}] ERROR: {str(e)}")
+            return None
+        finally:
+            ssh.close()
+        if not outputs:
+            return None
+
+        header, chunks, order = split_sections(read_snapshot_bytes(post_file))
+        for command, output in outputs.items():
+            key = command.encode('utf-8')
+            if key not in chunks:
+                order.append(key)
+            chunks[key] = (SECTION_SEPARATOR + key + b"\n" + b"=" * 80 + b"\n" +
+                           output.encode('utf-8') + b"\n")
+
+        # New timestamp, and a note of what was re-polled
+        now = datetime.now()
+        stamp = (f"TIMESTAMP: {now.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                 f"REPOLLED: {', '.join(outputs)} (other sections from {os.path.basename(post_file)})")
+        header = re.sub(rb'^TIMESTAMP:.*$', lambda match: stamp.encode('utf-8'), header, count=1, flags=re.MULTILINE)
+
+        output_file = os.path.join(output_dir, f"{hostname}_{now.strftime('%Y-%m-%d_%H-%M-%S')}.txt")
+        if os.path.exists(output_file):
+            time.sleep(1)
+            output_file = os.path.join(output_dir, f"{hostname}_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.txt")
+        self.write_snapshot(output_file, header + b"".join(chunks[key] for key in order), hostname)
+        SnapshotReader(output_file).close()  # builds the section index
+        self.index_prefixes(output_file, hostname)
+        if self.manifest:
+            self.checkpoint(hostname, file=output_file)
+        print(f"[{hostname}] Re-polled {len(outputs)} command(s): {output_file}")
+        return output_file
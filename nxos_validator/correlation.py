@@ -0,0 +1,222 @@
+"""Fleet-wide link correlation: both ends of each adjacency, joined by hash
+
+Each device only reports its own side of a link: spine1 sees BGP peer
+10.1.1.2 Idle, leaf3 sees its CDP neighbor on Eth1/49 missing. Joining
+every device's neighbor data on dict indexes (router-ID and interface
+address -> device, link key -> ends) pairs the two sides in one linear
+pass, however large the fleet, so a failed link is reported once with
+both endpoints:
+
+- DOWN on both ends: both devices lost the adjacency
+- ONE-SIDED: one end still sees it up (unidirectional link, stale
+  neighbor, half-open BGP session)
+- not collected: one end has no POST snapshot
+
+BGP peers and OSPF neighbors are resolved to a device through the BGP
+router identifiers and the OSPF neighbor addresses of the whole fleet;
+CDP/LLDP entries name the remote device and port directly. Peers outside
+the inventory are left to the per-device reports.
+"""
+
+import re
+
+
+def normalize_device(name):
+    """'leaf1.dc1.example.com(FDO123)' -> 'leaf1'"""
+    return name.split('(', 1)[0].split('.', 1)[0].lower()
+
+
+def normalize_port(name):
+    """'Ethernet1/49' -> 'eth1/49', so CDP and LLDP spellings agree"""
+    name = name.lower()
+    return re.sub(r'^(ethernet|eth)', 'eth', re.sub(r'^(gigabitethernet|gige|gig)', 'gi', name))
+
+
+def is_up(protocol, state):
+    """Healthy state of one end"""
+    if protocol == 'bgp':
+        return state.isdigit()
+    if protocol in ('ospf', 'ospf6'):
+        return state.upper().startswith('FULL')
+    return True  # CDP/LLDP: listed means up
+
+
+def neighbor_view(snapshot):
+    """The parsed neighbor data of one snapshot needed for correlation"""
+    return {
+        'router_ids': dict(snapshot['router_ids']),
+        'bgp': snapshot['bgp'],
+        'ospf': snapshot['ospf'],
+        'ospf6': snapshot['ospf6'],
+        'ospf_addresses': snapshot['ospf_addresses'],
+        'cdp': snapshot['cdp_remote'],
+        'lldp': snapshot['lldp_remote'],
+    }
+
+
+def address_owners(views):
+    """{(vrf, address): hostname} and {address: hostname} over every view
+
+    Router identifiers come first; OSPF neighbor addresses are then
+    credited to the device owning the neighbor's router-ID. An address
+    claimed by two devices maps to None (ambiguous, never joined).
+    """
+    owners = {}
+    anywhere = {}
+
+    def claim(vrf, address, hostname):
+        for index, key in ((owners, (vrf, address)), (anywhere, address)):
+            if index.get(key, hostname) != hostname:
+                index[key] = None
+            else:
+                index[key] = hostname
+
+    for hostname, view in views:
+        for vrf, router_id in view['router_ids'].items():
+            claim(vrf, router_id, hostname)
+    for hostname, view in views:
+        for vrf, addresses in view['ospf_addresses'].items():
+            for router_id, address in addresses.items():
+                owner = lookup(owners, anywhere, vrf, router_id)
+                if owner and owner != hostname:
+                    claim(vrf, address, owner)
+    return owners, anywhere
+
+
+def lookup(owners, anywhere, vrf, address):
+    """Device owning address in vrf, else anywhere in the fleet"""
+    key = (vrf, address)
+    return owners[key] if key in owners else anywhere.get(address)
+
+
+def link_index(views, owners, anywhere, fleet):
+    """{link key: {hostname: (up, state)}} - one entry per end seen
+
+    Keys are ('bgp'|'ospf'|'ospf6', vrf, (a, b)) for sessions and
+    ('cdp'|'lldp', ((a, port), (b, port))) for physical links, endpoints
+    sorted so both devices build the same key. Several sessions between
+    the same pair in a VRF share a key; an end is up when all are.
+    """
+    links = {}
+
+    def add(key, hostname, up, state):
+        ends = links.setdefault(key, {})
+        if hostname in ends:
+            previous_up, previous_state = ends[hostname]
+            if previous_up and not up:
+                ends[hostname] = (up, state)
+            elif not previous_up and not up and state != previous_state:
+                ends[hostname] = (False, f"{previous_state}, {state}")
+        else:
+            ends[hostname] = (up, state)
+
+    for hostname, view in views:
+        for protocol in ('bgp', 'ospf', 'ospf6'):
+            for vrf, neighbors in view[protocol].items():
+                for neighbor, state in neighbors.items():
+                    peer = lookup(owners, anywhere, vrf, neighbor)
+                    if not peer or peer == hostname or peer not in fleet:
+                        continue
+                    up = is_up(protocol, state)
+                    add((protocol, vrf, tuple(sorted((hostname, peer)))), hostname, up,
+                        "Established" if protocol == 'bgp' and up else state)
+        for protocol in ('cdp', 'lldp'):
+            for adjacency, remote_port in view[protocol].items():
+                peer = normalize_device(adjacency.device)
+                if peer == hostname or peer not in fleet:
+                    continue
+                ends = tuple(sorted(((hostname, normalize_port(adjacency.port)),
+                                     (peer, normalize_port(remote_port)))))
+                add((protocol, ends), hostname, True, "up")
+    return links
+
+
+def describe_link(key, names=None):
+    """'BGP vrf default: spine1 <-> leaf1' / 'CDP: spine1 eth1/1 <-> leaf1 eth1/49'"""
+    names = names or {}
+    protocol = key[0].upper()
+    if len(key) == 3:
+        a, b = (names.get(hostname, hostname) for hostname in key[2])
+        return f"{protocol} vrf {key[1]}: {a} <-> {b}"
+    (a, port_a), (b, port_b) = key[1]
+    return f"{protocol}: {names.get(a, a)} {port_a} <-> {names.get(b, b)} {port_b}"
+
+
+def link_endpoints(key):
+    """The two devices of a link key"""
+    return key[2] if len(key) == 3 else tuple(hostname for hostname, _ in key[1])
+
+
+class CorrelationMixin:
+    """Pair both ends of every BGP/OSPF/CDP/LLDP adjacency across the fleet"""
+
+    def load_views(self, devices, side):
+        """[(hostname, neighbor view)] of the side ('pre'/'post') snapshot of each device
+
+        Hostnames are normalized like CDP/LLDP device names.
+        """
+        views = []
+        for hostname in sorted(devices):
+            path = devices[hostname].get(side)
+            if not path:
+                continue
+            try:
+                with self.parse_file(path) as snapshot:
+                    views.append((normalize_device(hostname), neighbor_view(snapshot)))
+            except (OSError, ValueError) as e:
+                print(f"[{hostname}] WARNING: skipped in link correlation: {str(e)}")
+        return views
+
+    def correlate_links(self, devices):
+        """Links up on both ends in PRE and failed in POST, one entry per link
+
+        devices maps hostname -> {'pre', 'post'} snapshot paths (fleet
+        results). Returns [(description, {hostname: post state}, verdict)]
+        sorted by description.
+        """
+        pre_views = self.load_views(devices, 'pre')
+        post_views = self.load_views(devices, 'post')
+        fleet = {normalize_device(hostname): hostname for hostname in devices}
+
+        owners, anywhere = address_owners(pre_views + post_views)
+        pre_links = link_index(pre_views, owners, anywhere, fleet)
+        post_links = link_index(post_views, owners, anywhere, fleet)
+        collected = {hostname for hostname, _ in post_views}
+
+        failed = []
+        for key, pre_ends in pre_links.items():
+            endpoints = link_endpoints(key)
+            if len(pre_ends) < 2 or not all(up for up, _ in pre_ends.values()):
+                continue  # Not healthy on both ends before the change
+            post_ends = post_links.get(key, {})
+            states = {}
+            for hostname in endpoints:
+                if hostname not in collected:
+                    states[hostname] = (None, "not collected")
+                else:
+                    states[hostname] = post_ends.get(hostname, (False, "missing"))
+            if all(up for up, _ in states.values()):
+                continue
+            down = [hostname for hostname in endpoints if states[hostname][0] is False]
+            if any(up is None for up, _ in states.values()):
+                verdict = "one end not collected"
+            elif len(down) == len(endpoints):
+                verdict = "DOWN on both ends"
+            else:
+                verdict = f"ONE-SIDED (down on {down[0]} only)"
+            failed.append((describe_link(key, fleet),
+                           {fleet[hostname]: state for hostname, (_, state) in states.items()}, verdict))
+        failed.sort()
+        return failed
+
+    def write_link_section(self, f, devices):
+        """FAILED LINKS section of the fleet report; returns the failed link count"""
+        failed = self.correlate_links(devices)
+        f.write("\nFAILED LINKS (both ends correlated):\n")
+        f.write("-"*80 + "\n")
+        if not failed:
+            f.write("  None\n")
+        for description, states, verdict in failed:
+            ends = ', '.join(f"{hostname}: {state}" for hostname, state in states.items())
+            f.write(f"  ! {description} - {verdict} ({ends})\n")
+        return len(failed)
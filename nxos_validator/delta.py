@@ -0,0 +1,206 @@
+"""Delta-encoded snapshots
+
+A delta snapshot keeps the header of the snapshot it replaces and, for
+each COMMAND section, either 'SAME: <command>' (identical to the base)
+or 'LINES: <n> <command>' followed by n line operations:
+
+    =<start>,<count>    copy lines start..start+count of the base section
+    ~<start>,<count> <age> ...
+                        same, for runs with route path lines that only differ
+                        from the base by their age column: one new age per
+                        line, empty for a line copied as is
+    +<text>             literal line
+
+The base is the device's latest full snapshot in the same directory;
+deltas never chain. Rebuilding gives the original file byte for byte.
+"""
+
+import os
+
+from .config import DELTA_MAGIC, SECTION_SEPARATOR, ROUTE_AGE
+
+
+def split_sections(data):
+    """Snapshot bytes -> (header, {command: raw section}, [commands in order])
+
+    Raw sections start at their separator, so header + sections joined in
+    order is the original file.
+    """
+    first = data.find(SECTION_SEPARATOR)
+    if first < 0:
+        return data, {}, []
+    header = data[:first]
+    sections = {}
+    order = []
+    pos = first
+    while pos >= 0:
+        next_pos = data.find(SECTION_SEPARATOR, pos + len(SECTION_SEPARATOR))
+        chunk = data[pos:next_pos if next_pos >= 0 else len(data)]
+        command_end = chunk.find(b"\n", len(SECTION_SEPARATOR))
+        command = chunk[len(SECTION_SEPARATOR):command_end if command_end >= 0 else len(chunk)].strip()
+        # A repeated command keeps both chunks (only the first is a delta source)
+        key = command if command not in sections else command + b"\0" + str(len(order)).encode()
+        sections[key] = chunk
+        order.append(key)
+        pos = next_pos
+    return header, sections, order
+
+
+def split_age(line):
+    """Route path line -> (line with its age masked, age); other lines -> (line, None)"""
+    match = ROUTE_AGE.match(line)
+    if not match:
+        return line, None
+    return line[:match.start(1)] + b"\0" + line[match.end(1):], match.group(1)
+
+
+def set_age(line, age):
+    """Route path line with its age column replaced"""
+    match = ROUTE_AGE.match(line)
+    return line[:match.start(1)] + age + line[match.end(1):]
+
+
+def line_ops(base_lines, new_lines):
+    """Copy/insert operations turning base_lines into new_lines, in one pass
+
+    Each new line continues the current copy run when it matches the next
+    base line, else starts a run at its first occurrence in the base,
+    else is inserted literally. Linear in the number of lines, and it
+    follows reordered blocks (a VRF moved in the table) as well. Route
+    path lines match regardless of their age column; runs of them are
+    copied with their new ages.
+    """
+    base_keys = [split_age(line)[0] for line in base_lines]
+    first_seen = {}
+    for idx, key in enumerate(base_keys):
+        first_seen.setdefault(key, idx)
+
+    ops = []
+    run_start = run_end = run_ages = None
+
+    def close_run():
+        if run_end is None:
+            return
+        if run_ages is None:
+            ops.append(b"=%d,%d" % (run_start, run_end - run_start))
+        else:
+            ops.append(b"~%d,%d " % (run_start, run_end - run_start) + b" ".join(run_ages))
+
+    for line in new_lines:
+        key, age = split_age(line)
+        if run_end is not None and run_end < len(base_lines) and base_keys[run_end] == key:
+            if base_lines[run_end] == line:
+                if run_ages is not None:
+                    run_ages.append(b"")
+                run_end += 1
+                continue
+            # Only the age differs: the run now carries ages
+            if run_ages is None:
+                run_ages = [b""] * (run_end - run_start)
+            run_ages.append(age)
+            run_end += 1
+            continue
+        idx = first_seen.get(key)
+        close_run()
+        if idx is None:
+            ops.append(b"+" + line)
+            run_start = run_end = run_ages = None
+        else:
+            run_start, run_end = idx, idx + 1
+            run_ages = None if base_lines[idx] == line else [age]
+    close_run()
+    return ops
+
+
+def encode_delta(base_data, new_data, base_name):
+    """Delta of new_data against the full snapshot base_data (both bytes)"""
+    header, sections, order = split_sections(new_data)
+    _, base_sections, _ = split_sections(base_data)
+
+    header_lines = header.split(b"\n")
+    out = [DELTA_MAGIC + base_name.encode('utf-8'), b"HEADER: %d" % len(header_lines)]
+    out.extend(header_lines)
+    for key in order:
+        chunk = sections[key]
+        base_chunk = base_sections.get(key)
+        if base_chunk == chunk:
+            out.append(b"SAME: " + key)
+            continue
+        ops = line_ops(base_chunk.split(b"\n") if base_chunk is not None else [], chunk.split(b"\n"))
+        out.append(b"LINES: %d " % len(ops) + key)
+        out.extend(ops)
+    return b"\n".join(out)
+
+
+def is_delta(data):
+    return data[:len(DELTA_MAGIC)] == DELTA_MAGIC
+
+
+def delta_base_name(data):
+    """File name of the base a delta was taken against"""
+    line_end = data.find(b"\n")
+    return data[len(DELTA_MAGIC):line_end if line_end >= 0 else len(data)].decode('utf-8').strip()
+
+
+def apply_delta(delta_data, base_data):
+    """Rebuild the full snapshot from a delta and its base"""
+    _, base_sections, _ = split_sections(base_data)
+    lines = delta_data.split(b"\n")
+    header_count = int(lines[1].split(b":", 1)[1])
+    out = [b"\n".join(lines[2:2 + header_count])]
+
+    pos = 2 + header_count
+    while pos < len(lines):
+        line = lines[pos]
+        pos += 1
+        if line.startswith(b"SAME: "):
+            out.append(base_sections[line[len(b"SAME: "):]])
+            continue
+        count, _, key = line[len(b"LINES: "):].partition(b" ")
+        base_lines = base_sections[key].split(b"\n") if key in base_sections else []
+        chunk = []
+        for op in lines[pos:pos + int(count)]:
+            if op.startswith(b"+"):
+                chunk.append(op[1:])
+            elif op.startswith(b"~"):
+                span, *ages = op[1:].split(b" ")
+                start = int(span.split(b",")[0])
+                chunk.extend(set_age(line, age) if age else line
+                             for line, age in zip(base_lines[start:start + len(ages)], ages))
+            else:
+                start, length = op[1:].split(b",")
+                chunk.extend(base_lines[int(start):int(start) + int(length)])
+        pos += int(count)
+        out.append(b"\n".join(chunk))
+    return b"".join(out)
+
+
+def base_path(path, delta_data):
+    """Path of the base snapshot of the delta file at path"""
+    return os.path.join(os.path.dirname(path), delta_base_name(delta_data))
+
+
+def read_snapshot_bytes(path):
+    """Full content of a snapshot file, rebuilding it if stored as a delta"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not is_delta(data):
+        return data
+    with open(base_path(path, data), 'rb') as f:
+        return apply_delta(data, f.read())
+
+
+def read_delta_header(path):
+    """First line of a snapshot file if it is a delta, else None"""
+    with open(path, 'rb') as f:
+        line = f.readline()
+    return line if is_delta(line) else None
+
+
+def missing_base(path):
+    """Base path of a delta whose base is gone (it cannot be rebuilt), else None"""
+    header = read_delta_header(path)
+    if header is None:
+        return None
+    base = base_path(path, header)
+    return None if os.path.exists(base) else base
@@ -0,0 +1,69 @@
+"""Inventory sharding: split the device list across collector nodes
+
+Every node computes the same split from the same inventory, without
+talking to the others: shard i of n is a pure function of the device
+list, the shard key and n.
+"""
+
+import hashlib
+
+from .config import SHARD_KEYS
+
+
+def parse_shard(text):
+    """'2/4' -> (2, 4); raises ValueError on anything else"""
+    index, sep, count = text.strip().partition('/')
+    if not sep or not index.isdigit() or not count.isdigit():
+        raise ValueError(f"invalid shard '{text}' (expected i/n, e.g. 2/4)")
+    index, count = int(index), int(count)
+    if not 1 <= index <= count:
+        raise ValueError(f"invalid shard '{text}' (i must be between 1 and n)")
+    return index, count
+
+
+def shard_label(shard):
+    """(2, 4) -> 'shard2of4', used in per-shard file names; '' when not sharded"""
+    if not shard:
+        return ''
+    return f"shard{shard[0]}of{shard[1]}"
+
+
+def stable_hash(value):
+    """Hash that does not change between processes (unlike hash())"""
+    return int.from_bytes(hashlib.sha1(value.encode('utf-8')).digest()[:8], 'big')
+
+
+def untagged_devices(devices, key):
+    """Hostnames without the shard tag (they all land in one '' tag group)"""
+    if key == 'hostname':
+        return []
+    return [device['hostname'] for device in devices if not device.get(key)]
+
+
+def shard_devices(devices, shard, key='hostname'):
+    """Devices belonging to shard (index, count), in inventory order
+
+    key 'hostname': each device goes to hash(hostname) mod n, so adding a
+    device never moves the others. key 'group' / 'site': devices sharing
+    the tag stay on one node; tags are spread largest-first over the least
+    loaded shard so shards get about the same number of devices.
+    """
+    if not shard:
+        return list(devices)
+    if key not in SHARD_KEYS:
+        raise ValueError(f"invalid shard key '{key}' (expected one of: {', '.join(SHARD_KEYS)})")
+    index, count = shard
+
+    if key == 'hostname':
+        return [device for device in devices if stable_hash(device['hostname']) % count == index - 1]
+
+    tags = {}
+    for device in devices:
+        tags.setdefault(str(device.get(key, '')), []).append(device)
+    loads = [0] * count
+    owner = {}
+    for tag in sorted(tags, key=lambda tag: (-len(tags[tag]), tag)):
+        target = min(range(count), key=lambda shard_index: (loads[shard_index], shard_index))
+        owner[tag] = target
+        loads[target] += len(tags[tag])
+    return [device for device in devices if owner[str(device.get(key, ''))] == index - 1]
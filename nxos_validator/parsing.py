@@ -0,0 +1,500 @@
+"""Parsing of saved snapshots into per-section data"""
+
+import os
+import re
+import sys
+import ipaddress
+
+from .config import (
+    SNAPSHOT_NAME, SECTION_COMMANDS, DERIVED_SECTIONS, ROUTE_PREFIX, ROUTE_PREFIX6, IPV6_TEXT,
+    ROUTE_PATH, ROUTE_PATH_BUDGET, DELTA_MAGIC
+)
+from .snapshot import SnapshotReader, LazySnapshot, RouteInterns
+from .delta import read_delta_header, missing_base, delta_base_name, apply_delta
+from .records import InterfaceState, Adjacency
+
+
+def pack_ipv6_prefix(text):
+    """'2001:db8::/64' -> one int: 128-bit network address << 8 | prefix length
+
+    Ints hash and compare faster than prefix strings, take less memory,
+    and sort in address order; different spellings of a prefix are equal.
+    """
+    address, _, length = text.partition('/')
+    head, double, tail = address.partition('::')
+    groups = head.split(':') if head else []
+    if double:
+        tail_groups = tail.split(':') if tail else []
+        groups += ['0'] * (8 - len(groups) - len(tail_groups)) + tail_groups
+    if len(groups) != 8 or not IPV6_TEXT.match(address) or not length.isdigit() or int(length) > 128:
+        # Embedded IPv4, malformed text: let ipaddress decide
+        network = ipaddress.IPv6Network(text, strict=False)
+        return (int(network.network_address) << 8) | network.prefixlen
+    value = 0
+    for group in groups:
+        value = value << 16 | int(group, 16)
+    prefixlen = int(length)
+    value &= ~((1 << (128 - prefixlen)) - 1)
+    return (value << 8) | prefixlen
+
+
+def format_prefix(prefix):
+    """Prefix as stored by the parser -> text ('10.0.0.0/24', '2001:db8::/64')"""
+    if isinstance(prefix, int):
+        return f"{ipaddress.IPv6Address(prefix >> 8)}/{prefix & 0xff}"
+    return prefix
+
+
+def resolve_paths(interns, pathset_id):
+    """Interned path set -> [(nexthop, interface, protocol, pref, metric)] with the texts looked up"""
+    attrs = interns.attrs
+    return [(attrs[nexthop], attrs[interface], attrs[protocol], pref, metric)
+            for nexthop, interface, protocol, pref, metric in interns.pathsets[pathset_id]]
+
+
+def normalize_address(token):
+    """Canonical text of an IPv4/IPv6 address ('fe80::3%Eth1/1' keeps its scope), None if not one"""
+    address, _, scope = token.partition('%')
+    try:
+        text = ipaddress.ip_address(address).compressed
+    except ValueError:
+        return None
+    return f"{text}%{scope}" if scope else text
+
+
+class ParsingMixin:
+    """Snapshot files and command output parsing"""
+
+    def read_command_output(self, path, command, persist_index=True):
+        """Output of one COMMAND section of a snapshot, None if absent or failed"""
+        with SnapshotReader(path, persist_index) as reader:
+            return reader.section(command)
+
+    def read_timestamp(self, path):
+        """TIMESTAMP header of a snapshot"""
+        with SnapshotReader(path) as reader:
+            return reader.timestamp
+
+    def snapshot_hostname(self, path):
+        """Hostname of a snapshot file ('spine1_2024-01-31_10-00-00.txt' -> 'spine1')"""
+        basename = os.path.basename(path)
+        match = SNAPSHOT_NAME.match(basename)
+        if match:
+            return match.group(1)
+        return basename.split('_')[0] if '_' in basename else basename.replace('.txt', '')
+
+    def snapshot_hostnames(self, directory):
+        """Hostnames with at least one snapshot in directory, sorted"""
+        if not os.path.exists(directory):
+            return []
+        return sorted({self.snapshot_hostname(f) for f in os.listdir(directory) if f.endswith('.txt')})
+
+    def snapshot_files(self, directory, hostname):
+        """Timestamped snapshot names of exactly hostname in directory (not 'leaf1_a' for 'leaf1')"""
+        files = []
+        for name in os.listdir(directory):
+            match = SNAPSHOT_NAME.match(name)
+            if match and match.group(1) == hostname:
+                files.append(name)
+        return files
+
+    def get_latest_file(self, directory, hostname):
+        """Get the most recent file for a given hostname"""
+        if not os.path.exists(directory):
+            return None
+
+        # Find all files matching hostname pattern
+        files = self.snapshot_files(directory, hostname)
+
+        if not files:
+            # Try without timestamp (backward compatibility)
+            old_pattern = f"{hostname}.txt"
+            if os.path.exists(os.path.join(directory, old_pattern)):
+                return os.path.join(directory, old_pattern)
+            return None
+
+        # Sort by filename (timestamp is in filename) and get the latest
+        files.sort(reverse=True)
+        # A delta whose base was deleted cannot be rebuilt: use the previous snapshot
+        for name in files:
+            path = os.path.join(directory, name)
+            base = missing_base(path)
+            if base is None:
+                return path
+            print(f"[{hostname}] WARNING: {path} skipped - its base {base} is missing")
+        return None
+
+    def get_base_file(self, directory, hostname, exclude=None):
+        """Latest full (not delta) snapshot of hostname, the base of new deltas"""
+        if not os.path.exists(directory):
+            return None
+        files = sorted(self.snapshot_files(directory, hostname), reverse=True)
+        for name in files:
+            path = os.path.join(directory, name)
+            if path != exclude and read_delta_header(path) is None:
+                return path
+        return None
+
+    def empty_data(self):
+        """Parsed snapshot with every section empty"""
+        return {
+            'timestamp': '',
+            'version': '',
+            'interfaces': {},
+            'bgp': {},
+            'ospf': {},
+            'cdp': [],
+            'lldp': [],
+            'routes': {},
+            'route_summary': {},
+            'routes_unchanged': {},
+            'routes_failed': {},
+            'route_paths': {},
+            'route_path_count': 0,
+            'route_paths_truncated': False,
+            'bgp6': {},
+            'ospf6': {},
+            'route_summary6': {},
+            'routes6': {},
+            'route_paths6': {},
+            'router_ids': {},
+            'ospf_addresses': {},
+            'cdp_remote': {},
+            'lldp_remote': {},
+            'failures': {}
+        }
+
+    def section_command(self, section):
+        """Command a report section is parsed from"""
+        return SECTION_COMMANDS[DERIVED_SECTIONS.get(section, section)]
+
+    def parse_file(self, path, interns=None):
+        """Lazily parse a saved snapshot through its section index
+
+        Sections are read with mmap and parsed only when accessed. Close the
+        returned snapshot (or use it as a context manager) when done.
+        Snapshots compared with each other must share interns (RouteInterns).
+        """
+        reader = SnapshotReader(path)
+        return LazySnapshot(self, reader.section, reader.timestamp, reader.failures,
+                            reader=reader, commands=reader.commands(), interns=interns)
+
+    def parse_data(self, content, directory=None, interns=None):
+        """Lazily parse data from saved file content
+
+        The content is only split into command sections here; each section
+        is parsed the first time it is accessed. Delta content is rebuilt
+        from its base, looked up in directory (the directory the content was
+        read from), which is then required.
+        """
+        if content.startswith(DELTA_MAGIC.decode('utf-8')):
+            if directory is None:
+                raise ValueError("delta snapshot content: pass the directory holding its base")
+            delta = content.encode('utf-8')
+            with open(os.path.join(directory, delta_base_name(delta)), 'rb') as f:
+                content = apply_delta(delta, f.read()).decode('utf-8', errors='ignore')
+
+        timestamp = ''
+        failures = {}
+        sections = {}
+        commands = []
+
+        lines = content.split('\n')
+        current_command = None
+        command_output = []
+
+        for line in lines:
+            if line.startswith('TIMESTAMP:'):
+                timestamp = line.split(':', 1)[1].strip()
+
+            if line.startswith('COMMAND:'):
+                # Save previous command output
+                if current_command and command_output:
+                    sections[current_command] = '\n'.join(command_output)
+
+                current_command = line.split(':', 1)[1].strip()
+                commands.append(current_command)
+                command_output = []
+            elif current_command:
+                if line.startswith('STATUS: FAILED'):
+                    failures[current_command] = line[len('STATUS: FAILED'):].strip(' -')
+                elif not line.startswith('==='):
+                    command_output.append(line)
+
+        # Save last command
+        if current_command and command_output:
+            sections[current_command] = '\n'.join(command_output)
+
+        return LazySnapshot(self, sections.get, timestamp, failures, commands=commands, interns=interns)
+
+    def parse_command_output(self, command, output, data, interns=None):
+        """Parse specific command output
+
+        Route table paths are interned into interns (RouteInterns), kept in
+        data['route_interns']; data compared with each other should share
+        one (equal ids then mean equal paths). Without it, data gets its own.
+        """
+        if interns is None:
+            interns = data.setdefault('route_interns', RouteInterns())
+        if 'show version' in command:
+            # Extract version
+            for line in output.split('\n'):
+                if 'NXOS' in line.upper():
+                    match = re.search(r'version\s+([\d\.]+\(\d+\))', line, re.IGNORECASE)
+                    if match:
+                        data['version'] = match.group(1)
+                        break
+
+        elif 'show interface status' in command:
+            # Parse interfaces - capture status and vlan
+            # Format: Port Name Status Vlan Duplex Speed Type
+            for line in output.split('\n'):
+                parts = line.split()
+                if len(parts) >= 3 and (parts[0].startswith('Eth') or parts[0].startswith('Vlan') or parts[0].startswith('Lo') or parts[0].startswith('mgmt')):
+                    data['interfaces'][parts[0]] = InterfaceState(
+                        status=parts[2] if len(parts) > 2 else 'unknown',
+                        vlan=parts[3] if len(parts) > 3 else '--'  # Fixed: VLAN is at index 3
+                    )
+
+        elif 'show ip bgp summary vrf all' in command:
+            # Parse BGP
+            current_vrf = None
+            for line in output.split('\n'):
+                if 'VRF' in line and 'address family' in line:
+                    match = re.search(r'VRF\s+(\S+)', line)
+                    if match:
+                        current_vrf = match.group(1).strip(',')
+                        data['bgp'][current_vrf] = {}
+                elif current_vrf and line.startswith('BGP router identifier'):
+                    data['router_ids'][current_vrf] = line.split()[3].strip(',')
+                elif current_vrf and re.match(r'^\d+\.\d+\.\d+\.\d+', line.strip()):
+                    parts = line.split()
+                    if len(parts) >= 1:
+                        # {neighbor: state}, state interned
+                        data['bgp'][current_vrf][parts[0]] = sys.intern(parts[-1])
+
+        elif 'show bgp ipv6 unicast summary vrf all' in command:
+            # Parse BGP IPv6 - a long neighbor address wraps its counters onto the next line
+            current_vrf = None
+            pending = None
+            for line in output.split('\n'):
+                if 'VRF' in line and 'address family' in line:
+                    match = re.search(r'VRF\s+(\S+)', line)
+                    if match:
+                        current_vrf = match.group(1).strip(',')
+                        data['bgp6'][current_vrf] = {}
+                    pending = None
+                elif current_vrf and line.strip():
+                    parts = line.split()
+                    neighbor = None if line[0].isspace() else normalize_address(parts[0])
+                    if neighbor and len(parts) == 1:
+                        pending = neighbor
+                        continue
+                    if neighbor is None and line[0].isspace():
+                        neighbor = pending
+                    if neighbor:
+                        data['bgp6'][current_vrf][neighbor] = sys.intern(parts[-1])
+                    pending = None
+
+        elif 'show ip ospf neighbors vrf all' in command or 'show ospfv3 neighbors vrf all' in command:
+            # Parse OSPF / OSPFv3 - both list neighbors by their 32-bit router ID
+            ospf = data['ospf6' if 'ospfv3' in command else 'ospf']
+            current_vrf = None
+            for line in output.split('\n'):
+                if ('OSPF Process ID' in line or 'OSPFv3 Process ID' in line) and 'VRF' in line:
+                    match = re.search(r'VRF\s+(\S+)', line)
+                    if match:
+                        current_vrf = match.group(1)
+                        ospf[current_vrf] = {}
+                elif current_vrf and re.match(r'^\s*\d+\.\d+\.\d+\.\d+', line):
+                    parts = line.split()
+                    if len(parts) >= 3:
+                        ospf[current_vrf][parts[0]] = sys.intern(parts[2])
+                    if 'ospfv3' not in command and len(parts) >= 6 and re.match(r'\d+\.\d+\.\d+\.\d+$', parts[-2]):
+                        # Neighbor interface address, for fleet correlation
+                        data['ospf_addresses'].setdefault(current_vrf, {})[parts[0]] = parts[-2]
+
+        elif 'show cdp neighbors' in command:
+            # Parse CDP
+            for line in output.split('\n'):
+                if 'Eth' in line or 'mgmt' in line:
+                    parts = line.split()
+                    if len(parts) >= 2:
+                        for i, p in enumerate(parts):
+                            if 'Eth' in p or 'mgmt' in p or 'Gig' in p:
+                                adjacency = Adjacency.make(parts[0], p)
+                                data['cdp'].append(adjacency)
+                                # Remote port is the last column
+                                if i < len(parts) - 1:
+                                    data['cdp_remote'][adjacency] = sys.intern(parts[-1])
+                                break
+
+        elif 'show lldp neighbors' in command:
+            # Parse LLDP
+            for line in output.split('\n'):
+                if 'Eth' in line or 'mgmt' in line:
+                    parts = line.split()
+                    if len(parts) >= 2:
+                        for i, p in enumerate(parts):
+                            if 'Eth' in p or 'mgmt' in p or 'Gig' in p:
+                                adjacency = Adjacency.make(parts[0], p)
+                                data['lldp'].append(adjacency)
+                                # Remote port is the last column
+                                if i < len(parts) - 1:
+                                    data['lldp_remote'][adjacency] = sys.intern(parts[-1])
+                                break
+
+        elif 'show ip route summary vrf all' in command or 'show ipv6 route summary vrf all' in command:
+            # Parse route summary - only bgp, ospf, static, direct, local
+            summary = data['route_summary6' if 'ipv6' in command else 'route_summary']
+            current_vrf = None
+            for line in output.split('\n'):
+                if 'IP Route Table for VRF' in line or 'IPv6 Routing Table for VRF' in line:
+                    match = re.search(r'VRF\s+"?(\S+)"?', line)
+                    if match:
+                        current_vrf = match.group(1).strip('"')
+                        summary[current_vrf] = {}
+                elif current_vrf and ':' in line:
+                    line_stripped = line.strip()
+                    if (line_stripped.startswith('bgp-') or line_stripped.startswith('ospf-') or
+                        line_stripped.startswith('static') or line_stripped.startswith('direct') or
+                        line_stripped.startswith('local')):
+                        # Parse lines like "  bgp-65000      : 20" or "  local          : 12"
+                        parts = line.split(':')
+                        if len(parts) == 2:
+                            protocol = parts[0].strip()
+                            count = parts[1].strip().split()[0]  # Get first value (ignore "None")
+
+                            # Normalize protocol names: bgp-65000 -> bgp, ospf-10 -> ospf
+                            if protocol.startswith('bgp-'):
+                                protocol = 'bgp'
+                            elif protocol.startswith('ospf-'):
+                                protocol = 'ospf'
+
+                            try:
+                                summary[current_vrf][protocol] = int(count)
+                            except ValueError:
+                                pass
+
+        elif 'show ipv6 route vrf all' in command and 'summary' not in command:
+            # Parse IPv6 routes - prefixes kept as packed 128-bit ints
+            current_vrf = None
+            current_prefix = None
+            current_paths = []
+            for line in output.split('\n'):
+                stripped = line.lstrip()
+                if current_prefix is not None and (stripped.startswith('*via') or stripped.startswith('via')):
+                    path = self.parse_route_path(stripped, interns.attrs)
+                    if path:
+                        current_paths.append(path)
+                    continue
+
+                if 'IPv6 Routing Table for VRF' in line:
+                    self.store_route(data, interns.pathsets, current_vrf, current_prefix, current_paths, 'routes6', 'route_paths6')
+                    current_prefix = None
+                    match = re.search(r'VRF\s+"?(\S+)"?', line)
+                    if match:
+                        current_vrf = match.group(1).strip('"')
+                        if current_vrf not in data['routes6']:
+                            data['routes6'][current_vrf] = []
+                elif current_vrf and '/' in line:
+                    match = ROUTE_PREFIX6.match(line)
+                    if match:
+                        try:
+                            prefix = pack_ipv6_prefix(match.group(1))
+                        except ValueError:
+                            continue
+                        self.store_route(data, interns.pathsets, current_vrf, current_prefix, current_paths, 'routes6', 'route_paths6')
+                        current_prefix = prefix
+                        current_paths = []
+
+            self.store_route(data, interns.pathsets, current_vrf, current_prefix, current_paths, 'routes6', 'route_paths6')
+
+        elif 'show ip route vrf all' in command and 'summary' not in command:
+            # Parse routes - each prefix once, with all of its paths
+            current_vrf = None
+            current_prefix = None
+            current_paths = []
+            for line in output.split('\n'):
+                stripped = line.lstrip()
+                if current_prefix and (stripped.startswith('*via') or stripped.startswith('via')):
+                    path = self.parse_route_path(stripped, interns.attrs)
+                    if path:
+                        current_paths.append(path)
+                    continue
+
+                if line.startswith('ROUTES UNCHANGED:'):
+                    # Tiered collection: VRF not fetched, summary matched PRE
+                    self.store_route(data, interns.pathsets, current_vrf, current_prefix, current_paths)
+                    current_prefix = None
+                    match = re.match(r'ROUTES UNCHANGED: VRF (\S+)(?: \| PRE (.*))?', line)
+                    if match:
+                        data['routes_unchanged'][match.group(1)] = (match.group(2) or '').strip()
+                    current_vrf = None
+                elif line.startswith('ROUTES FAILED:'):
+                    # Chunked collection: this VRF could not be fetched
+                    self.store_route(data, interns.pathsets, current_vrf, current_prefix, current_paths)
+                    current_prefix = None
+                    match = re.match(r'ROUTES FAILED: VRF (\S+)(?: \| (.*))?', line)
+                    if match:
+                        data['routes_failed'][match.group(1)] = (match.group(2) or '').strip()
+                    current_vrf = None
+                elif 'IP Route Table for VRF' in line:
+                    self.store_route(data, interns.pathsets, current_vrf, current_prefix, current_paths)
+                    current_prefix = None
+                    match = re.search(r'VRF\s+"?(\S+)"?', line)
+                    if match:
+                        current_vrf = match.group(1).strip('"')
+                        if current_vrf not in data['routes']:
+                            data['routes'][current_vrf] = []
+                elif current_vrf and '/' in line:
+                    # Look for routes
+                    match = ROUTE_PREFIX.search(line)
+                    if match:
+                        self.store_route(data, interns.pathsets, current_vrf, current_prefix, current_paths)
+                        current_prefix = match.group(1)
+                        current_paths = []
+
+            self.store_route(data, interns.pathsets, current_vrf, current_prefix, current_paths)
+
+    def parse_route_path(self, line, attrs):
+        """'*via 10.0.0.2, Eth1/1, [200/0], 00:50:00, bgp-65000, ...' -> path tuple
+
+        Next-hop, interface and protocol are interned into attrs, the
+        comparison's attribute table: (nexthop_id, interface_id, protocol_id,
+        pref, metric).
+        """
+        match = ROUTE_PATH.match(line)
+        if not match:
+            return None
+        nexthop, interface, pref, metric, protocol = match.groups()
+        intern = attrs.intern
+        return (intern(nexthop), intern((interface or '').strip()), intern(protocol),
+                int(pref), int(metric))
+
+    def store_route(self, data, pathsets, vrf, prefix, paths, routes_key='routes', paths_key='route_paths'):
+        """Record a prefix once, with its path set interned into pathsets
+
+        Past ROUTE_PATH_BUDGET paths per snapshot (both address families),
+        prefixes are still recorded but their paths are dropped and the
+        snapshot is flagged.
+        """
+        if vrf is None or prefix is None:
+            return
+        vrf_paths = data[paths_key].setdefault(vrf, {})
+        if prefix in vrf_paths:
+            return
+        data[routes_key][vrf].append(prefix)
+
+        if data['route_paths_truncated'] or data['route_path_count'] + len(paths) > ROUTE_PATH_BUDGET:
+            data['route_paths_truncated'] = True
+            vrf_paths[prefix] = None
+            return
+        data['route_path_count'] += len(paths)
+        vrf_paths[prefix] = pathsets.intern(tuple(sorted(paths)))
+
+    def describe_path(self, path):
+        """Resolved path (resolve_paths) -> 'via 10.0.0.2, Eth1/1, bgp-65000 [200/0]'"""
+        nexthop, interface, protocol, pref, metric = path
+        via = nexthop + (f", {interface}" if interface else "")
+        return f"via {via}, {protocol} [{pref}/{metric}]"
@@ -0,0 +1,59 @@
+"""Pipelined POST: each device is compared as soon as its snapshot is written"""
+
+import os
+import threading
+
+from .config import PRE_DIR, COMPARE_DIR, COMPARE_WORKERS
+
+
+class ComparePipeline:
+    """Compares collected POST snapshots against the latest PRE on its own
+    worker pool, while the collection workers move on to the next device
+
+    submit() is called by the collection workers; each verdict is printed
+    as soon as it is known. close() waits for the queued comparisons and
+    returns {hostname: result} for save_fleet_results().
+    """
+
+    def __init__(self, validator, sections=None, pre_dir=PRE_DIR, report_dir=COMPARE_DIR,
+                 workers=COMPARE_WORKERS):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.validator = validator
+        self.sections = sections
+        self.pre_dir = pre_dir
+        self.report_dir = report_dir
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.results = {}
+        self.lock = threading.Lock()
+
+    def submit(self, hostname, post_file):
+        """Queue the comparison of a freshly collected snapshot"""
+        self.pool.submit(self.compare, hostname, post_file)
+
+    def compare(self, hostname, post_file):
+        """Compare one device and print its verdict"""
+        pre_file = self.validator.get_latest_file(self.pre_dir, hostname)
+        if not pre_file:
+            print(f"[{hostname}] WARNING: No PRE data found - not compared")
+            return
+        sections = {}
+        try:
+            issues = self.validator.compare_data(pre_file, post_file, hostname, self.sections,
+                                                 report_dir=self.report_dir, quiet=True, section_issues=sections)
+        except Exception as e:
+            print(f"[{hostname}] ERROR: comparison failed: {str(e)}")
+            return
+
+        report_file = os.path.join(self.report_dir, f"{hostname}_report.txt")
+        with self.lock:
+            self.results[hostname] = {'pre': pre_file, 'post': post_file, 'report': report_file, 'issues': issues,
+                                      'sections': sections}
+        verdict = f"ISSUES ({len(issues)})" if issues else "OK"
+        print(f"[{hostname}] VERDICT: {verdict} - {report_file}")
+
+    def close(self):
+        """Wait for the queued comparisons, return the verdicts"""
+        self.pool.shutdown(wait=True)
+        with self.lock:
+            return dict(self.results)
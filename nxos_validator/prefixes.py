@@ -0,0 +1,462 @@
+"""Prefix index of every snapshot: exact, longest-match and covered-by lookups
+
+The route tables of each snapshot (IPv4 and IPv6, every VRF) are reduced
+to fixed-size records sorted by (family, address, length):
+
+    family (1) | address as 128-bit int (16) | length (1) | snapshot id (4) | VRF id (4)
+
+A segment is one sorted record array (<name>.seg, memory-mapped) and a
+JSON sidecar naming its snapshots and VRFs (<name>.json, written last).
+Collection adds one segment per new snapshot; past PREFIX_SEGMENTS_MAX
+segments they are merged into one at the end of the run. A lookup is a
+binary search per segment:
+
+- exact: the records of one key
+- longest match: one exact probe per prefix length, longest first
+- covered by: the key range from the network to its last address
+
+Segments live in <PRE/POST dir>/prefix_index/ and are named after their
+snapshot, so shards sharing a directory never write the same file.
+
+    python nxos_validator_simple.py prefix 10.1.0.0/24
+    python nxos_validator_simple.py prefix --longest 10.1.0.7
+    python nxos_validator_simple.py prefix --covered 10.0.0.0/8
+"""
+
+import os
+import re
+import json
+import mmap
+import time
+import heapq
+import bisect
+import socket
+import struct
+import ipaddress
+from datetime import datetime
+
+from .config import (
+    PRE_DIR, POST_DIR, SECTION_COMMANDS, ROUTE_PREFIX, ROUTE_PREFIX6, SNAPSHOT_NAME,
+    PREFIX_INDEX_DIR, PREFIX_SEGMENTS_MAX
+)
+from .parsing import pack_ipv6_prefix
+from .snapshot import SnapshotReader, write_json_atomic
+
+RECORD = struct.Struct('>B16sBII')
+KEY = struct.Struct('>B16sB')
+SEGMENT_VERSION = 2
+ROUTE_MARK = re.compile(rb'^ROUTES (UNCHANGED|FAILED): VRF (\S+)', re.MULTILINE)
+MAX_LENGTH = {4: 32, 6: 128}
+
+
+def route_key(family, address, length):
+    """Sort key of a prefix: family, 128-bit address, length"""
+    return KEY.pack(family, address.to_bytes(16, 'big'), length)
+
+
+def parse_query(text):
+    """'10.1.0.0/24', '2001:db8::/48' or a bare address -> (family, network, length)"""
+    network = ipaddress.ip_network(text.strip(), strict=False)
+    return network.version, int(network.network_address), network.prefixlen
+
+
+def prefix_text(family, address, length):
+    address = ipaddress.IPv4Address(address) if family == 4 else ipaddress.IPv6Address(address)
+    return f"{address}/{length}"
+
+
+def snapshot_prefixes(path):
+    """({(family, address, length, vrf)}, [[family, vrf, reason]]) of a snapshot
+
+    Tables are read VRF by VRF through the section index; paths are
+    skipped. VRFs marked ROUTES UNCHANGED/FAILED have no table to index:
+    they are returned as unresolved ('unchanged' / 'failed'), with vrf '*'
+    when the whole route section failed.
+    """
+    found = set()
+    unresolved = []
+    with SnapshotReader(path) as reader:
+        for family, command in ((4, SECTION_COMMANDS['routes']), (6, SECTION_COMMANDS['routes6'])):
+            if command in reader.failures:
+                unresolved.append([family, '*', 'failed'])
+                continue
+            if command in reader.index['sections']:
+                offset, length = reader.index['sections'][command]
+                for match in ROUTE_MARK.finditer(reader.data, offset, offset + length):
+                    unresolved.append([family, match.group(2).decode('utf-8', errors='ignore'),
+                                       match.group(1).decode().lower()])
+            for vrf in reader.vrfs(command):
+                for line in (reader.vrf_section(command, vrf) or '').split('\n'):
+                    if '/' not in line:
+                        continue
+                    stripped = line.lstrip()
+                    if stripped.startswith('*via') or stripped.startswith('via'):
+                        continue
+                    if family == 4:
+                        match = ROUTE_PREFIX.search(line)
+                        if not match:
+                            continue
+                        address, _, length = match.group(1).partition('/')
+                        try:
+                            value = int.from_bytes(socket.inet_aton(address), 'big')
+                        except OSError:
+                            continue
+                        length = int(length)
+                        if length > 32:
+                            continue
+                        found.add((4, value & ~((1 << (32 - length)) - 1) & 0xffffffff, length, vrf))
+                    else:
+                        match = ROUTE_PREFIX6.match(line)
+                        if not match:
+                            continue
+                        try:
+                            packed = pack_ipv6_prefix(match.group(1))
+                        except ValueError:
+                            continue
+                        found.add((6, packed >> 8, packed & 0xff, vrf))
+    return found, unresolved
+
+
+class Segment:
+    """One sorted record array, with the names of its snapshots and VRFs
+
+    Indexing the segment gives record keys, so bisect works on it directly.
+    """
+
+    def __init__(self, directory, name):
+        self.name = name
+        self.directory = directory
+        with open(os.path.join(directory, name + '.json'), 'r') as f:
+            meta = json.load(f)
+        self.snapshots = meta['snapshots']
+        self.vrfs = meta['vrfs']
+        self.unresolved = meta.get('unresolved', {})  # snapshot -> [[family, vrf, reason]]
+        self.file = open(os.path.join(directory, name + '.seg'), 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        if meta.get('version') != SEGMENT_VERSION or size != meta['records'] * RECORD.size:
+            self.file.close()
+            raise ValueError(f"segment {name} is incomplete or from another version")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.count = meta['records']
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, idx):
+        offset = idx * RECORD.size
+        return self.data[offset:offset + KEY.size]
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def remove(self):
+        """Delete the segment (sidecar first, so readers never see half of it)"""
+        self.close()
+        for suffix in ('.json', '.seg'):
+            try:
+                os.remove(os.path.join(self.directory, self.name + suffix))
+            except OSError:
+                pass
+
+    def scan(self, low, high):
+        """(family, address, length, snapshot, vrf) of the records with low <= key < high"""
+        start = bisect.bisect_left(self, low)
+        end = bisect.bisect_left(self, high, lo=start)
+        for idx in range(start, end):
+            family, address, length, snapshot, vrf = RECORD.unpack_from(self.data, idx * RECORD.size)
+            yield family, int.from_bytes(address, 'big'), length, self.snapshots[snapshot], self.vrfs[vrf]
+
+    def remapped(self, snapshot_ids, vrf_ids):
+        """Every record, with ids translated for a merged segment"""
+        for idx in range(self.count):
+            family, address, length, snapshot, vrf = RECORD.unpack_from(self.data, idx * RECORD.size)
+            yield RECORD.pack(family, address, length, snapshot_ids[snapshot], vrf_ids[vrf])
+
+
+class PrefixIndex:
+    """Prefix index of the snapshots of one directory (PRE or POST)"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, PREFIX_INDEX_DIR)
+
+    def segment_names(self):
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(name[:-len('.json')] for name in os.listdir(self.path) if name.endswith('.json'))
+
+    def open_segments(self):
+        """Complete segments; one being written or merged elsewhere is skipped"""
+        segments = []
+        for name in self.segment_names():
+            try:
+                segments.append(Segment(self.path, name))
+            except (OSError, ValueError, KeyError):
+                continue
+        return segments
+
+    def write_segment(self, name, snapshots, vrfs, records, unresolved=None):
+        """Write sorted records, then the sidecar that makes the segment visible"""
+        os.makedirs(self.path, exist_ok=True)
+        segment_file = os.path.join(self.path, name + '.seg')
+        count = 0
+        with open(segment_file + '.tmp', 'wb') as f:
+            for record in records:
+                f.write(record)
+                count += 1
+        os.replace(segment_file + '.tmp', segment_file)
+        write_json_atomic(os.path.join(self.path, name + '.json'), {
+            'version': SEGMENT_VERSION,
+            'snapshots': snapshots,
+            'vrfs': vrfs,
+            'unresolved': unresolved or {},
+            'records': count
+        })
+        return count
+
+    def add_snapshot(self, snapshot_file):
+        """Index one snapshot as its own segment; returns its prefix count"""
+        name = os.path.basename(snapshot_file)
+        prefixes, unresolved = snapshot_prefixes(snapshot_file)
+        vrfs = sorted({vrf for *_, vrf in prefixes})
+        vrf_ids = {vrf: idx for idx, vrf in enumerate(vrfs)}
+        records = sorted(RECORD.pack(family, address.to_bytes(16, 'big'), length, 0, vrf_ids[vrf])
+                         for family, address, length, vrf in prefixes)
+        return self.write_segment(name, [name], vrfs, records, {name: unresolved} if unresolved else None)
+
+    def update(self):
+        """Index the snapshots of the directory not indexed yet; returns how many"""
+        segments = self.open_segments()
+        indexed = {snapshot for segment in segments for snapshot in segment.snapshots}
+        for segment in segments:
+            segment.close()
+
+        added = 0
+        if os.path.isdir(self.directory):
+            for name in sorted(os.listdir(self.directory)):
+                if not name.endswith('.txt') or name in indexed:
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    self.add_snapshot(path)
+                    added += 1
+                except (OSError, ValueError) as e:
+                    print(f"[WARNING] {path} not indexed: {str(e)}")
+        return added
+
+    def compact(self, threshold=PREFIX_SEGMENTS_MAX):
+        """Merge every segment into one once there are more than threshold
+
+        A streaming k-way merge of the sorted segments: memory stays flat
+        whatever the size of the history.
+        """
+        segments = self.open_segments()
+        if len(segments) <= max(threshold, 1):
+            for segment in segments:
+                segment.close()
+            return False
+
+        snapshots = []
+        vrf_ids = {}
+        unresolved = {}
+        streams = []
+        for segment in segments:
+            snapshot_ids = list(range(len(snapshots), len(snapshots) + len(segment.snapshots)))
+            snapshots.extend(segment.snapshots)
+            unresolved.update(segment.unresolved)
+            streams.append(segment.remapped(snapshot_ids, [vrf_ids.setdefault(vrf, len(vrf_ids))
+                                                           for vrf in segment.vrfs]))
+        name = f"merged_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{os.getpid()}"
+        self.write_segment(name, snapshots, list(vrf_ids),
+                           heapq.merge(*streams, key=lambda record: record[:KEY.size]), unresolved)
+        for segment in segments:
+            segment.remove()
+        return True
+
+    def unresolved(self):
+        """{snapshot: {(family, vrf): 'unchanged'|'failed'}} - VRFs without a table to index"""
+        marks = {}
+        segments = self.open_segments()
+        for segment in segments:
+            for snapshot, entries in segment.unresolved.items():
+                marks[snapshot] = {(family, vrf): reason for family, vrf, reason in entries}
+            segment.close()
+        return marks
+
+    def search(self, ranges, min_length=0):
+        """{(snapshot, vrf, family, address, length)} found in the key ranges
+
+        Snapshots deleted since they were indexed are left out.
+        """
+        existing = set(os.listdir(self.directory)) if os.path.isdir(self.directory) else set()
+        hits = set()
+        segments = self.open_segments()
+        try:
+            for segment in segments:
+                for low, high in ranges:
+                    for family, address, length, snapshot, vrf in segment.scan(low, high):
+                        if length >= min_length and snapshot in existing:
+                            hits.add((snapshot, vrf, family, address, length))
+        finally:
+            for segment in segments:
+                segment.close()
+        return hits
+
+    def exact(self, text):
+        family, network, length = parse_query(text)
+        return self.search([(route_key(family, network, length), route_key(family, network, length + 1))])
+
+    def covered_by(self, text):
+        """The prefix itself and every more specific one"""
+        family, network, length = parse_query(text)
+        last = network | ((1 << (MAX_LENGTH[family] - length)) - 1)
+        return self.search([(route_key(family, network, length), route_key(family, last, 255))], length)
+
+    def longest_match(self, text):
+        """Per snapshot and VRF, the longest prefix containing the address"""
+        family, address, _ = parse_query(text)
+        best = {}
+        hits = self.search([(route_key(family, address >> shift << shift, MAX_LENGTH[family] - shift),
+                                      route_key(family, address >> shift << shift, MAX_LENGTH[family] - shift + 1))
+                                     for shift in range(MAX_LENGTH[family] + 1)])
+        for snapshot, vrf, family, address, length in hits:
+            if length > best.get((snapshot, vrf), (None, -1))[1]:
+                best[(snapshot, vrf)] = (address, length)
+        return {(snapshot, vrf, family, address, length) for (snapshot, vrf), (address, length) in best.items()}
+
+
+def snapshot_host_time(name):
+    """'leaf1_2026-10-19_06-35-26.txt' -> ('leaf1', '2026-10-19_06-35-26')"""
+    match = SNAPSHOT_NAME.match(name)
+    if not match:
+        return name.rsplit('.', 1)[0], ''
+    return match.group(1), name[len(match.group(1)) + 1:-len('.txt')]
+
+
+def lookup_prefix(indexes, query, kind='exact'):
+    """Query the PRE and POST indexes ({'PRE': PrefixIndex, 'POST': ...})
+
+    kind is 'exact', 'longest' or 'covered'. Returns a dict with:
+    - seen: {(hostname, vrf, prefix): [(timestamp, side, snapshot)]}
+    - lost: [((hostname, vrf, prefix), post snapshot)] - in the latest PRE
+      of the device, not in its latest POST
+    - unchecked: [((hostname, vrf, prefix), reason)] - would be lost, but
+      the latest POST has no table for that VRF (ROUTES UNCHANGED by a
+      tiered collection, or ROUTES FAILED)
+    - hits: snapshot hit count
+    """
+    seen = {}
+    families = {}
+    hits = 0
+    for side, index in indexes.items():
+        if kind == 'longest':
+            side_hits = index.longest_match(query)
+        elif kind == 'covered':
+            side_hits = index.covered_by(query)
+        else:
+            side_hits = index.exact(query)
+        hits += len(side_hits)
+        for snapshot, vrf, family, address, length in side_hits:
+            hostname, stamp = snapshot_host_time(snapshot)
+            key = (hostname, vrf, prefix_text(family, address, length))
+            seen.setdefault(key, []).append((stamp, side, snapshot))
+            families[key] = family
+
+    latest = {}
+    for side, index in indexes.items():
+        if os.path.isdir(index.directory):
+            for name in sorted(os.listdir(index.directory)):
+                if name.endswith('.txt'):
+                    latest[(snapshot_host_time(name)[0], side)] = name
+    post_unresolved = indexes['POST'].unresolved() if 'POST' in indexes else {}
+
+    lost = []
+    unchecked = []
+    for key in sorted(seen):
+        hostname, vrf, _ = key
+        snapshots = {(side, snapshot) for _, side, snapshot in seen[key]}
+        pre_file = latest.get((hostname, 'PRE'))
+        post_file = latest.get((hostname, 'POST'))
+        if ('PRE', pre_file) not in snapshots or post_file is None or ('POST', post_file) in snapshots:
+            continue
+        marks = post_unresolved.get(post_file, {})
+        reason = marks.get((families[key], vrf)) or marks.get((families[key], '*'))
+        if reason:
+            unchecked.append((key, reason))
+        else:
+            lost.append((key, post_file))
+    return {'seen': seen, 'lost': lost, 'unchecked': unchecked, 'hits': hits}
+
+
+def prefix_main(argv):
+    """Query the prefix index of the PRE and POST snapshots"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="nxos_validator_simple.py prefix",
+        description="Find a prefix in every PRE/POST snapshot (index updated with new snapshots first)")
+    parser.add_argument('query', nargs='?', help="prefix (exact match) or address (--longest)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--longest', action='store_true', help="longest prefix containing the address")
+    mode.add_argument('--covered', action='store_true', help="the prefix and every more specific one")
+    parser.add_argument('--limit', type=int, default=100, help="lines shown (default: 100)")
+    parser.add_argument('--compact', action='store_true', help="merge the index segments into one")
+    args = parser.parse_args(argv)
+    if not args.query and not args.compact:
+        parser.error("a prefix or address is required (or --compact)")
+    if args.query:
+        try:
+            parse_query(args.query)
+        except ValueError as e:
+            parser.error(str(e))
+
+    indexes = {side: PrefixIndex(directory) for side, directory in (('PRE', PRE_DIR), ('POST', POST_DIR))}
+    for side, index in indexes.items():
+        added = index.update()
+        if added:
+            print(f"[INFO] {side}: {added} snapshot(s) added to {index.path}")
+        if index.compact(1 if args.compact else PREFIX_SEGMENTS_MAX):
+            print(f"[INFO] {side}: index segments merged")
+    if not args.query:
+        return 0
+
+    kind = 'longest' if args.longest else 'covered' if args.covered else 'exact'
+    start = time.perf_counter()
+    result = lookup_prefix(indexes, args.query, kind)
+    elapsed = (time.perf_counter() - start) * 1000
+    seen, lost, unchecked = result['seen'], result['lost'], result['unchecked']
+    label = {'longest': 'longest match', 'covered': 'covered by', 'exact': 'exact'}[kind]
+    print(f"[INFO] {label} {args.query}: {len(seen)} device/VRF/prefix entr(ies), "
+          f"{result['hits']} snapshot hit(s), {elapsed:.1f} ms")
+
+    print(f"\n{'='*80}")
+    print(f"PREFIX {label.upper()}: {args.query}")
+    print(f"{'='*80}")
+    if not seen:
+        print("  Not found in any snapshot")
+    for count, key in enumerate(sorted(seen)):
+        if count == args.limit:
+            print(f"  ... {len(seen) - args.limit} more (--limit)")
+            break
+        hostname, vrf, prefix = key
+        stamps = sorted(seen[key])
+        last = stamps[-1]
+        print(f"  {hostname}  vrf {vrf}  {prefix}  - {len(stamps)} snapshot(s), "
+              f"last seen {last[1]} {last[2]}")
+
+    if lost:
+        print("\nLOST (in the latest PRE, not in the latest POST):")
+        for (hostname, vrf, prefix), post_file in lost[:args.limit]:
+            print(f"  ! {hostname}  vrf {vrf}  {prefix}  (POST {post_file})")
+        if len(lost) > args.limit:
+            print(f"  ... {len(lost) - args.limit} more (--limit)")
+    if unchecked:
+        print("\nNOT CHECKED (VRF not collected in the latest POST):")
+        for (hostname, vrf, prefix), reason in unchecked[:args.limit]:
+            print(f"  - {hostname}  vrf {vrf}  {prefix}  (routes {reason})")
+        if len(unchecked) > args.limit:
+            print(f"  ... {len(unchecked) - args.limit} more (--limit)")
+    print(f"{'='*80}")
+    return 0
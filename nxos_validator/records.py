@@ -0,0 +1,81 @@
+"""Compact records for parsed state
+
+Interfaces are stored as one slotted InterfaceState each, BGP/OSPF
+neighbors as {neighbor: state} per VRF and CDP/LLDP entries as Adjacency
+tuples. State strings, VLANs, device names and ports are interned: a
+fleet has a handful of distinct values ('connected', 'FULL/DR', ...),
+each stored once however many snapshots are held in memory.
+
+The coerce helpers also accept the legacy shapes (status string or
+{'status', 'vlan'} dict per interface, [{'neighbor', 'state'}] rows,
+'device|port' strings), so older data compares like fresh data.
+"""
+
+import sys
+from typing import NamedTuple
+
+
+class InterfaceState:
+    """Status and access VLAN of one interface"""
+
+    __slots__ = ('status', 'vlan')
+
+    def __init__(self, status='unknown', vlan='--'):
+        self.status = sys.intern(status)
+        self.vlan = sys.intern(vlan)
+
+    @classmethod
+    def coerce(cls, value):
+        """Record from a record, a legacy {'status', 'vlan'} dict or a legacy status string"""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, str):
+            return cls(value)
+        return cls(value.get('status', 'unknown'), value.get('vlan', '--'))
+
+    def get(self, field, default=None):
+        """Dict-style access, like the legacy per-interface dict"""
+        return getattr(self, field) if field in self.__slots__ else default
+
+    def __getitem__(self, field):
+        if field not in self.__slots__:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __eq__(self, other):
+        return isinstance(other, InterfaceState) and (self.status, self.vlan) == (other.status, other.vlan)
+
+    def __hash__(self):
+        return hash((self.status, self.vlan))
+
+    def __repr__(self):
+        return f"InterfaceState({self.status!r}, {self.vlan!r})"
+
+
+class Adjacency(NamedTuple):
+    """One CDP/LLDP neighbor: remote device and local port"""
+
+    device: str
+    port: str
+
+    @classmethod
+    def make(cls, device, port):
+        return cls(sys.intern(device), sys.intern(port))
+
+    @classmethod
+    def coerce(cls, value):
+        """Record from a record or a legacy 'device|port' string"""
+        if isinstance(value, cls):
+            return value
+        device, _, port = value.partition('|')
+        return cls.make(device, port)
+
+    def __str__(self):
+        return f"{self.device}|{self.port}"
+
+
+def neighbor_states(rows):
+    """{neighbor: state} of one VRF, from the parsed dict or legacy [{'neighbor', 'state'}] rows"""
+    if isinstance(rows, dict):
+        return rows
+    return {row['neighbor']: row['state'] for row in rows}
@@ -0,0 +1,225 @@
+"""Comparison reports written to COMPARE_DIR"""
+
+import os
+import json
+from datetime import datetime
+
+from .config import COMPARE_DIR, OPTIONAL_SECTIONS, FLEET_RESULTS_PREFIX, FLEET_REPORT
+from .inventory import shard_label
+from .snapshot import write_json_atomic, RouteInterns
+
+
+class ReportingMixin:
+    """Per-device comparison report, and the fleet report merged from every shard"""
+
+    def compare_data(self, pre_file, post_file, hostname, sections=None, report_dir=COMPARE_DIR, quiet=False,
+                     section_issues=None):
+        """Compare PRE and POST data, write the report and return its issues
+
+        sections limits the report (and the parsing) to the given section
+        names, e.g. {'bgp', 'ospf', 'interfaces'}; None compares everything.
+        quiet drops the console banners (command-line compare).
+        section_issues, if given, is filled with {section: issues}.
+        """
+        if not quiet:
+            print(f"\n{'='*70}")
+            print(f"COMPARING: {hostname}")
+            print(f"{'='*70}")
+
+        # Parse data from both files, sharing route intern tables that are
+        # dropped with the snapshots; both are closed even if comparing fails
+        interns = RouteInterns()
+        with self.parse_file(pre_file, interns) as pre_data, self.parse_file(post_file, interns) as post_data:
+            # Create comparison report
+            os.makedirs(report_dir, exist_ok=True)
+            report_file = os.path.join(report_dir, f"{hostname}_report.txt")
+
+            issues = []
+
+            report_sections = [
+                ("VERSION", 'version', self.compare_version),
+                ("INTERFACES", 'interfaces', self.compare_interfaces),
+                ("BGP NEIGHBORS", 'bgp', self.compare_bgp),
+                ("BGP IPv6 NEIGHBORS", 'bgp6',
+                 lambda pre, post, f: self.compare_bgp(pre, post, f, 'bgp6', "BGP IPv6")),
+                ("OSPF NEIGHBORS", 'ospf', self.compare_ospf),
+                ("OSPFv3 NEIGHBORS", 'ospf6',
+                 lambda pre, post, f: self.compare_ospf(pre, post, f, 'ospf6', "OSPFv3")),
+                ("CDP NEIGHBORS", 'cdp',
+                 lambda pre, post, f: self.compare_cdp_lldp(pre.get('cdp', []), post.get('cdp', []), f, "CDP")),
+                ("LLDP NEIGHBORS", 'lldp',
+                 lambda pre, post, f: self.compare_cdp_lldp(pre.get('lldp', []), post.get('lldp', []), f, "LLDP")),
+                ("ROUTE SUMMARY", 'route_summary', self.compare_route_summary),
+                ("IPv6 ROUTE SUMMARY", 'route_summary6',
+                 lambda pre, post, f: self.compare_route_summary(pre, post, f, 'route_summary6', "IPv6 route")),
+                ("ROUTES", 'routes', self.compare_routes),
+                ("IPv6 ROUTES", 'routes6',
+                 lambda pre, post, f: self.compare_routes(pre, post, f, 'routes6', "IPv6 routes")),
+                ("ROUTE PATHS", 'route_paths', self.compare_route_paths),
+                ("IPv6 ROUTE PATHS", 'route_paths6',
+                 lambda pre, post, f: self.compare_route_paths(pre, post, f, 'route_paths6', "IPv6")),
+            ]
+
+            with open(report_file, 'w') as f:
+                f.write("="*80 + "\n")
+                f.write(f"COMPARISON REPORT: {hostname}\n")
+                f.write("="*80 + "\n")
+                f.write(f"PRE:  {pre_data['timestamp']}\n")
+                f.write(f"POST: {post_data['timestamp']}\n")
+                if sections:
+                    f.write(f"SECTIONS: {', '.join(s for _, s, _ in report_sections if s in sections)}\n")
+                f.write("="*80 + "\n\n")
+
+                # Commands that could not be collected
+                selected = [section for _, section, _ in report_sections
+                            if (section in sections if sections else section not in OPTIONAL_SECTIONS)]
+                # Snapshots taken before a command was added (e.g. IPv6) do not report it
+                if not sections:
+                    selected = [section for section in selected
+                                if self.section_command(section) in pre_data.commands | post_data.commands]
+                failure_issues = self.compare_failures(pre_data, post_data, f,
+                                                       {self.section_command(section) for section in selected})
+                issues.extend(failure_issues)
+
+                for title, section, compare in report_sections:
+                    if section not in selected:
+                        continue
+                    f.write(f"{title}:\n")
+                    f.write("-"*80 + "\n")
+                    # A failed command would look like everything went missing
+                    command = self.section_command(section)
+                    failed_in = [label for label, data in (("PRE", pre_data), ("POST", post_data))
+                                 if command in data.get('failures', {})]
+                    missing_in = [label for label, data in (("PRE", pre_data), ("POST", post_data))
+                                  if command not in data.commands]
+                    if failed_in:
+                        f.write(f"  SKIPPED: '{command}' failed in {'/'.join(failed_in)}\n")
+                    elif missing_in:
+                        f.write(f"  SKIPPED: '{command}' not collected in {'/'.join(missing_in)}\n")
+                    else:
+                        found = compare(pre_data, post_data, f)
+                        issues.extend(found)
+                        if section_issues is not None:
+                            section_issues[section] = found
+                    f.write("\n")
+
+                # Summary
+                f.write("="*80 + "\n")
+                f.write("SUMMARY\n")
+                f.write("="*80 + "\n")
+                if issues:
+                    f.write(f"\nISSUES FOUND ({len(issues)}):\n")
+                    for issue in issues:
+                        f.write(f"  ! {issue}\n")
+                else:
+                    f.write("\nNO CRITICAL ISSUES\n")
+
+        if not quiet:
+            print(f"[{hostname}] Report saved to {report_file}")
+        return issues
+
+    def save_fleet_results(self, results, report_dir=COMPARE_DIR, correlate=True):
+        """Record this node's verdicts and rebuild the fleet report
+
+        results maps hostname -> {'pre', 'post', 'report', 'issues'}. Each
+        shard writes its own fleet_<shard>.json, so shards sharing
+        report_dir never overwrite each other. The verdicts are merged into
+        the existing file, so a 'compare --host X' only replaces X's entry.
+        correlate: see write_fleet_report.
+        """
+        os.makedirs(report_dir, exist_ok=True)
+        label = shard_label(self.shard) or 'all'
+        path = os.path.join(report_dir, f"{FLEET_RESULTS_PREFIX}{label}.json")
+        compared = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        devices = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    previous = json.load(f)
+                for hostname, result in previous.get('devices', {}).items():
+                    devices[hostname] = dict(result, compared=result.get('compared', previous.get('compared', '')))
+            except (ValueError, OSError) as e:
+                print(f"[WARNING] Replacing unreadable {path}: {str(e)}")
+        for hostname, result in results.items():
+            devices[hostname] = dict(result, compared=compared)
+        write_json_atomic(path, {
+            'shard': label,
+            'compared': compared,
+            'devices': devices
+        })
+        return self.write_fleet_report(report_dir, correlate)
+
+    def write_fleet_report(self, report_dir=COMPARE_DIR, correlate=True):
+        """Merge every fleet_*.json of report_dir into fleet_report.txt
+
+        A device compared by several shards (or runs) keeps its newest verdict.
+        Failed links are correlated over the merged fleet, so both ends are
+        paired even when they were compared by different shards. Correlation
+        reads the neighbor sections of every snapshot of the fleet: pass
+        correlate=False when only a few devices were compared.
+        """
+        shards = {}
+        devices = {}
+        if os.path.isdir(report_dir):
+            for name in sorted(os.listdir(report_dir)):
+                if not (name.startswith(FLEET_RESULTS_PREFIX) and name.endswith('.json')):
+                    continue
+                path = os.path.join(report_dir, name)
+                try:
+                    with open(path, 'r') as f:
+                        results = json.load(f)
+                except (ValueError, OSError) as e:
+                    print(f"[WARNING] Ignoring unreadable {path}: {str(e)}")
+                    continue
+                label = results.get('shard', name)
+                compared = results.get('compared', '')
+                shards[label] = compared
+                for hostname, result in results.get('devices', {}).items():
+                    # Merged files carry each device's own compare time
+                    when = result.get('compared', compared)
+                    if hostname not in devices or when >= devices[hostname]['compared']:
+                        devices[hostname] = dict(result, shard=label, compared=when)
+
+        with_issues = [hostname for hostname in sorted(devices) if devices[hostname].get('issues')]
+        report_file = os.path.join(report_dir, FLEET_REPORT)
+        os.makedirs(report_dir, exist_ok=True)
+        with open(report_file, 'w') as f:
+            f.write("="*80 + "\n")
+            f.write("FLEET REPORT\n")
+            f.write("="*80 + "\n")
+            f.write(f"Shards: {', '.join(f'{label} ({shards[label]})' for label in sorted(shards))}\n")
+            f.write(f"Devices: {len(devices)} | OK: {len(devices) - len(with_issues)} | "
+                    f"WITH ISSUES: {len(with_issues)}\n")
+            f.write("="*80 + "\n\n")
+
+            f.write("DEVICES:\n")
+            f.write("-"*80 + "\n")
+            width = max([len(hostname) for hostname in devices] + [8])
+            for hostname in sorted(devices):
+                result = devices[hostname]
+                issues = result.get('issues', [])
+                verdict = f"{len(issues)} issue(s)" if issues else "OK"
+                marker = "!" if issues else " "
+                f.write(f"  {marker} {hostname:{width}}  {verdict:12}  {result.get('report', '')}  "
+                        f"[{result['shard']}]\n")
+            f.write("\n")
+
+            if with_issues:
+                f.write("ISSUES:\n")
+                f.write("-"*80 + "\n")
+                for hostname in with_issues:
+                    f.write(f"  {hostname}:\n")
+                    for issue in devices[hostname]['issues']:
+                        f.write(f"    ! {issue}\n")
+            else:
+                f.write("NO CRITICAL ISSUES\n")
+
+            failed_links = 0
+            if correlate:
+                failed_links = self.write_link_section(f, devices)
+            else:
+                f.write("\nFAILED LINKS: not correlated (partial compare, run 'compare --all' or 'merge')\n")
+
+        if failed_links:
+            print(f"[WARNING] {failed_links} failed link(s) across the fleet, see {report_file}")
+        return report_file
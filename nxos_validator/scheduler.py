@@ -0,0 +1,123 @@
+"""Collection pacing: login rate limit and per-group/site concurrency caps
+
+Both are read from the inventory:
+
+    login_rate: 2        # SSH logins per second, all workers together
+    login_burst: 4       # logins allowed back to back
+    concurrency:         # devices collected at once per tag value ('*' = any other value)
+      site:
+        branch-12: 1
+        '*': 3
+      group:
+        spines: 2
+"""
+
+import time
+import threading
+
+from .config import TAG_KEYS
+
+
+class TokenBucket:
+    """Token bucket shared by the workers: rate tokens/s, at most burst saved"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, deadline=None):
+        """Take one token, waiting for it; False if deadline comes first"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if deadline is not None:
+                left = deadline - time.monotonic()
+                if left <= wait:
+                    return False
+            time.sleep(wait)
+
+
+class DeviceScheduler:
+    """Hands devices to workers in order, skipping devices whose group or
+    site is at its concurrency cap
+
+    A worker never waits behind a capped device while another one could
+    run: it takes the first device of the queue that fits, and only blocks
+    when every pending device is capped (until a running one is released).
+    """
+
+    def __init__(self, devices, limits=None):
+        self.pending = list(devices)
+        self.limits = limits or {}
+        self.running = {}
+        self.condition = threading.Condition()
+
+    def slots(self, device):
+        """[((key, value), cap)] the device counts against"""
+        slots = []
+        for key, caps in self.limits.items():
+            value = device.get(key)
+            if value is None:
+                continue
+            cap = caps.get(str(value), caps.get('*'))
+            if cap:
+                slots.append(((key, str(value)), cap))
+        return slots
+
+    def next_device(self):
+        """Next device that fits under its caps, None when the queue is empty"""
+        with self.condition:
+            while self.pending:
+                for position, device in enumerate(self.pending):
+                    slots = self.slots(device)
+                    if all(self.running.get(slot, 0) < cap for slot, cap in slots):
+                        for slot, _ in slots:
+                            self.running[slot] = self.running.get(slot, 0) + 1
+                        return self.pending.pop(position)
+                self.condition.wait()
+            return None
+
+    def release(self, device):
+        """A device is done: free its slots and wake waiting workers"""
+        with self.condition:
+            for slot, _ in self.slots(device):
+                self.running[slot] -= 1
+            self.condition.notify_all()
+
+
+def parse_login_limit(inventory):
+    """TokenBucket from login_rate / login_burst, None when not set"""
+    rate = inventory.get('login_rate')
+    if rate is None:
+        return None
+    try:
+        rate = float(rate)
+        burst = float(inventory.get('login_burst', 1))
+    except (TypeError, ValueError):
+        raise ValueError("login_rate and login_burst must be numbers")
+    if rate <= 0 or burst < 1:
+        raise ValueError("login_rate must be > 0 and login_burst >= 1")
+    return TokenBucket(rate, burst)
+
+
+def parse_concurrency(inventory):
+    """{'site': {'paris': 2, '*': 1}, 'group': {...}} from the 'concurrency' block"""
+    limits = {}
+    for key, caps in (inventory.get('concurrency') or {}).items():
+        if key not in TAG_KEYS:
+            raise ValueError(f"concurrency: unknown tag '{key}' (expected one of: {', '.join(TAG_KEYS)})")
+        limits[key] = {}
+        for value, cap in (caps or {}).items():
+            if not isinstance(cap, int) or cap < 1:
+                raise ValueError(f"concurrency: {key} '{value}' must be an integer >= 1")
+            limits[key][str(value)] = cap
+    return limits
@@ -0,0 +1,293 @@
+"""Saved snapshot access: section index, lazy parsed view, intern tables"""
+
+import os
+import re
+import json
+import mmap
+import threading
+
+from .config import (
+    SECTION_COMMANDS, DERIVED_SECTIONS, INDEX_SUFFIX, INDEX_VERSION, SECTION_SEPARATOR,
+    VRF_HEADER, VRF_HEADER6
+)
+from .delta import is_delta, read_snapshot_bytes
+
+
+def write_json_atomic(path, obj):
+    """Write JSON to a temp file and rename it over path"""
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(obj, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, path)
+
+
+class SnapshotReader:
+    """Random access to the COMMAND sections of a saved snapshot
+
+    The file is memory-mapped and a small sidecar index (<file>.idx) keeps
+    the byte offset and length of each section body and of each VRF table
+    inside route sections. The index is built on first read (or right after
+    collection) and rebuilt when the snapshot size or mtime changes, so
+    reading one section never reads or splits the rest of the file.
+
+    A snapshot stored as a delta is rebuilt in memory from its base; the
+    index then refers to the rebuilt content. persist_index=False scans the
+    file without touching a sidecar (files still being written).
+    """
+
+    def __init__(self, path, persist_index=True):
+        self.path = path
+        self.index_file = path + INDEX_SUFFIX
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        if is_delta(self.data):
+            self.data.close()
+            self.data = read_snapshot_bytes(path)
+        self.index = self.load_index() if persist_index else None
+        if self.index is None:
+            self.index = self.build_index()
+            if persist_index:
+                self.save_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def stat_key(self):
+        stat = os.fstat(self.file.fileno())
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def load_index(self):
+        """Sidecar index, or None if missing or stale"""
+        try:
+            with open(self.index_file, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if index.get('version') != INDEX_VERSION or index.get('stat') != self.stat_key():
+            return None
+        return index
+
+    def save_index(self):
+        """Persist the index next to the snapshot (best effort)"""
+        try:
+            write_json_atomic(self.index_file, self.index)
+        except OSError:
+            pass
+
+    def build_index(self):
+        """Scan the mapped file once for section and VRF boundaries"""
+        data = self.data
+        index = {
+            'version': INDEX_VERSION,
+            'stat': self.stat_key(),
+            'timestamp': '',
+            'sections': {},
+            'failures': {},
+            'vrfs': {}
+        }
+
+        header_end = data.find(SECTION_SEPARATOR)
+        header = data[:header_end if header_end >= 0 else len(data)]
+        match = re.search(rb'^TIMESTAMP:(.*)$', header, re.MULTILINE)
+        if match:
+            index['timestamp'] = match.group(1).decode('utf-8', errors='ignore').strip()
+
+        pos = header_end
+        while pos >= 0:
+            command_start = pos + len(SECTION_SEPARATOR)
+            command_end = data.find(b"\n", command_start)
+            if command_end < 0:
+                break
+            command = data[command_start:command_end].decode('utf-8', errors='ignore').strip()
+
+            # Optional STATUS line, then the ==== line closing the header
+            body_start = command_end + 1
+            if data[body_start:body_start + 14] == b"STATUS: FAILED":
+                status_end = data.find(b"\n", body_start)
+                status = data[body_start:status_end].decode('utf-8', errors='ignore')
+                index['failures'][command] = status[len('STATUS: FAILED'):].strip(' -')
+                body_start = status_end + 1
+            if data[body_start:body_start + 3] == b"===":
+                body_start = data.find(b"\n", body_start) + 1
+
+            next_pos = data.find(SECTION_SEPARATOR, body_start)
+            body_end = next_pos if next_pos >= 0 else len(data)
+            index['sections'][command] = [body_start, body_end - body_start]
+
+            if 'route' in command and 'summary' not in command:
+                header = VRF_HEADER6 if 'ipv6' in command else VRF_HEADER
+                index['vrfs'][command] = self.index_vrfs(body_start, body_end, header)
+
+            pos = next_pos
+
+        return index
+
+    def index_vrfs(self, start, end, header=VRF_HEADER):
+        """Offsets of each 'IP Route Table for VRF' table between start and end"""
+        data = self.data
+        vrfs = {}
+        previous = None
+        pos = data.find(header, start, end)
+        while pos >= 0:
+            name_end = data.find(b"\n", pos, end)
+            line = data[pos:name_end if name_end >= 0 else end]
+            name = line[len(header):].strip().strip(b'"').decode('utf-8', errors='ignore')
+            if previous:
+                vrfs[previous[0]][1] = pos - previous[1]
+            vrfs[name] = [pos, end - pos]
+            previous = (name, pos)
+            pos = data.find(header, pos + len(header), end)
+        return vrfs
+
+    @property
+    def timestamp(self):
+        return self.index['timestamp']
+
+    @property
+    def failures(self):
+        return self.index['failures']
+
+    def commands(self):
+        """Commands in file order"""
+        return list(self.index['sections'])
+
+    def section(self, command):
+        """Output of one command, None if absent or failed"""
+        if command in self.index['failures'] or command not in self.index['sections']:
+            return None
+        offset, length = self.index['sections'][command]
+        return self.data[offset:offset + length].decode('utf-8', errors='ignore').rstrip('\n')
+
+    def section_size(self, command):
+        return self.index['sections'].get(command, [0, 0])[1]
+
+    def vrfs(self, command):
+        """VRF names of a route section, in file order"""
+        return list(self.index['vrfs'].get(command, {}))
+
+    def vrf_section(self, command, vrf):
+        """Route table of one VRF inside a route section, None if absent"""
+        entry = self.index['vrfs'].get(command, {}).get(vrf)
+        if entry is None:
+            return None
+        offset, length = entry
+        return self.data[offset:offset + length].decode('utf-8', errors='ignore').rstrip('\n')
+
+
+class InternTable:
+    """Values stored once and referred to by small integer ids
+
+    Shared by the PRE and POST snapshots of one comparison, so equal ids
+    in PRE and POST mean equal values.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+        self.lock = threading.Lock()
+
+    def intern(self, value):
+        idx = self.ids.get(value)
+        if idx is None:
+            with self.lock:
+                idx = self.ids.get(value)
+                if idx is None:
+                    idx = len(self.values)
+                    self.values.append(value)
+                    self.ids[value] = idx
+        return idx
+
+    def __getitem__(self, idx):
+        return self.values[idx]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class RouteInterns:
+    """Intern tables of one PRE/POST comparison
+
+    Both snapshots of the comparison are parsed against the same instance;
+    it is dropped with them, so route attributes do not pile up over the
+    life of the validator.
+    """
+
+    def __init__(self):
+        self.attrs = InternTable()     # next-hops, interfaces, protocols
+        self.pathsets = InternTable()  # sorted tuples of path tuples
+
+
+class LazySnapshot:
+    """Parsed snapshot whose sections are parsed on first access
+
+    Behaves like the parsed data dict (data['bgp'], data.get('cdp', [])).
+    A section's output is only read from the source and parsed the first
+    time one of its keys is accessed, so a comparison limited to a few
+    sections never touches the others.
+    """
+
+    def __init__(self, validator, source, timestamp='', failures=None, reader=None, commands=None,
+                 interns=None):
+        self.validator = validator
+        self.source = source  # command -> output text, None if absent/failed
+        self.reader = reader
+        self.interns = interns or RouteInterns()
+        self.commands = set(commands or ())  # Commands present in the snapshot
+        self.data = validator.empty_data()
+        self.data['timestamp'] = timestamp
+        self.data['failures'] = dict(failures or {})
+        self.data['route_interns'] = self.interns
+        self.parsed = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.reader:
+            self.reader.close()
+            self.reader = None
+
+    def load(self, key):
+        """Parse the section behind key unless already done"""
+        section = DERIVED_SECTIONS.get(key, key)
+        command = SECTION_COMMANDS.get(section)
+        if command is None or command in self.parsed:
+            return
+        self.parsed.add(command)
+        if command in self.data['failures']:
+            return
+        output = self.source(command)
+        if output:
+            self.validator.parse_command_output(command, output, self.data, self.interns)
+
+    def __getitem__(self, key):
+        self.load(key)
+        return self.data[key]
+
+    def get(self, key, default=None):
+        self.load(key)
+        return self.data.get(key, default)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def keys(self):
+        return self.data.keys()
+
+    def to_dict(self):
+        """Parse every section and return the plain data dict"""
+        for section in SECTION_COMMANDS:
+            self.load(section)
+        return dict(self.data)
@@ -0,0 +1,47 @@
+"""NXOSValidator: collection, parsing, comparison and reporting in one object"""
+
+import threading
+
+from .collection import CollectionMixin
+from .comparison import ComparisonMixin
+from .convergence import ConvergenceMixin
+from .correlation import CorrelationMixin
+from .parsing import ParsingMixin
+from .reporting import ReportingMixin
+
+
+class NXOSValidator(CollectionMixin, ParsingMixin, ComparisonMixin, ReportingMixin, ConvergenceMixin,
+                   CorrelationMixin):
+    """
+    Validator for Cisco NX-OS devices
+
+    Handles:
+    - SSH connections to devices (collection)
+    - Command execution with full output capture (collection)
+    - Data parsing and comparison (parsing, comparison)
+    - Report generation (reporting)
+    - Re-polling failing sections until convergence (convergence)
+    - Pairing both ends of each adjacency across the fleet (correlation)
+    """
+
+    def __init__(self, username, password):
+        self.username = username
+        self.password = password
+        self.devices = []
+        self.run_deadline = None
+        self.failures = {}
+        self.workers = 1
+        self.timings = {}
+        self.history = {}
+        self.print_lock = threading.Lock()
+        self.manifest = None
+        self.manifest_lock = threading.Lock()
+        self.tiered_routes = False
+        self.full_route_vrfs = set()
+        self.chunked_routes = False
+        self.delta_storage = False           # Save snapshots as deltas of the device's base
+        self.shard = None                    # (index, count) when this node handles one shard
+        self.shard_by = 'hostname'           # or a device tag: 'group', 'site'
+        self.login_limit = None              # TokenBucket shared by every connect_device()
+        self.concurrency_limits = {}         # {'site': {'paris': 2}, 'group': {...}}
+        self.transport = {}                  # SSH transport options: defaults, per site/group
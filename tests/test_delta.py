@@ -0,0 +1,113 @@
+"""Delta-encoded snapshots: exact rebuild, route ages, base selection"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from nxos_validator.config import SECTION_COMMANDS
+from nxos_validator.delta import encode_delta, apply_delta, read_snapshot_bytes, is_delta
+from nxos_validator.validator import NXOSValidator
+
+SEPARATOR = "=" * 80
+
+
+def snapshot(stamp, sections):
+    text = f"{SEPARATOR}\nDEVICE: leaf1 (192.0.2.1)\nTIMESTAMP: {stamp}\n{SEPARATOR}\n\n"
+    for command, output in sections:
+        text += f"\n{SEPARATOR}\nCOMMAND: {command}\n{SEPARATOR}\n{output}\n"
+    return text.encode('utf-8')
+
+
+def routes(count, age, nexthop='10.0.0.2'):
+    lines = ['IP Route Table for VRF "default"']
+    for idx in range(count):
+        lines += [f"10.{idx // 256}.{idx % 256}.0/24, ubest/mbest: 1/0",
+                  f"    *via {nexthop}, Eth1/1, [20/0], {age}, bgp-65000, external, tag 65001"]
+    return '\n'.join(lines)
+
+
+class EncodeDeltaTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        base = snapshot('2026-10-19 06:00:00', [('show version', 'NXOS: version 10.3(1)'),
+                                                (SECTION_COMMANDS['routes'], routes(50, '1d02h'))])
+        new = snapshot('2026-10-19 07:00:00', [('show version', 'NXOS: version 10.3(2)'),
+                                               (SECTION_COMMANDS['routes'], routes(60, '1d03h')),
+                                               ('show vrf', 'default 1 Up')])
+        delta = encode_delta(base, new, 'leaf1_base.txt')
+        self.assertTrue(is_delta(delta))
+        self.assertEqual(apply_delta(delta, base), new)
+
+    def test_identical_sections_are_same(self):
+        sections = [('show version', 'NXOS: version 10.3(1)'), ('show vrf', 'default 1 Up')]
+        delta = encode_delta(snapshot('a', sections), snapshot('b', sections), 'base.txt')
+        self.assertEqual(delta.count(b"\nSAME: "), 2)
+
+    def test_route_ages_do_not_defeat_the_delta(self):
+        base = snapshot('a', [(SECTION_COMMANDS['routes'], routes(500, '1d02h'))])
+        new = snapshot('b', [(SECTION_COMMANDS['routes'], routes(500, '00:00:12'))])
+        delta = encode_delta(base, new, 'base.txt')
+        self.assertEqual(apply_delta(delta, base), new)
+        self.assertLess(len(delta), len(new) * 0.2)
+
+    def test_changed_next_hop_is_kept(self):
+        base = snapshot('a', [(SECTION_COMMANDS['routes'], routes(20, '1d02h'))])
+        new = snapshot('b', [(SECTION_COMMANDS['routes'], routes(20, '1d02h', nexthop='10.0.0.9'))])
+        self.assertEqual(apply_delta(encode_delta(base, new, 'base.txt'), base), new)
+
+
+class DeltaStorageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.validator = NXOSValidator('', '')
+        self.validator.delta_storage = True
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def write(self, name, data):
+        with open(self.path(name), 'wb') as f:
+            f.write(data)
+
+    def test_base_is_the_latest_full_snapshot_of_the_exact_host(self):
+        data = snapshot('a', [(SECTION_COMMANDS['routes'], routes(100, '1d02h'))])
+        self.write('leaf1_2026-10-19_06-00-00.txt', data)
+        self.write('leaf1_a_2026-10-19_08-00-00.txt', data)
+        self.validator.write_snapshot(self.path('leaf1_2026-10-19_07-00-00.txt'), data, 'leaf1')
+
+        with open(self.path('leaf1_2026-10-19_07-00-00.txt'), 'rb') as f:
+            self.assertTrue(f.read().startswith(b"DELTA BASE: leaf1_2026-10-19_06-00-00.txt\n"))
+        self.assertEqual(self.validator.get_base_file(self.directory, 'leaf1'),
+                         self.path('leaf1_2026-10-19_06-00-00.txt'))
+        self.assertEqual(self.validator.get_latest_file(self.directory, 'leaf1'),
+                         self.path('leaf1_2026-10-19_07-00-00.txt'))
+        self.assertEqual(read_snapshot_bytes(self.path('leaf1_2026-10-19_07-00-00.txt')), data)
+
+    def test_first_snapshot_is_stored_in_full(self):
+        data = snapshot('a', [('show version', 'NXOS: version 10.3(1)')])
+        self.validator.write_snapshot(self.path('leaf1_2026-10-19_06-00-00.txt'), data, 'leaf1')
+        with open(self.path('leaf1_2026-10-19_06-00-00.txt'), 'rb') as f:
+            self.assertEqual(f.read(), data)
+
+    def test_too_different_is_stored_in_full(self):
+        self.write('leaf1_2026-10-19_06-00-00.txt', snapshot('a', [('show version', 'a' * 2000)]))
+        data = snapshot('b', [('show version', 'b' * 2000)])
+        self.validator.write_snapshot(self.path('leaf1_2026-10-19_07-00-00.txt'), data, 'leaf1')
+        with open(self.path('leaf1_2026-10-19_07-00-00.txt'), 'rb') as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(self.validator.get_base_file(self.directory, 'leaf1'),
+                         self.path('leaf1_2026-10-19_07-00-00.txt'))
+
+    def test_parse_data_needs_a_directory_for_deltas_only(self):
+        self.assertEqual(self.validator.parse_data("TIMESTAMP: x\n")['timestamp'], 'x')
+        with self.assertRaises(ValueError):
+            self.validator.parse_data("DELTA BASE: leaf1_2026-10-19_06-00-00.txt\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
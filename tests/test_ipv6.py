@@ -0,0 +1,72 @@
+"""IPv6 prefixes packed into 128-bit ints, and the IPv6 route table parser"""
+
+import ipaddress
+import unittest
+
+from nxos_validator.config import SECTION_COMMANDS
+from nxos_validator.parsing import pack_ipv6_prefix, format_prefix, normalize_address
+from nxos_validator.validator import NXOSValidator
+
+
+class PackPrefixTest(unittest.TestCase):
+
+    def test_matches_ipaddress(self):
+        for text in ('2001:db8::/32', '2001:db8:0:1::/64', '::/0', 'fe80::1/128',
+                     '2001:DB8:0:0:0:0:0:0/48', '::ffff:10.0.0.0/104'):
+            network = ipaddress.IPv6Network(text, strict=False)
+            self.assertEqual(pack_ipv6_prefix(text), (int(network.network_address) << 8) | network.prefixlen)
+
+    def test_spellings_are_equal(self):
+        self.assertEqual(pack_ipv6_prefix('2001:db8::/64'), pack_ipv6_prefix('2001:0DB8:0:0::/64'))
+        self.assertEqual(pack_ipv6_prefix('2001:db8::1/64'), pack_ipv6_prefix('2001:db8::/64'))
+
+    def test_length_is_part_of_the_key(self):
+        self.assertNotEqual(pack_ipv6_prefix('2001:db8::/48'), pack_ipv6_prefix('2001:db8::/64'))
+
+    def test_sorts_in_address_order(self):
+        texts = ['2001:db8:0:10::/64', '2001:db8::/64', '2001:db8:0:2::/64']
+        packed = sorted(pack_ipv6_prefix(text) for text in texts)
+        self.assertEqual([format_prefix(prefix) for prefix in packed],
+                         ['2001:db8::/64', '2001:db8:0:2::/64', '2001:db8:0:10::/64'])
+
+    def test_format_round_trip(self):
+        self.assertEqual(format_prefix(pack_ipv6_prefix('2001:0db8:0000::/48')), '2001:db8::/48')
+        self.assertEqual(format_prefix('10.0.0.0/24'), '10.0.0.0/24')
+
+    def test_malformed(self):
+        with self.assertRaises(ValueError):
+            pack_ipv6_prefix('2001:db8::g/64')
+
+    def test_normalize_address(self):
+        self.assertEqual(normalize_address('2001:0DB8::0001'), '2001:db8::1')
+        self.assertEqual(normalize_address('fe80::3%Eth1/1'), 'fe80::3%Eth1/1')
+        self.assertIsNone(normalize_address('Idle'))
+
+
+class IPv6RouteTableTest(unittest.TestCase):
+
+    def test_prefixes_and_paths(self):
+        validator = NXOSValidator('', '')
+        data = validator.empty_data()
+        validator.parse_command_output(SECTION_COMMANDS['routes6'], '\n'.join([
+            'IPv6 Routing Table for VRF "default"',
+            '2001:db8:0:1::/64, ubest/mbest: 2/0',
+            '    *via fe80::1, Eth1/1, [20/0], 1d02h, bgp-65000, external, tag 65001',
+            '    *via fe80::2, Eth1/2, [20/0], 1d02h, bgp-65000, external, tag 65001',
+            '2001:DB8:0:2::/64, ubest/mbest: 1/0',
+            '    *via 2001:db8::9, [200/0], 00:50:00, bgp-65000, internal, tag 65000',
+        ]), data)
+
+        prefixes = data['routes6']['default']
+        self.assertEqual(prefixes, [pack_ipv6_prefix('2001:db8:0:1::/64'), pack_ipv6_prefix('2001:db8:0:2::/64')])
+        paths = data['route_paths6']['default']
+        interns = data['route_interns']
+        self.assertEqual(len(interns.pathsets[paths[prefixes[0]]]), 2)
+        nexthop, interface, protocol, pref, metric = interns.pathsets[paths[prefixes[1]]][0]
+        self.assertEqual((interns.attrs[nexthop], interns.attrs[interface], interns.attrs[protocol]),
+                         ('2001:db8::9', '', 'bgp-65000'))
+        self.assertEqual((pref, metric), (200, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
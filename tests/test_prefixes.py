@@ -0,0 +1,71 @@
+"""Prefix index: LOST must not count VRFs a tiered POST did not re-collect"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from nxos_validator.config import SECTION_COMMANDS
+from nxos_validator.prefixes import PrefixIndex, lookup_prefix
+
+SEPARATOR = "=" * 80
+
+
+def snapshot(hostname, stamp, routes):
+    return (f"{SEPARATOR}\nDEVICE: {hostname} (192.0.2.1)\nTIMESTAMP: {stamp}\n{SEPARATOR}\n\n"
+            f"\n{SEPARATOR}\nCOMMAND: {SECTION_COMMANDS['routes']}\n{SEPARATOR}\n{routes}\n")
+
+
+def table(vrf, *prefixes):
+    lines = [f'IP Route Table for VRF "{vrf}"']
+    for prefix in prefixes:
+        lines += [f"{prefix}, ubest/mbest: 1/0", "    *via 10.0.0.2, Eth1/1, [200/0], 1d02h, bgp-65000, internal"]
+    return '\n'.join(lines)
+
+
+class TieredPostTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.indexes = {}
+        for side in ('PRE', 'POST'):
+            os.makedirs(os.path.join(self.root, side))
+            self.indexes[side] = PrefixIndex(os.path.join(self.root, side))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, side, name, content):
+        with open(os.path.join(self.root, side, name), 'w') as f:
+            f.write(content)
+
+    def test_unchanged_vrf_is_not_lost(self):
+        self.write('PRE', 'leaf1_2026-10-19_06-00-00.txt', snapshot(
+            'leaf1', '2026-10-19 06:00:00',
+            table('default', '10.9.0.0/24', '10.1.0.0/24') + '\n' + table('blue', '172.16.0.0/16')))
+        self.write('POST', 'leaf1_2026-10-19_07-00-00.txt', snapshot(
+            'leaf1', '2026-10-19 07:00:00',
+            table('default', '10.1.0.0/24') + '\nROUTES UNCHANGED: VRF blue | PRE 2026-10-19 06:00:00'))
+        for index in self.indexes.values():
+            index.update()
+
+        result = lookup_prefix(self.indexes, '172.16.0.0/16')
+        self.assertEqual(result['lost'], [])
+        self.assertEqual(result['unchecked'], [(('leaf1', 'blue', '172.16.0.0/16'), 'unchanged')])
+
+        result = lookup_prefix(self.indexes, '10.9.0.0/24')
+        self.assertEqual(result['lost'], [(('leaf1', 'default', '10.9.0.0/24'), 'leaf1_2026-10-19_07-00-00.txt')])
+
+    def test_marks_survive_compaction(self):
+        self.test_unchanged_vrf_is_not_lost()
+        self.write('POST', 'leaf2_2026-10-19_07-00-00.txt', snapshot(
+            'leaf2', '2026-10-19 07:00:00', table('default', '10.2.0.0/24')))
+        self.indexes['POST'].update()
+        self.assertTrue(self.indexes['POST'].compact(threshold=1))
+        self.assertEqual(len(self.indexes['POST'].segment_names()), 1)
+        result = lookup_prefix(self.indexes, '172.16.0.0/16')
+        self.assertEqual(result['lost'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+"""ROUTES UNCHANGED (tiered) and ROUTES FAILED (chunked) marks in route sections"""
+
+import io
+import unittest
+
+from nxos_validator.collection import CollectionError, DeadlineExceeded
+from nxos_validator.config import SECTION_COMMANDS
+from nxos_validator.validator import NXOSValidator
+
+
+def table(vrf, *routes):
+    lines = [f'IP Route Table for VRF "{vrf}"']
+    for prefix, nexthop in routes:
+        lines += [f"{prefix}, ubest/mbest: 1/0",
+                  f"    *via {nexthop}, Eth1/1, [20/0], 1d02h, bgp-65000, external, tag 65001"]
+    return '\n'.join(lines)
+
+
+def summary(**vrfs):
+    lines = []
+    for vrf, count in vrfs.items():
+        lines += [f'IP Route Table for VRF "{vrf}"', f"   bgp-65000      : {count}"]
+    return '\n'.join(lines)
+
+
+class MarksTest(unittest.TestCase):
+
+    def setUp(self):
+        self.validator = NXOSValidator('', '')
+
+    def parse(self, output):
+        data = self.validator.empty_data()
+        self.validator.parse_command_output(SECTION_COMMANDS['routes'], output, data)
+        return data
+
+    def compare(self, method, pre, post):
+        f = io.StringIO()
+        issues = method(pre, post, f)
+        return issues, f.getvalue()
+
+
+class TieredMarksTest(MarksTest):
+
+    def test_unchanged_mark_is_parsed(self):
+        data = self.parse(table('default', ('10.0.0.0/24', '10.9.9.1')) +
+                          '\nROUTES UNCHANGED: VRF blue | PRE 2026-10-19 06:00:00')
+        self.assertEqual(data['routes'], {'default': ['10.0.0.0/24']})
+        self.assertEqual(data['routes_unchanged'], {'blue': '2026-10-19 06:00:00'})
+
+    def test_unchanged_vrf_is_not_reported_removed(self):
+        pre = self.parse(table('blue', ('172.16.0.0/16', '10.9.9.1')))
+        pre['timestamp'] = '2026-10-19 06:00:00'
+        post = self.parse('ROUTES UNCHANGED: VRF blue | PRE 2026-10-19 06:00:00')
+        issues, report = self.compare(self.validator.compare_routes, pre, post)
+        self.assertEqual(issues, [])
+        self.assertIn("UNCHANGED: route summary identical to PRE", report)
+
+    def test_unchanged_vrf_paths_are_not_compared(self):
+        pre = self.parse(table('blue', ('172.16.0.0/16', '10.9.9.1')))
+        post = self.parse('ROUTES UNCHANGED: VRF blue | PRE 2026-10-19 06:00:00')
+        issues, report = self.compare(self.validator.compare_route_paths, pre, post)
+        self.assertEqual(issues, [])
+        self.assertIn("NOT COMPARED: unchanged summary since PRE 2026-10-19 06:00:00", report)
+        self.assertNotIn("OK: No route path changes\n", report)
+
+    def test_only_changed_vrfs_are_fetched(self):
+        validator = self.validator
+        validator.get_latest_file = lambda directory, hostname: 'leaf1_pre.txt'
+        validator.read_command_output = lambda path, command: summary(default=10, blue=5)
+        validator.read_timestamp = lambda path: '2026-10-19 06:00:00'
+        fetched = []
+        validator.run_command = lambda session, command, deadline=None: fetched.append(command) or ''
+
+        output = validator.collect_routes_tiered(None, 'leaf1', summary(default=12, blue=5))
+        self.assertEqual(fetched, ['show ip route vrf default'])
+        self.assertIn('ROUTES UNCHANGED: VRF blue | PRE 2026-10-19 06:00:00', output)
+
+    def test_empty_post_summary_falls_back_to_the_full_table(self):
+        validator = self.validator
+        validator.get_latest_file = lambda directory, hostname: 'leaf1_pre.txt'
+        validator.read_command_output = lambda path, command: summary(default=10)
+        self.assertIsNone(validator.collect_routes_tiered(None, 'leaf1', 'Invalid command\n'))
+
+
+class ChunkedMarksTest(MarksTest):
+
+    def test_failed_mark_is_parsed(self):
+        data = self.parse(table('default', ('10.0.0.0/24', '10.9.9.1')) +
+                          '\nROUTES FAILED: VRF red | Command timeout\n' +
+                          table('blue', ('172.16.0.0/16', '10.9.9.1')))
+        self.assertEqual(data['routes'], {'default': ['10.0.0.0/24'], 'blue': ['172.16.0.0/16']})
+        self.assertEqual(data['routes_failed'], {'red': 'Command timeout'})
+
+    def test_failed_vrf_is_not_collected_not_removed(self):
+        pre = self.parse(table('red', ('192.168.0.0/24', '10.9.9.1')))
+        post = self.parse('ROUTES FAILED: VRF red | Command timeout')
+        issues, report = self.compare(self.validator.compare_routes, pre, post)
+        self.assertEqual(issues, ["Routes NOT COLLECTED in VRF red: Command timeout"])
+        self.assertNotIn("ROUTES REMOVED", report)
+
+        issues, report = self.compare(self.validator.compare_route_paths, pre, post)
+        self.assertEqual(issues, [])
+        self.assertIn("NOT COMPARED: collection failed (Command timeout)", report)
+
+    def test_one_failed_vrf_keeps_the_others(self):
+        def run_command(session, command, deadline=None):
+            if command.endswith(' red'):
+                raise CollectionError("Command timeout")
+            return table(command.split()[-1], ('10.0.0.0/24', '10.9.9.1'))
+        self.validator.run_command = run_command
+
+        output = self.validator.fetch_route_vrfs(None, 'leaf1', ['default', 'red', 'blue'])
+        data = self.parse(output)
+        self.assertEqual(sorted(data['routes']), ['blue', 'default'])
+        self.assertEqual(data['routes_failed'], {'red': 'Command timeout'})
+
+    def test_deadline_is_not_a_failed_vrf(self):
+        def run_command(session, command, deadline=None):
+            raise DeadlineExceeded("device deadline exceeded")
+        self.validator.run_command = run_command
+        with self.assertRaises(DeadlineExceeded):
+            self.validator.fetch_route_vrfs(None, 'leaf1', ['default'])
+
+    def test_vrfs_come_from_the_summary(self):
+        fetched = []
+        self.validator.run_command = lambda session, command, deadline=None: fetched.append(command) or ''
+        self.validator.collect_routes_chunked(None, 'leaf1', summary(default=10, blue=5))
+        self.assertEqual(fetched, ['show ip route vrf default', 'show ip route vrf blue'])
+
+    def test_no_vrf_list_falls_back_to_the_full_table(self):
+        self.validator.run_command = lambda session, command, deadline=None: ''
+        self.assertIsNone(self.validator.collect_routes_chunked(None, 'leaf1', None))
+
+
+if __name__ == '__main__':
+    unittest.main()
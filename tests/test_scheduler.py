@@ -0,0 +1,84 @@
+"""Login token bucket and per-group/site concurrency caps"""
+
+import threading
+import time
+import unittest
+
+from nxos_validator.scheduler import DeviceScheduler, TokenBucket, parse_concurrency, parse_login_limit
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=20, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            self.assertTrue(bucket.acquire())
+        self.assertLess(time.monotonic() - start, 0.04)
+        self.assertTrue(bucket.acquire())
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def test_deadline(self):
+        bucket = TokenBucket(rate=0.1)
+        self.assertTrue(bucket.acquire())
+        self.assertFalse(bucket.acquire(deadline=time.monotonic() + 0.05))
+
+    def test_parse(self):
+        self.assertIsNone(parse_login_limit({}))
+        bucket = parse_login_limit({'login_rate': 2, 'login_burst': 4})
+        self.assertEqual((bucket.rate, bucket.burst), (2.0, 4.0))
+        for inventory in ({'login_rate': 0}, {'login_rate': 'fast'}, {'login_rate': 1, 'login_burst': 0}):
+            with self.assertRaises(ValueError):
+                parse_login_limit(inventory)
+
+
+class DeviceSchedulerTest(unittest.TestCase):
+
+    def test_capped_device_is_skipped_not_waited_for(self):
+        devices = [{'hostname': 'a', 'site': 'branch'}, {'hostname': 'b', 'site': 'branch'},
+                   {'hostname': 'c', 'site': 'paris'}]
+        scheduler = DeviceScheduler(devices, {'site': {'branch': 1}})
+        first = scheduler.next_device()
+        self.assertEqual(first['hostname'], 'a')
+        self.assertEqual(scheduler.next_device()['hostname'], 'c')
+        scheduler.release(first)
+        self.assertEqual(scheduler.next_device()['hostname'], 'b')
+        self.assertIsNone(scheduler.next_device())
+
+    def test_caps_hold_under_threads(self):
+        devices = [{'hostname': f"leaf{idx}", 'site': 'branch' if idx % 2 else 'paris'} for idx in range(12)]
+        scheduler = DeviceScheduler(devices, {'site': {'branch': 1, '*': 2}})
+        running = {'branch': 0, 'paris': 0}
+        peak = dict(running)
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                device = scheduler.next_device()
+                if device is None:
+                    return
+                with lock:
+                    running[device['site']] += 1
+                    peak[device['site']] = max(peak[device['site']], running[device['site']])
+                time.sleep(0.005)
+                with lock:
+                    running[device['site']] -= 1
+                scheduler.release(device)
+
+        threads = [threading.Thread(target=worker) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(peak, {'branch': 1, 'paris': 2})
+
+    def test_parse_concurrency(self):
+        self.assertEqual(parse_concurrency({'concurrency': {'site': {'paris': 2, '*': 1}}}),
+                         {'site': {'paris': 2, '*': 1}})
+        for block in ({'rack': {'r1': 1}}, {'site': {'paris': 0}}):
+            with self.assertRaises(ValueError):
+                parse_concurrency({'concurrency': block})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""Inventory sharding: every node computes the same disjoint split"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from nxos_validator.inventory import parse_shard, shard_label, shard_devices, stable_hash
+from nxos_validator.validator import NXOSValidator
+
+DEVICES = [{'hostname': f"leaf{idx}", 'site': f"site{idx % 3}", 'group': 'spines' if idx < 2 else ''}
+           for idx in range(40)]
+
+
+def hostnames(devices):
+    return [device['hostname'] for device in devices]
+
+
+class ShardDevicesTest(unittest.TestCase):
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard(' 2/4 '), (2, 4))
+        for text in ('0/4', '5/4', '2', 'a/b', '2/-4'):
+            with self.assertRaises(ValueError):
+                parse_shard(text)
+        self.assertEqual(shard_label((2, 4)), 'shard2of4')
+        self.assertEqual(shard_label(None), '')
+
+    def test_shards_partition_the_fleet(self):
+        for key in ('hostname', 'site', 'group'):
+            shards = [hostnames(shard_devices(DEVICES, (index, 4), key)) for index in range(1, 5)]
+            self.assertEqual(sorted(sum(shards, [])), sorted(hostnames(DEVICES)), key)
+            # Inventory order is kept inside a shard
+            for shard in shards:
+                self.assertEqual(shard, [name for name in hostnames(DEVICES) if name in shard])
+
+    def test_same_split_whatever_the_inventory_order(self):
+        reordered = list(reversed(DEVICES))
+        for index in range(1, 4):
+            self.assertEqual(sorted(hostnames(shard_devices(DEVICES, (index, 3)))),
+                             sorted(hostnames(shard_devices(reordered, (index, 3)))))
+
+    def test_adding_a_device_moves_no_other(self):
+        before = {name: index for index in range(1, 5)
+                  for name in hostnames(shard_devices(DEVICES, (index, 4)))}
+        grown = DEVICES + [{'hostname': 'leaf99'}]
+        after = {name: index for index in range(1, 5)
+                 for name in hostnames(shard_devices(grown, (index, 4)))}
+        self.assertEqual({name: after[name] for name in before}, before)
+
+    def test_tag_stays_on_one_node(self):
+        for index in range(1, 4):
+            sites = {device['site'] for device in shard_devices(DEVICES, (index, 3), 'site')}
+            self.assertEqual(len(sites), 1)
+
+    def test_hash_is_stable_across_processes(self):
+        code = "from nxos_validator.inventory import stable_hash; print(stable_hash('leaf1'))"
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True,
+                                env=dict(os.environ, PYTHONHASHSEED='123'), check=True).stdout
+        self.assertEqual(int(output), stable_hash('leaf1'))
+
+    def test_invalid_key(self):
+        with self.assertRaises(ValueError):
+            shard_devices(DEVICES, (1, 2), 'rack')
+
+
+class FleetResultsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.validator = NXOSValidator('', '')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def result(self, issues):
+        return {'pre': '', 'post': '', 'report': 'report.txt', 'issues': issues}
+
+    def test_shards_write_their_own_file(self):
+        for shard, hostname in (((1, 2), 'leaf1'), ((2, 2), 'leaf2')):
+            self.validator.shard = shard
+            self.validator.save_fleet_results({hostname: self.result([])}, self.directory, correlate=False)
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith('.json'))
+        self.assertEqual(names, ['fleet_shard1of2.json', 'fleet_shard2of2.json'])
+        with open(os.path.join(self.directory, 'fleet_report.txt')) as f:
+            self.assertIn("Devices: 2 | OK: 2 | WITH ISSUES: 0", f.read())
+
+    def test_single_host_compare_keeps_the_other_devices(self):
+        self.validator.save_fleet_results({'leaf1': self.result([]), 'leaf2': self.result([])},
+                                          self.directory, correlate=False)
+        self.validator.save_fleet_results({'leaf1': self.result(['BGP neighbor DOWN'])},
+                                          self.directory, correlate=False)
+        with open(os.path.join(self.directory, 'fleet_all.json')) as f:
+            devices = json.load(f)['devices']
+        self.assertEqual(sorted(devices), ['leaf1', 'leaf2'])
+        self.assertEqual(devices['leaf1']['issues'], ['BGP neighbor DOWN'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""SnapshotReader: mmap sections through the .idx sidecar"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from nxos_validator.config import SECTION_COMMANDS, INDEX_SUFFIX
+from nxos_validator.snapshot import SnapshotReader
+
+SEPARATOR = "=" * 80
+
+SNAPSHOT = (f"{SEPARATOR}\nDEVICE: leaf1 (192.0.2.1)\nTIMESTAMP: 2026-10-19 06:00:00\n{SEPARATOR}\n\n"
+            f"\n{SEPARATOR}\nCOMMAND: show version\n{SEPARATOR}\nNXOS: version 10.3(1)\n"
+            f"\n{SEPARATOR}\nCOMMAND: show cdp neighbors\nSTATUS: FAILED - Command timeout\n{SEPARATOR}\n"
+            f"\n{SEPARATOR}\nCOMMAND: {SECTION_COMMANDS['routes']}\n{SEPARATOR}\n"
+            'IP Route Table for VRF "default"\n10.0.0.0/24, ubest/mbest: 1/0\n'
+            'IP Route Table for VRF "blue"\n172.16.0.0/16, ubest/mbest: 1/0\n')
+
+
+class SnapshotReaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'leaf1_2026-10-19_06-00-00.txt')
+        with open(self.path, 'w') as f:
+            f.write(SNAPSHOT)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_sections(self):
+        with SnapshotReader(self.path) as reader:
+            self.assertEqual(reader.timestamp, '2026-10-19 06:00:00')
+            self.assertEqual(reader.commands(), ['show version', 'show cdp neighbors', SECTION_COMMANDS['routes']])
+            self.assertEqual(reader.section('show version'), 'NXOS: version 10.3(1)')
+            self.assertIsNone(reader.section('show cdp neighbors'))
+            self.assertEqual(reader.failures, {'show cdp neighbors': 'Command timeout'})
+            self.assertIsNone(reader.section('show lldp neighbors'))
+
+    def test_vrf_tables(self):
+        with SnapshotReader(self.path) as reader:
+            command = SECTION_COMMANDS['routes']
+            self.assertEqual(reader.vrfs(command), ['default', 'blue'])
+            self.assertEqual(reader.vrf_section(command, 'blue'),
+                             'IP Route Table for VRF "blue"\n172.16.0.0/16, ubest/mbest: 1/0')
+
+    def test_sidecar_is_reused_then_rebuilt_when_stale(self):
+        SnapshotReader(self.path).close()
+        with open(self.path + INDEX_SUFFIX) as f:
+            index = json.load(f)
+        index['timestamp'] = 'from the sidecar'
+        with open(self.path + INDEX_SUFFIX, 'w') as f:
+            json.dump(index, f)
+        with SnapshotReader(self.path) as reader:
+            self.assertEqual(reader.timestamp, 'from the sidecar')
+
+        with open(self.path, 'a') as f:
+            f.write("\n")
+        with SnapshotReader(self.path) as reader:
+            self.assertEqual(reader.timestamp, '2026-10-19 06:00:00')
+
+    def test_no_sidecar_when_not_persisted(self):
+        with SnapshotReader(self.path, persist_index=False) as reader:
+            self.assertEqual(reader.section('show version'), 'NXOS: version 10.3(1)')
+        self.assertFalse(os.path.exists(self.path + INDEX_SUFFIX))
+
+
+if __name__ == '__main__':
+    unittest.main()